@@ -0,0 +1,73 @@
+"""Import time of the API suite per top level package, and wall-clock time of the smoke collection
+
+Run from the repository root: python -m benchmarks.bench_import_time [--json]
+The modules are imported in a new process with python -X importtime, the time of each module is added to its
+top level package. The collection runs pytest --collect-only -m smoke three times and keeps the median.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+API_DIR = Path("src") / "api"
+ENV = dict(os.environ, URL_BASE="http://127.0.0.1:8080/api/1.0/", WORKSPACE_GID="1100000000000000")
+
+
+def import_times(modules: list) -> dict:
+    """Imports the modules in a new process and returns the microseconds spent in each top level package
+
+    Args:
+        modules (list): Dotted names of the modules
+
+    Returns:
+        dict: Self time in microseconds by top level package, from the slowest
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+        env=ENV, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True,
+    ).stderr
+    packages = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(self_us)
+    return dict(sorted(packages.items(), key=lambda item: -item[1]))
+
+
+def collection_time(rounds: int = 3) -> float:
+    """Returns the median wall-clock seconds of collecting the smoke tests"""
+    durations = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "pytest", "--collect-only", "-q", "-m", "smoke", "-p", "no:cacheprovider", str(API_DIR)],
+            env=ENV, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True,
+        )
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def main() -> None:
+    modules = ["src.api.conftest"] + [
+        ".".join(path.with_suffix("").parts) for path in sorted(API_DIR.glob("*/test_*.py"))
+    ]
+    packages = import_times(modules)
+    total_ms = sum(packages.values()) / 1000
+    collection_s = collection_time()
+    if "--json" in sys.argv:
+        print(json.dumps({"import_us": packages, "import_total_ms": total_ms, "smoke_collection_s": collection_s}))
+        return
+    print(f"{'package':<30}{'import ms':>12}{'share':>8}")
+    for package, self_us in list(packages.items())[:20]:
+        print(f"{package:<30}{self_us / 1000:>12.1f}{self_us / 1000 / total_ms:>8.1%}")
+    print(f"{'total':<30}{total_ms:>12.1f}")
+    print(f"\npytest --collect-only -m smoke: {collection_s:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
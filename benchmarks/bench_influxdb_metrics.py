@@ -0,0 +1,37 @@
+"""Suite wall-clock time with InfluxDB metrics on and off
+
+Run from the repository root: python -m benchmarks.bench_influxdb_metrics [pytest arguments]
+The pytest arguments default to src/api.
+"""
+import os
+import subprocess
+import sys
+import time
+from benchmarks.harness import measure
+from utils.influxdb_connection import InfluxDBConnection
+
+
+def run_suite(args: list, enabled: bool) -> float:
+    """Runs pytest in a new process and returns its wall-clock time"""
+    env = dict(os.environ, INFLUXDB_ENABLED=str(enabled).lower())
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", *args], env=env, check=False)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    args = sys.argv[1:] or ["src/api"]
+    response = {"request": {"url": "http://localhost/tasks", "method": "GET"}, "status_code": 200, "time": 0.1}
+    connection = InfluxDBConnection(enabled=True)
+    result = measure(lambda: connection.store_data_influxdb(response, "tasks"), iterations=1000)
+    connection.close()
+    print(f"store_data_influxdb per call: {result['median_s'] * 1e6:.2f} us (previous version: write + 1 s sleep)")
+
+    off = run_suite(args, enabled=False)
+    on = run_suite(args, enabled=True)
+    print(f"suite wall-clock metrics off: {off:.2f} s")
+    print(f"suite wall-clock metrics on:  {on:.2f} s ({on - off:+.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
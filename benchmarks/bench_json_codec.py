@@ -0,0 +1,65 @@
+"""Encoding and decoding time of the request and response bodies with each JSON codec
+
+Run from the repository root: python -m benchmarks.bench_json_codec
+The bodies are the ones of asana_resources.create_task and of GET projects/{gid}, answered by the in-memory
+Asana stub. "requests" is the path used before the codec layer: json= for the request and Response.json(),
+which decodes the bytes to text first, for the response.
+"""
+import json
+import requests
+from benchmarks.harness import measure, print_results
+from helper.data_factory import DataFactory
+from utils.json_codec import available_codecs, create_codec
+from utils.mock_asana_server import API_PREFIX, MockAsanaApp
+
+WORKSPACE_GID = "1100000000000000"
+
+
+def payloads() -> dict:
+    """Returns the request and response bodies of create_task and get_project as bytes"""
+    app = MockAsanaApp()
+    data = DataFactory(seed=0, worker_index=0, worker_count=1)
+    project_body = {"data": {"name": data.project_name(), "notes": data.notes(), "workspace": WORKSPACE_GID}}
+    _, _, project = app.handle("POST", f"{API_PREFIX}projects", json.dumps(project_body).encode())
+    project_gid = json.loads(project)["data"]["gid"]
+    task_body = {"data": {"name": data.task_name(), "notes": data.notes(), "projects": [project_gid]}}
+    _, _, task = app.handle("POST", f"{API_PREFIX}tasks", json.dumps(task_body).encode())
+    _, _, get_project = app.handle("GET", f"{API_PREFIX}projects/{project_gid}", b"")
+    return {
+        "create_task request": json.dumps(task_body).encode(),
+        "create_task response": task,
+        "get_project response": get_project,
+    }
+
+
+def requests_response(content: bytes) -> requests.Response:
+    response = requests.Response()
+    response._content = content
+    response.headers["Content-Type"] = "application/json; charset=UTF-8"
+    response.status_code = 200
+    return response
+
+
+def main() -> None:
+    for case, content in payloads().items():
+        value = json.loads(content)
+        results = {}
+        if case.endswith("request"):
+            # what PreparedRequest.prepare_body does with json=
+            results["requests json= encode"] = measure(
+                lambda: json.dumps(value, allow_nan=False).encode("utf-8"), iterations=5000
+            )
+        else:
+            results["requests Response.json"] = measure(
+                lambda: requests_response(content).json(), iterations=5000
+            )
+        for name in available_codecs():
+            codec = create_codec(name)
+            results[f"{name} dumps"] = measure(lambda: codec.dumps(value), iterations=5000)
+            results[f"{name} loads bytes"] = measure(lambda: codec.loads(content), iterations=5000)
+            results[f"{name} dumps_text indent 4"] = measure(lambda: codec.dumps_text(value, indent=4), iterations=5000)
+        print_results(f"{case} ({len(content)} bytes)", results)
+
+
+if __name__ == "__main__":
+    main()
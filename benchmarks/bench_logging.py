@@ -0,0 +1,66 @@
+"""Logging overhead per request at DEBUG and INFO, with direct handlers and with the queue listener
+
+Run from the repository root: python -m benchmarks.bench_logging
+Each configuration runs in a new process with LOG_QUEUE and LOG_LEVEL set and the log file in a temporary folder.
+The console output of the measured processes is discarded.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# a Response of the size returned by the task endpoints
+RESPONSE = {
+    "body": {"data": {"gid": "1208765432101234", "name": "Task", "notes": "n" * 200,
+                      "custom_fields": [{"gid": str(i), "name": f"field {i}"} for i in range(20)]}},
+    "status_code": 200,
+    "headers": {"content-type": "application/json; charset=UTF-8", "x-request-id": "abc"},
+    "time": 0.12,
+    "request": {"url": "https://app.asana.com/api/1.0/tasks/1208765432101234", "method": "GET"},
+}
+
+
+def child() -> None:
+    """Measures the logging calls of one request in this process and prints the results as JSON"""
+    from benchmarks.harness import measure
+    from utils.logger import LazyJson, get_logger, stop_listeners
+
+    logger = get_logger("bench_logging", "DEBUG")
+    url = RESPONSE["request"]["url"]
+
+    def eager():
+        logger.info("Start test: 'test_get_task'")
+        logger.debug(f"URL GET Task: {url}")
+        logger.debug(f"RESPONSE: {json.dumps(RESPONSE, indent=4)}")
+        logger.info("End test: 'test_get_task'")
+
+    def lazy():
+        logger.info("Start test: 'test_get_task'")
+        logger.debug(f"URL GET Task: {url}")
+        logger.debug("RESPONSE: %s", LazyJson(RESPONSE))
+        logger.info("End test: 'test_get_task'")
+
+    results = {name: measure(func, iterations=200, rounds=5, warmup=50)["median_s"]
+               for name, func in (("eager", eager), ("lazy", lazy))}
+    stop_listeners()
+    print(json.dumps(results))
+
+
+def main() -> None:
+    print(f"{'handlers':<10}{'level':<8}{'eager json.dumps':>18}{'LazyJson':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        for queue in ("false", "true"):
+            for level in ("DEBUG", "INFO"):
+                env = dict(os.environ, LOG_QUEUE=queue, LOG_LEVEL=level, LOG_DIR=directory)
+                output = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_logging", "--child"],
+                    env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=True,
+                ).stdout
+                results = json.loads(output.splitlines()[-1])
+                handlers = "queue" if queue == "true" else "direct"
+                print(f"{handlers:<10}{level:<8}{results['eager'] * 1e6:>15.1f} us{results['lazy'] * 1e6:>9.1f} us")
+
+
+if __name__ == "__main__":
+    child() if "--child" in sys.argv else main()
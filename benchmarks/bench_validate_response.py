@@ -0,0 +1,51 @@
+"""Validations per second of ValidateResponse before and after the schema registry
+
+Run from the repository root: python -m benchmarks.bench_validate_response
+"""
+import jsonschema
+from benchmarks.harness import measure, print_results
+from helper.schema_registry import SchemaRegistry
+from helper.validate_response import ValidateResponse
+
+SAMPLE_VALUES = {"string": "1234", "number": 1, "integer": 1, "boolean": True, "array": [], "null": None}
+
+
+def sample_instance(schema: dict):
+    """Builds an instance that satisfies a schema of input_json"""
+    schema_type = schema.get("type", "object")
+    if isinstance(schema_type, list):
+        schema_type = schema_type[0]
+    if schema_type == "object":
+        return {key: sample_instance(value) for key, value in schema.get("properties", {}).items()}
+    if schema_type == "array":
+        return [sample_instance(schema["items"])] if "items" in schema else []
+    return SAMPLE_VALUES[schema_type]
+
+
+def validate_before(validate: ValidateResponse, response: dict, file_name: str) -> None:
+    """Validation path used before the registry: read the file and validate with a new validator"""
+    expected = validate.read_input_data(f"{validate.registry.directory}/{file_name}.json")
+    jsonschema.validate(instance=response["body"], schema=expected["body"])
+    assert response["status_code"] == expected["status_code"]
+    assert response["headers"].keys() <= expected["headers"].keys()
+
+
+def main() -> None:
+    registry = SchemaRegistry.default()
+    validate = ValidateResponse(registry)
+    print(f"{len(registry.names)} files, {registry.unique_schemas} unique schemas")
+    results = {}
+    for name in registry.names:
+        expected = registry.get(name)
+        response = {
+            "body": sample_instance(expected.body),
+            "status_code": expected.status_code,
+            "headers": dict.fromkeys(expected.headers, ""),
+        }
+        results[f"{name} before"] = measure(lambda: validate_before(validate, response, name), iterations=100)
+        results[f"{name} after"] = measure(lambda: validate.validate_response(response, name), iterations=1000)
+    print_results("ValidateResponse.validate_response", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import statistics
+import time
+
+
+def measure(func, iterations: int = 1000, rounds: int = 5, warmup: int = 100) -> dict:
+    """Runs a function several rounds after a warm up and returns the statistics of the rounds
+
+    Args:
+        func (callable): Function without arguments to measure
+        iterations (int, optional): Calls per round. Defaults to 1000.
+        rounds (int, optional): Number of measured rounds. Defaults to 5.
+        warmup (int, optional): Calls made before measuring. Defaults to 100.
+
+    Returns:
+        dict: Operations per second (median of the rounds) and seconds per call
+    """
+    for _ in range(warmup):
+        func()
+    per_call = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        per_call.append((time.perf_counter() - start) / iterations)
+    median = statistics.median(per_call)
+    return {
+        "ops_per_sec": 1 / median if median else float("inf"),
+        "median_s": median,
+        "min_s": min(per_call),
+        "max_s": max(per_call),
+        "stdev_s": statistics.stdev(per_call) if rounds > 1 else 0.0,
+        "rounds": rounds,
+        "iterations": iterations,
+    }
+
+
+def print_results(title: str, results: dict) -> None:
+    """Prints a table with the results of several measures
+
+    Args:
+        title (str): Title of the table
+        results (dict): Name of the case and the dict returned by measure
+    """
+    print(f"\n{title}")
+    print(f"{'case':<45}{'ops/s':>14}{'median us':>12}{'stdev us':>12}")
+    for name, result in results.items():
+        print(
+            f"{name:<45}{result['ops_per_sec']:>14,.0f}"
+            f"{result['median_s'] * 1e6:>12.2f}{result['stdev_s'] * 1e6:>12.2f}"
+        )
@@ -0,0 +1,161 @@
+"""Overhead of the framework hot paths against the local Asana stub, with JSON output to compare runs
+
+Run from the repository root: python -m benchmarks.suite [--output results.json] [--compare previous.json]
+The cases run in a new process with the stub on a free port, logs and metrics in a temporary folder and the
+console output discarded. --filter keeps the cases whose name contains the text. --compare prints the change
+of the median of each case against a previous output.
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+GROUPS = ("rest_client", "validate_response", "logging", "influxdb", "fixtures")
+
+
+def child(port: int, name_filter: str) -> None:
+    """Measures the cases in this process and prints the results as JSON"""
+    from benchmarks.bench_validate_response import sample_instance
+    from benchmarks.harness import measure
+    from config.config import url_base, headers
+    from helper import asana_resources
+    from helper.http_session import PooledSession
+    from helper.resource_pool import READONLY, ResourcePool
+    from helper.rest_client import RestClient
+    from helper.schema_registry import SchemaRegistry
+    from helper.validate_response import ValidateResponse
+    from utils.influxdb_connection import InfluxDBConnection
+    from utils.logger import LazyJson, get_logger, stop_listeners
+    from utils.mock_asana_server import MockAsanaServer
+
+    server = MockAsanaServer(port=port).start()
+    rest_client = RestClient(PooledSession())
+    project_gid = asana_resources.create_project(rest_client)["body"]["data"]["gid"]
+    task_gid = asana_resources.create_task(rest_client)["body"]["data"]["gid"]
+    response = rest_client.send_request("GET", f"{url_base}tasks/{task_gid}", headers=headers)
+    cases = {group: {} for group in GROUPS}
+
+    cases["rest_client"]["GET task"] = (
+        lambda: rest_client.send_request("GET", f"{url_base}tasks/{task_gid}", headers=headers), 200)
+    cases["rest_client"]["PUT project"] = (
+        lambda: asana_resources.update_project(rest_client, project_gid, {"notes": "benchmark"}), 200)
+    cases["rest_client"]["GET projects page"] = (
+        lambda: rest_client.send_request("GET", f"{url_base}projects?limit=20", headers=headers), 200)
+
+    registry = SchemaRegistry.default()
+    validate = ValidateResponse(registry)
+    for name in registry.names:
+        expected = registry.get(name)
+        sample = {
+            "body": sample_instance(expected.body),
+            "status_code": expected.status_code,
+            "headers": dict.fromkeys(expected.headers, ""),
+        }
+        cases["validate_response"][name] = (lambda sample=sample, name=name: validate.validate_response(sample, name), 1000)
+
+    logger = get_logger("benchmarks.suite", "DEBUG")
+    cases["logging"]["get_logger"] = (lambda: get_logger("benchmarks.suite", "DEBUG"), 1000)
+    cases["logging"]["info"] = (lambda: logger.info("Start test: 'test_get_task'"), 1000)
+    cases["logging"]["debug LazyJson response"] = (lambda: logger.debug("RESPONSE: %s", LazyJson(response)), 1000)
+
+    influxdb = InfluxDBConnection(enabled=False, directory=os.environ["METRICS_DIR"])
+    cases["influxdb"]["store_data_influxdb"] = (lambda: influxdb.store_data_influxdb(response, "tasks"), 1000)
+
+    def project_fixture():
+        gid = asana_resources.create_project(rest_client)["body"]["data"]["gid"]
+        asana_resources.delete_resource(rest_client, "projects", gid)
+
+    pool = ResourcePool(rest_client, projects=1, tasks=1)
+    pool.fill()
+
+    def pooled_project_fixture():
+        gid = pool.acquire("projects", READONLY)
+        pool.release("projects", gid, READONLY)
+
+    cases["fixtures"]["create_project without pool"] = (project_fixture, 100)
+    cases["fixtures"]["create_project readonly from pool"] = (pooled_project_fixture, 1000)
+
+    results = {}
+    for group, group_cases in cases.items():
+        for name, (func, iterations) in group_cases.items():
+            if name_filter in f"{group} {name}":
+                results.setdefault(group, {})[name] = measure(
+                    func, iterations=iterations, rounds=5, warmup=max(iterations // 10, 10)
+                )
+    influxdb.close()
+    pool.close()
+    server.stop()
+    stop_listeners()
+    print(json.dumps(results))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def print_comparison(results: dict, previous: dict) -> None:
+    """Prints the median of each case and its change against a previous output"""
+    print(f"\n{'case':<60}{'median us':>12}{'previous':>12}{'change':>9}")
+    for group, group_results in results.items():
+        for name, result in group_results.items():
+            before = previous.get("results", {}).get(group, {}).get(name)
+            line = f"{group + ' ' + name:<60}{result['median_s'] * 1e6:>12.2f}"
+            if before:
+                change = result["median_s"] / before["median_s"] - 1
+                line += f"{before['median_s'] * 1e6:>12.2f}{change:>+9.1%}"
+            print(line)
+
+
+def main() -> None:
+    from benchmarks.harness import print_results
+
+    parser = argparse.ArgumentParser(description="Benchmarks of the framework hot paths")
+    parser.add_argument("--output", help="JSON file with the results")
+    parser.add_argument("--compare", help="JSON output of a previous run")
+    parser.add_argument("--filter", default="", help="Run the cases whose group and name contain this text")
+    args = parser.parse_args()
+    port = free_port()
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(
+            os.environ,
+            URL_BASE=f"http://127.0.0.1:{port}/api/1.0/",
+            WORKSPACE_GID="1100000000000000",
+            INFLUXDB_ENABLED="false",
+            METRICS_DIR=directory,
+            LOG_DIR=directory,
+            TRAFFIC_MODE="",
+            RATE_LIMIT_PER_SECOND="0",
+        )
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.suite", "--child", str(port), args.filter],
+            env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=True,
+        ).stdout
+    results = json.loads(output.splitlines()[-1])
+    for group, group_results in results.items():
+        print_results(group, group_results)
+    if args.compare:
+        print_comparison(results, json.loads(Path(args.compare).read_text()))
+    if args.output:
+        document = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }
+        Path(args.output).write_text(json.dumps(document, indent=2))
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        child(int(sys.argv[2]), sys.argv[3] if len(sys.argv) > 3 else "")
+    else:
+        main()
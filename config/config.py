@@ -1,13 +1,82 @@
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
 
 api_data = {}
-load_dotenv()
-_api_token = os.getenv("TOKEN_ASANA")
-url_base = os.getenv("URL_BASE")
-workspace_gid = os.getenv("WORKSPACE_GID")
-web_hook = os.getenv("WEB_HOOK")
-influxdb_token = os.getenv("INFLUXDB_TOKEN")
-
-headers = {"Authorization": f"Bearer {_api_token}"}
+# the relative paths of the cleanup journal and the traffic archive, shared by every run of the checkout,
+# are resolved from here, not from the current folder
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# settings resolved on first use: the first one read loads .env, each value is then cached in the module,
+# so `from config.config import url_base` keeps working and importing the module reads nothing
+_SETTINGS = {
+    "_api_token": lambda: os.getenv("TOKEN_ASANA"),
+    "url_base": lambda: os.getenv("URL_BASE"),
+    "workspace_gid": lambda: os.getenv("WORKSPACE_GID"),
+    "web_hook": lambda: os.getenv("WEB_HOOK"),
+    "influxdb_token": lambda: os.getenv("INFLUXDB_TOKEN"),
+    "influxdb_url": lambda: os.getenv("INFLUXDB_URL", "http://localhost:8086"),
+    "influxdb_enabled": lambda: os.getenv("INFLUXDB_ENABLED", "true").lower() == "true",
+    "influxdb_batch_size": lambda: int(os.getenv("INFLUXDB_BATCH_SIZE", "500")),
+    "influxdb_flush_interval": lambda: float(os.getenv("INFLUXDB_FLUSH_INTERVAL", "1.0")),
+    "influxdb_queue_size": lambda: int(os.getenv("INFLUXDB_QUEUE_SIZE", "10000")),
+    "metrics_dir": lambda: os.getenv("METRICS_DIR", ""),
+    "log_queue": lambda: os.getenv("LOG_QUEUE", "false").lower() == "true",
+    "log_level": lambda: os.getenv("LOG_LEVEL", "").upper(),
+    "log_dir": lambda: os.getenv("LOG_DIR", ""),
+    "latency_window_seconds": lambda: float(os.getenv("LATENCY_WINDOW_SECONDS", "0")),
+    "http_pool_size": lambda: int(os.getenv("HTTP_POOL_SIZE", "10")),
+    "http_keep_alive": lambda: os.getenv("HTTP_KEEP_ALIVE", "true").lower() == "true",
+    "http_warm_up_connections": lambda: int(os.getenv("HTTP_WARM_UP_CONNECTIONS", "0")),
+    "http_phase_timing": lambda: os.getenv("HTTP_PHASE_TIMING", "false").lower() == "true",
+    "http_transport": lambda: os.getenv("HTTP_TRANSPORT", "http1").lower(),
+    "rate_limit_per_second": lambda: float(os.getenv("RATE_LIMIT_PER_SECOND", "0")),
+    "rate_limit_burst": lambda: int(os.getenv("RATE_LIMIT_BURST", "10")),
+    "rate_limit_file": lambda: os.getenv("RATE_LIMIT_FILE", ""),
+    "rate_limit_max_retries": lambda: int(os.getenv("RATE_LIMIT_MAX_RETRIES", "3")),
+    "retry_max_retries": lambda: int(os.getenv("RETRY_MAX_RETRIES", "2")),
+    "retry_backoff_base": lambda: float(os.getenv("RETRY_BACKOFF_BASE", "0.5")),
+    "retry_backoff_max": lambda: float(os.getenv("RETRY_BACKOFF_MAX", "10")),
+    "retry_methods": lambda: [
+        method.strip().upper() for method in os.getenv("RETRY_METHODS", "GET,PUT,DELETE").split(",") if method.strip()
+    ],
+    "circuit_failure_threshold": lambda: int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+    "circuit_reset_seconds": lambda: float(os.getenv("CIRCUIT_RESET_SECONDS", "30")),
+    "resource_pool_projects": lambda: int(os.getenv("RESOURCE_POOL_PROJECTS", "0")),
+    "resource_pool_tasks": lambda: int(os.getenv("RESOURCE_POOL_TASKS", "0")),
+    "fixture_workers": lambda: int(os.getenv("FIXTURE_WORKERS", "4")),
+    "cleanup_journal": lambda: str(ROOT_DIR / os.getenv("CLEANUP_JOURNAL", ".cleanup_journal.jsonl")),
+    "cleanup_workers": lambda: int(os.getenv("CLEANUP_WORKERS", "4")),
+    "cleanup_retries": lambda: int(os.getenv("CLEANUP_RETRIES", "3")),
+    "traffic_mode": lambda: os.getenv("TRAFFIC_MODE", "").lower(),
+    "traffic_dir": lambda: str(ROOT_DIR / os.getenv("TRAFFIC_DIR", "traffic")),
+    "test_durations_file": lambda: os.getenv("TEST_DURATIONS_FILE", ".test_durations.json"),
+    "regression_gate": lambda: os.getenv("REGRESSION_GATE", "off").lower(),
+    "regression_source": lambda: os.getenv("REGRESSION_SOURCE", "influxdb").lower(),
+    "regression_threshold": lambda: float(os.getenv("REGRESSION_THRESHOLD", "0.2")),
+    "regression_alpha": lambda: float(os.getenv("REGRESSION_ALPHA", "0.05")),
+    "regression_baseline_days": lambda: float(os.getenv("REGRESSION_BASELINE_DAYS", "30")),
+    "regression_min_samples": lambda: int(os.getenv("REGRESSION_MIN_SAMPLES", "5")),
+    "test_data_seed": lambda: int(os.getenv("TEST_DATA_SEED", "0")),
+    "json_codec": lambda: os.getenv("JSON_CODEC", "auto").lower(),
+    "async_concurrency": lambda: int(os.getenv("ASYNC_CONCURRENCY", "100")),
+    "async_per_host_limit": lambda: int(os.getenv("ASYNC_PER_HOST_LIMIT", "0")),
+    "headers": lambda: {"Authorization": f"Bearer {_resolve('_api_token')}"},
+}
+_env_loaded = False
+
+
+def _resolve(name: str):
+    global _env_loaded
+    if not _env_loaded:
+        load_dotenv()
+        _env_loaded = True
+    value = globals()[name] = _SETTINGS[name]()
+    return value
+
+
+def __getattr__(name: str):
+    if name not in _SETTINGS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return _resolve(name)
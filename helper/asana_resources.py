@@ -0,0 +1,122 @@
+from config.config import url_base, headers, workspace_gid
+from helper.rest_client import RestClient
+from utils.logger import get_logger
+from utils.parallel import resource_name
+
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+# functions to create resources, used by the conftest fixtures and the load scenarios
+def create_project(rest_client: RestClient, name: str = "Test project from fixture") -> dict:
+    LOGGER.info("Create Project")
+    project_body = {
+        "data": {
+            "name": resource_name(name),
+            "workspace": f"{workspace_gid}"
+        }
+    }
+    response = rest_client.send_request("POST", url=f"{url_base}projects", headers=headers, body=project_body)
+    LOGGER.debug(response["body"])
+    return response
+
+def create_portfolio(rest_client: RestClient, name: str = "Test portfolio from fixture") -> dict:
+    LOGGER.info("Create Portfolio")
+    portfolio_body = {
+        "data": {
+            "name": resource_name(name),
+            "workspace": f"{workspace_gid}"
+        }
+    }
+    response = rest_client.send_request("POST", url=f"{url_base}portfolios", headers=headers, body=portfolio_body)
+    LOGGER.debug(response["body"])
+    return response
+
+def create_section(rest_client: RestClient, project_gid: str, name: str = "Test section from fixture") -> dict:
+    LOGGER.info("Create Section")
+    section_body = {
+        "data": {
+            "name": resource_name(name)
+        }
+    }
+    response = rest_client.send_request(
+        "POST", url=f"{url_base}projects/{project_gid}/sections", headers=headers, body=section_body
+    )
+    LOGGER.debug(response["body"])
+    return response
+
+def create_task(rest_client: RestClient, name: str = "Test task from fixture", projects: list | None = None) -> dict:
+    LOGGER.info("Create Task")
+    task_body = {
+        "data": {
+            "name": resource_name(name),
+            "workspace": workspace_gid
+        }
+    }
+    if projects:
+        task_body["data"]["projects"] = projects
+    response = rest_client.send_request("POST", url=f"{url_base}tasks", headers=headers, body=task_body)
+    LOGGER.debug(response["body"])
+    return response
+
+def add_task_to_section(rest_client: RestClient, task_gid: str, project_gid: str, section_gid: str) -> dict:
+    LOGGER.info("Add Task to Section")
+    url_add_task_to_project = f"{url_base}tasks/{task_gid}/addProject"
+    LOGGER.debug(f"URL ADD Task to Project Section: {url_add_task_to_project}")
+    add_task_to_project_body = {
+        "data": {
+            "project": project_gid,
+            "section": section_gid,
+        }
+    }
+    return rest_client.send_request("POST", url=url_add_task_to_project, headers=headers, body=add_task_to_project_body)
+
+def add_project_to_portfolio(rest_client: RestClient, portfolio_gid: str, project_gid: str) -> dict:
+    LOGGER.info("Add Project to Portfolio")
+    add_project_body = {
+        "data": {
+            "item": project_gid,
+        }
+    }
+    return rest_client.send_request(
+        "POST", url=f"{url_base}portfolios/{portfolio_gid}/addItem", headers=headers, body=add_project_body
+    )
+
+# functions to update resources, used by the resource pool to reset the fields changed by the tests
+def update_project(rest_client: RestClient, project_gid: str, data: dict) -> dict:
+    LOGGER.info("Update Project")
+    return update_resource(rest_client, "projects", project_gid, data)
+
+def update_section(rest_client: RestClient, section_gid: str, data: dict) -> dict:
+    LOGGER.info("Update Section")
+    return update_resource(rest_client, "sections", section_gid, data)
+
+def update_task(rest_client: RestClient, task_gid: str, data: dict) -> dict:
+    LOGGER.info("Update Task")
+    return update_resource(rest_client, "tasks", task_gid, data)
+
+def update_resource(rest_client: RestClient, resource: str, gid: str, data: dict) -> dict:
+    url_update = f"{url_base}{resource}/{gid}"
+    LOGGER.debug(f"=> Update: {url_update}")
+    return rest_client.send_request("PUT", url=url_update, headers=headers, body={"data": data})
+
+# functions to delete resources
+def delete_project(rest_client: RestClient, project_gid: str) -> dict:
+    LOGGER.info("Delete Project")
+    return delete_resource(rest_client, "projects", project_gid)
+
+def delete_portfolio(rest_client: RestClient, portfolio_gid: str) -> dict:
+    LOGGER.info("Delete Portfolio")
+    return delete_resource(rest_client, "portfolios", portfolio_gid)
+
+def delete_task(rest_client: RestClient, task_gid: str) -> dict:
+    LOGGER.info("Delete Task")
+    return delete_resource(rest_client, "tasks", task_gid)
+
+def delete_resource(rest_client: RestClient, resource: str, gid: str) -> dict:
+    url_delete = f"{url_base}{resource}/{gid}"
+    LOGGER.debug(f"=> Delete: {url_delete}")
+    response = rest_client.send_request("DELETE", url=url_delete, headers=headers)
+    LOGGER.debug(f"=> STATUS CODE: {response['status_code']}")
+    if response["status_code"] == 200:
+        LOGGER.debug(f"=> {resource} with GID {gid} deleted")
+    return response
@@ -0,0 +1,179 @@
+import asyncio
+from urllib.parse import urlsplit
+from config.config import async_concurrency, async_per_host_limit, rate_limit_max_retries
+from helper.retry import CircuitOpenError, default_retry_policies, get_shared_circuit_breaker
+from helper.traffic_archive import get_shared_archive
+from utils.json_codec import get_codec
+from utils.latency_histogram import LATENCY_RECORDER
+from utils.lazy_import import lazy_import
+from utils.logger import get_logger
+from utils.rate_limiter import get_shared_rate_limiter, parse_retry_after
+
+
+LOGGER = get_logger(__name__, "DEBUG")
+httpx = lazy_import("httpx")
+
+
+class AsyncRestClient:
+    def __init__(self, concurrency: int = async_concurrency, per_host_limit: int = async_per_host_limit) -> None:
+        """Asyncio client on httpx.AsyncClient, every request in flight is a coroutine of the event loop, not a
+           thread. It returns the same Response dict as RestClient, with its retry policies, circuit breaker,
+           rate limiter and latency recording
+
+        Args:
+            concurrency (int, optional): Max requests in flight, and connections. Defaults to ASYNC_CONCURRENCY.
+            per_host_limit (int, optional): Max requests in flight per host, 0 only applies the concurrency.
+                                            Defaults to ASYNC_PER_HOST_LIMIT.
+        """
+        self.concurrency = concurrency
+        self.per_host_limit = per_host_limit
+        self.retry_policies = default_retry_policies()
+        self.circuit_breaker = get_shared_circuit_breaker()
+        self.rate_limiter = get_shared_rate_limiter()
+        self.codec = get_codec()
+        if get_shared_archive() is not None:
+            LOGGER.warning("TRAFFIC_MODE is ignored by AsyncRestClient")
+        self.client = httpx.AsyncClient(
+            timeout=None,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._semaphore = None
+        self._host_semaphores = {}
+
+    async def send_request(self, method_name: str, url: str, headers: dict, body=None) -> dict:
+        """Sends the Request method and returns a modified Response, waiting while the limits are reached
+
+        Args:
+            method_name (str): HTTP method
+            url (str): Target URL
+            headers (dict): Cantains the headers for the request
+            body (dict | bytes, optional): Request Body, a dictionary or JSON already encoded. Defaults to None.
+
+        Returns:
+            dict: Updated Response with body, status_code, headers, time, request and retries
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        host = urlsplit(url).netloc
+        if self.per_host_limit and host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        async with self._semaphore:
+            if self.per_host_limit:
+                async with self._host_semaphores[host]:
+                    return await self._send_tracked(method_name, url, headers, body)
+            return await self._send_tracked(method_name, url, headers, body)
+
+    async def send_requests(self, requests: list) -> list:
+        """Sends several requests concurrently
+
+        Args:
+            requests (list): Tuples with method_name, url, headers and optionally body
+
+        Returns:
+            list: Updated Responses in the same order as the requests
+        """
+        return await asyncio.gather(*(self.send_request(*request) for request in requests))
+
+    async def close(self) -> None:
+        LOGGER.debug(f"Async client closed, max in flight: {self.max_in_flight}")
+        await self.client.aclose()
+
+    async def __aenter__(self) -> "AsyncRestClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _send_tracked(self, method_name: str, url: str, headers: dict, body) -> dict:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return await self._request(method_name, url, headers, body)
+        finally:
+            self.in_flight -= 1
+
+    async def _request(self, method_name: str, url: str, headers: dict, body) -> dict:
+        """Builds the Response dict of RestClient.send_request from the httpx Response"""
+        if body is not None:
+            if not isinstance(body, (bytes, bytearray)):
+                body = self.codec.dumps(body)
+            if not any(key.lower() == "content-type" for key in headers or {}):
+                headers = {**(headers or {}), "Content-Type": "application/json"}
+        response_updated = {"request": {"url": url, "method": method_name}}
+        response = None
+        try:
+            response, response_updated["retries"] = await self._send_with_retries(method_name, url, headers, body)
+            response_updated["status_code"] = response.status_code
+            response_updated["headers"] = dict(response.headers)
+            response_updated["time"] = response.elapsed.total_seconds()
+            response_updated["request"] = {"url": str(response.request.url), "method": response.request.method}
+            if response.is_error:
+                LOGGER.error(f"HTTP Error: {response.status_code} for url: {url}")
+            default = {"message": "HTTP Error" if response.is_error else "No body content"}
+            response_updated["body"] = self.codec.loads(response.content) if response.content else default
+        except (httpx.NetworkError, httpx.RemoteProtocolError, CircuitOpenError) as e:
+            # no Response: the connection failed or the circuit of the host is open
+            LOGGER.error(f"Connection Error: {e}")
+            response_updated.update(body={"message": "Connection Error"}, status_code=None, headers={})
+            response_updated["retries"] = getattr(e, "retries", 0)
+        except (httpx.HTTPError, ValueError) as e:
+            # timeouts have no Response, an invalid JSON body has one
+            LOGGER.error(f"Request Exception: {e}")
+            response_updated.update(body={"message": "Request Failed"}, headers={})
+            response_updated["status_code"] = response.status_code if response is not None else None
+            response_updated.setdefault("retries", getattr(e, "retries", 0))
+        if "time" in response_updated:
+            LATENCY_RECORDER.record(method_name, url, response_updated["time"], response_updated["retries"])
+        return response_updated
+
+    async def _send_with_retries(self, method_name: str, url: str, headers: dict, body) -> tuple:
+        """Sends the request through the circuit breaker of the host like RestClient, the backoff of the
+           retries waits without blocking the event loop
+
+        Returns:
+            tuple: Last httpx Response and number of retries
+
+        Raises:
+            httpx.HTTPError: Error of the last attempt, with the number of retries in its `retries` attribute
+        """
+        policy = self.retry_policies.get(method_name)
+        max_retries = policy.max_retries if policy is not None else 0
+        host = urlsplit(url).netloc
+        retries = 0
+        while True:
+            self.circuit_breaker.check(host)
+            try:
+                response = await self._send(method_name, url, headers, body)
+            except (httpx.TransportError, httpx.TimeoutException) as e:
+                e.retries = retries
+                self.circuit_breaker.record(host, success=False)
+                if retries >= max_retries:
+                    raise
+                LOGGER.warning(f"Retry {retries + 1} of {method_name} {url}: {e!r}")
+            except Exception:
+                # the trial request of a half open circuit must always be recorded
+                self.circuit_breaker.record(host, success=False)
+                raise
+            else:
+                self.circuit_breaker.record(host, success=response.status_code < 500)
+                if retries >= max_retries or response.status_code not in policy.statuses:
+                    return response, retries
+                LOGGER.warning(f"Retry {retries + 1} of {method_name} {url}: status {response.status_code}")
+            await asyncio.sleep(policy.delay(retries))
+            retries += 1
+
+    async def _send(self, method_name: str, url: str, headers: dict, body):
+        """Sends the request once the rate limiter gives a token, a 429 slows down the limiter of every process
+           and the request is sent again after its Retry-After, up to RATE_LIMIT_MAX_RETRIES times
+        """
+        if self.rate_limiter is None:
+            return await self.client.request(method_name, url, headers=headers, content=body)
+        for attempt in range(rate_limit_max_retries + 1):
+            # the wait for a token sleeps, so it runs outside the event loop
+            await asyncio.get_running_loop().run_in_executor(None, self.rate_limiter.acquire)
+            response = await self.client.request(method_name, url, headers=headers, content=body)
+            if response.status_code != 429 or attempt == rate_limit_max_retries:
+                return response
+            self.rate_limiter.throttle(parse_retry_after(response.headers.get("Retry-After")))
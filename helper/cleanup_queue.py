@@ -0,0 +1,272 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from helper.asana_resources import delete_resource
+from helper.rest_client import RestClient
+from helper.retry import RetryPolicy
+from utils.latency_histogram import LatencyHistogram
+from utils.logger import get_logger
+from config.config import cleanup_journal, cleanup_retries, cleanup_workers, retry_backoff_base, retry_backoff_max
+
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+# a resource already deleted, by a previous run or with its project, is not pending anymore
+DONE_STATUSES = (200, 404)
+COUNTERS = ("enqueued", "replayed", "deleted", "gone", "retries", "failed")
+
+_shared_queue = None
+_shared_queue_lock = threading.Lock()
+
+
+def read_pending(journal: str | Path) -> list:
+    """Returns the deletions of the journal that were never done
+
+    Args:
+        journal (str | Path): Journal file, a missing file has no pending deletions
+
+    Returns:
+        list: (resource, gid) in the order they were queued
+    """
+    pending = {}
+    try:
+        with open(journal, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # the last line of a run killed while writing it
+                    LOGGER.warning(f"Skipped a broken line of the cleanup journal {journal}")
+                    continue
+                key = (entry["resource"], entry["gid"])
+                if entry["op"] == "add":
+                    pending[key] = True
+                else:
+                    pending.pop(key, None)
+    except FileNotFoundError:
+        return []
+    return list(pending)
+
+
+def compact_journal(journal: str | Path) -> int:
+    """Rewrites the journal with the pending deletions only, and removes it when there are none
+
+    Args:
+        journal (str | Path): Journal file
+
+    Returns:
+        int: Deletions left in the journal
+    """
+    path = Path(journal)
+    pending = read_pending(path)
+    if not pending:
+        path.unlink(missing_ok=True)
+        return 0
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        for resource, gid in pending:
+            f.write(json.dumps({"op": "add", "resource": resource, "gid": gid}) + "\n")
+    os.replace(tmp_path, path)
+    return len(pending)
+
+
+class CleanupQueue:
+    def __init__(
+        self,
+        rest_client: RestClient,
+        journal: str | Path,
+        max_workers: int = 4,
+        retry_policy: RetryPolicy | None = None,
+    ) -> None:
+        """Deletes resources in the background, the test that queued them goes on at once.
+           Each deletion is written to the journal when queued and marked done when the resource is gone,
+           so the deletions left by a run that failed or was killed are sent again by replay on the next run
+
+        Args:
+            rest_client (RestClient): Client used to send the DELETE requests
+            journal (str | Path): Journal file, shared by the workers of a run
+            max_workers (int, optional): Deletes sent at the same time. Defaults to 4.
+            retry_policy (RetryPolicy, optional): Retries, after the ones of the RestClient, of the deletes that
+                                                  failed with a connection error, a 429 or a status of the
+                                                  policy. Defaults to 3 retries.
+        """
+        self.rest_client = rest_client
+        self.journal = Path(journal)
+        self.retry_policy = retry_policy or RetryPolicy(max_retries=3)
+        self.latency = LatencyHistogram()
+        self._lock = threading.Lock()
+        self._journal_file = None
+        self._futures = set()
+        self._deferred = []
+        self._counts = dict.fromkeys(COUNTERS, 0)
+        self._failures = []
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cleanup-queue")
+
+    def enqueue(self, resource: str, gid: str, defer: bool = False) -> None:
+        """Journals the deletion and sends it in the background
+
+        Args:
+            resource (str): Resource path in the API: projects, tasks, sections or portfolios
+            gid (str): GID of the resource
+            defer (bool, optional): Holds the delete until close, for a resource still in use, like the ones
+                                    of a load run. Defaults to False.
+        """
+        self._write({"op": "add", "resource": resource, "gid": gid})
+        with self._lock:
+            self._counts["enqueued"] += 1
+            if defer:
+                self._deferred.append((resource, gid))
+                return
+        self._submit(resource, gid)
+
+    def replay(self) -> int:
+        """Sends again the deletions left pending in the journal by previous runs
+
+        Returns:
+            int: Deletions replayed
+        """
+        pending = read_pending(self.journal)
+        if pending:
+            LOGGER.info(f"Replaying {len(pending)} deletions left in {self.journal}")
+        with self._lock:
+            self._counts["replayed"] += len(pending)
+        for resource, gid in pending:
+            self._submit(resource, gid)
+        return len(pending)
+
+    def drain(self) -> None:
+        """Waits for the deletions queued so far, including the retries, the deferred ones are sent by close"""
+        while True:
+            with self._lock:
+                futures = list(self._futures)
+            if not futures:
+                return
+            wait(futures)
+
+    def close(self, compact: bool = True) -> None:
+        """Sends the deferred deletions, waits for the pending ones and closes the journal
+
+        Args:
+            compact (bool, optional): Rewrites the journal with the deletions that failed, only once every
+                                      process of the run is done with it. Defaults to True.
+        """
+        with self._lock:
+            deferred, self._deferred = self._deferred, []
+        for resource, gid in deferred:
+            self._submit(resource, gid)
+        self.drain()
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            if self._journal_file is not None:
+                self._journal_file.close()
+                self._journal_file = None
+        if compact:
+            left = compact_journal(self.journal)
+            if left:
+                LOGGER.warning(f"{left} deletions left in {self.journal}, they are sent again on the next run")
+
+    def stats(self) -> dict:
+        """Returns the counters, the failed deletions and the latency of a deletion with its retries
+
+        Returns:
+            dict: enqueued, replayed, deleted, gone (404), retries, failed, failures as (resource, gid, status)
+                  and latency with count, p50, p90, p99 and max in seconds
+        """
+        with self._lock:
+            return {**self._counts, "failures": list(self._failures), "latency": self.latency.summary()}
+
+    def to_dict(self) -> dict:
+        """Returns the counters, failures and latency histogram as a JSON serializable dict"""
+        with self._lock:
+            return {**self._counts, "failures": list(self._failures), "latency": self.latency.to_dict()}
+
+    def merge(self, data: dict) -> None:
+        """Adds the counters, failures and latencies of another queue, from its to_dict
+
+        Args:
+            data (dict): Output of to_dict of the queue of a worker
+        """
+        with self._lock:
+            for counter in COUNTERS:
+                self._counts[counter] += data.get(counter, 0)
+            self._failures.extend(tuple(failure) for failure in data.get("failures", []))
+            self.latency.merge(LatencyHistogram.from_dict(data["latency"]))
+
+    def _submit(self, resource: str, gid: str) -> None:
+        future = self._executor.submit(self._delete, resource, gid)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._forget)
+
+    def _forget(self, future) -> None:
+        with self._lock:
+            self._futures.discard(future)
+
+    def _delete(self, resource: str, gid: str) -> None:
+        started = time.perf_counter()
+        status = None
+        for retry in range(self.retry_policy.max_retries + 1):
+            if retry:
+                time.sleep(self.retry_policy.delay(retry - 1))
+            try:
+                status = delete_resource(self.rest_client, resource, gid)["status_code"]
+            except Exception as e:  # a failed delete must stay in the journal, not stop the worker
+                LOGGER.error(f"Delete of {resource} {gid} raised {e!r}")
+                status = None
+            if status in DONE_STATUSES or not self._retryable(status):
+                break
+            with self._lock:
+                self._counts["retries"] += 1
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.latency.record(elapsed)
+            if status in DONE_STATUSES:
+                self._counts["deleted" if status == 200 else "gone"] += 1
+            else:
+                self._counts["failed"] += 1
+                self._failures.append((resource, gid, status))
+        if status in DONE_STATUSES:
+            self._write({"op": "done", "resource": resource, "gid": gid})
+        else:
+            LOGGER.error(f"Delete of {resource} {gid} failed with status {status}, left in {self.journal}")
+
+    def _retryable(self, status: int | None) -> bool:
+        return status is None or status == 429 or status in self.retry_policy.statuses
+
+    def _write(self, entry: dict) -> None:
+        # one write per line in append mode, so the workers of a run can share the journal
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            if self._journal_file is None:
+                self.journal.parent.mkdir(parents=True, exist_ok=True)
+                self._journal_file = open(self.journal, "a", encoding="utf-8")
+            self._journal_file.write(line)
+            self._journal_file.flush()
+
+
+def get_shared_cleanup_queue() -> CleanupQueue:
+    """Returns the cleanup queue shared by the fixtures and tests of the process
+
+    Returns:
+        CleanupQueue: Queue with the journal of CLEANUP_JOURNAL, CLEANUP_WORKERS and CLEANUP_RETRIES,
+                      built on first use
+    """
+    global _shared_queue
+    if _shared_queue is None:
+        with _shared_queue_lock:
+            if _shared_queue is None:
+                _shared_queue = CleanupQueue(
+                    RestClient(),
+                    cleanup_journal,
+                    max_workers=cleanup_workers,
+                    retry_policy=RetryPolicy(
+                        max_retries=cleanup_retries,
+                        backoff_base=retry_backoff_base,
+                        backoff_max=retry_backoff_max,
+                    ),
+                )
+    return _shared_queue
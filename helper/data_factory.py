@@ -0,0 +1,198 @@
+import math
+import os
+import random
+import threading
+from config.config import test_data_seed
+from utils.logger import get_logger
+from utils.parallel import worker_id
+
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+BATCH_SIZE = 256
+
+ADJECTIVES = (
+    "Amber", "Bold", "Brisk", "Bright", "Calm", "Clever", "Coral", "Crimson",
+    "Eager", "Fair", "Gentle", "Golden", "Grand", "Green", "Hidden", "Indigo",
+    "Keen", "Lively", "Lucky", "Mellow", "Noble", "Olive", "Prime", "Quiet",
+    "Rapid", "Silver", "Solid", "Steady", "Sunny", "Swift", "Vivid", "Wise",
+)
+NOUNS = (
+    "Anchor", "Arrow", "Beacon", "Bridge", "Canyon", "Cedar", "Comet", "Delta",
+    "Falcon", "Forest", "Glacier", "Harbor", "Horizon", "Island", "Lantern", "Maple",
+    "Meadow", "Orbit", "Otter", "Pioneer", "Prairie", "Quartz", "Raven", "Ridge",
+    "River", "Summit", "Signal", "Spruce", "Thunder", "Valley", "Willow", "Zephyr",
+)
+COMPANY_SUFFIXES = (
+    "Labs", "Group", "Systems", "Partners", "Works", "Holdings", "Studio", "Dynamics",
+    "Ventures", "Solutions", "Industries", "Networks", "Logistics", "Analytics", "Media", "Foods",
+)
+VERBS = (
+    "Review", "Update", "Draft", "Publish", "Prepare", "Schedule", "Archive", "Test",
+    "Design", "Deploy", "Audit", "Measure", "Plan", "Refactor", "Document", "Share",
+)
+STAGES = (
+    "Backlog", "Planned", "Ready", "Doing", "Review", "Blocked", "Testing", "Done",
+    "Inbox", "Later", "Next", "Waiting", "Ideas", "Release", "Support", "Research",
+)
+DEADLINES = (
+    "today", "tomorrow", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "the weekend",
+    "noon", "the demo", "the release", "the review", "next sprint", "the audit", "launch", "month end",
+)
+
+_LOWER_ADJECTIVES = tuple(word.lower() for word in ADJECTIVES)
+_LOWER_NOUNS = tuple(word.lower() for word in NOUNS)
+# name template and the word arrays of each kind, every combination of words is one name
+KINDS = {
+    "project": ("{0} {1} {2}", (ADJECTIVES, NOUNS, COMPANY_SUFFIXES)),
+    "task": ("{0} the {1} {2}", (VERBS, _LOWER_ADJECTIVES, _LOWER_NOUNS)),
+    "section": ("{0} {1} {2}", (STAGES, ADJECTIVES, NOUNS)),
+    "notes": ("{0} the {1} {2} before {3}.", (VERBS, _LOWER_ADJECTIVES, _LOWER_NOUNS, DEADLINES)),
+}
+
+_shared_factory = None
+_shared_factory_lock = threading.Lock()
+
+
+def worker_slot() -> tuple[int, int]:
+    """Returns the index of this pytest-xdist worker and the number of workers of the run
+
+    Returns:
+        tuple[int, int]: Index like 2 for gw2 and worker count, (0, 1) without workers
+    """
+    worker = worker_id()
+    if not worker.startswith("gw"):
+        return 0, 1
+    index = int(worker[2:])
+    return index, int(os.getenv("PYTEST_XDIST_WORKER_COUNT", index + 1))
+
+
+class NameStream:
+    """Unique names of one kind, every position maps to a different combination of the word arrays
+
+    The positions go through a permutation n -> (multiplier * n + offset) mod size picked from the seed, so the
+    names look shuffled but the same seed always gives the same order. Each worker takes the positions
+    index, index + count, index + 2 * count... so no two workers of a run get the same name. After the last
+    combination the names repeat with a number suffix, still unique.
+    """
+
+    def __init__(self, kind: str, seed: int, worker_index: int = 0, worker_count: int = 1):
+        self.template, self.words = KINDS[kind]
+        self.size = math.prod(len(words) for words in self.words)
+        rng = random.Random(f"{seed}-{kind}")
+        self.multiplier = rng.randrange(1, self.size)
+        while math.gcd(self.multiplier, self.size) != 1:
+            self.multiplier = rng.randrange(1, self.size)
+        self.offset = rng.randrange(self.size)
+        self.worker_index = worker_index
+        self.worker_count = worker_count
+        self.drawn = 0
+
+    def name(self, position: int) -> str:
+        """Returns the name at a position of the stream of every worker
+
+        Args:
+            position (int): Position in the run, the worker positions are interleaved
+
+        Returns:
+            str: Name like 'Amber Falcon Labs', with a number after the first round of combinations
+        """
+        cycle, position = divmod(position, self.size)
+        slot = (self.multiplier * position + self.offset) % self.size
+        parts = []
+        for words in reversed(self.words):
+            slot, index = divmod(slot, len(words))
+            parts.append(words[index])
+        name = self.template.format(*reversed(parts))
+        return f"{name} {cycle + 1}" if cycle else name
+
+    def batch(self, count: int) -> list:
+        """Returns the next names of this worker
+
+        Args:
+            count (int): Number of names
+
+        Returns:
+            list: Names in order
+        """
+        start = self.drawn
+        self.drawn += count
+        return [
+            self.name(drawn * self.worker_count + self.worker_index) for drawn in range(start, start + count)
+        ]
+
+
+class DataFactory:
+    """Seeded test data for the request bodies, generated in batches ahead of the tests that use it"""
+
+    def __init__(self, seed: int = None, worker_index: int = None, worker_count: int = None,
+                 batch_size: int = BATCH_SIZE):
+        """
+        Args:
+            seed (int): Seed of the names, TEST_DATA_SEED by default
+            worker_index (int): Index of this worker, read from pytest-xdist by default
+            worker_count (int): Number of workers of the run, read from pytest-xdist by default
+            batch_size (int): Names generated at once for each kind
+        """
+        default_index, default_count = worker_slot()
+        self.seed = test_data_seed if seed is None else seed
+        self.batch_size = batch_size
+        self._streams = {
+            kind: NameStream(
+                kind,
+                self.seed,
+                default_index if worker_index is None else worker_index,
+                default_count if worker_count is None else worker_count,
+            )
+            for kind in KINDS
+        }
+        self._names = {kind: [] for kind in KINDS}
+        self._lock = threading.Lock()
+
+    def fill(self) -> None:
+        """Generates a batch of every kind, for example before the timed part of a run"""
+        with self._lock:
+            for kind in KINDS:
+                self._fill(kind)
+
+    def _fill(self, kind: str) -> None:
+        # names are popped from the end, keep them in stream order
+        self._names[kind][:0] = reversed(self._streams[kind].batch(self.batch_size))
+
+    def _next(self, kind: str) -> str:
+        with self._lock:
+            if not self._names[kind]:
+                self._fill(kind)
+            return self._names[kind].pop()
+
+    def project_name(self) -> str:
+        """Returns a unique company like project name such as 'Amber Falcon Labs'"""
+        return self._next("project")
+
+    def task_name(self) -> str:
+        """Returns a unique task name such as 'Review the amber falcon'"""
+        return self._next("task")
+
+    def section_name(self) -> str:
+        """Returns a unique section name such as 'Backlog Amber Falcon'"""
+        return self._next("section")
+
+    def notes(self) -> str:
+        """Returns a unique sentence for notes such as 'Review the amber falcon before Friday.'"""
+        return self._next("notes")
+
+
+def get_shared_data_factory() -> DataFactory:
+    """Returns the data factory of the process, so the test classes of a worker never repeat a name
+
+    Returns:
+        DataFactory: Factory seeded with TEST_DATA_SEED, built and filled on first use
+    """
+    global _shared_factory
+    if _shared_factory is None:
+        with _shared_factory_lock:
+            if _shared_factory is None:
+                _shared_factory = DataFactory()
+                _shared_factory.fill()
+                LOGGER.debug("Test data seed %s, worker slot %s", _shared_factory.seed, worker_slot())
+    return _shared_factory
@@ -0,0 +1,169 @@
+import asyncio
+import datetime
+import threading
+import time
+import requests
+from requests.structures import CaseInsensitiveDict
+from utils.latency_histogram import LatencyHistogram
+from utils.lazy_import import lazy_import
+from utils.logger import get_logger
+
+
+LOGGER = get_logger(__name__, "DEBUG")
+httpx = lazy_import("httpx")
+
+
+class Http2Session:
+    def __init__(self, max_connections: int = 1, timeout: float | None = None) -> None:
+        """Session with the get, post, put and delete of requests.Session over HTTP/2, the requests of every
+           thread are concurrent streams of one connection per host. http:// URLs use HTTP/2 without TLS
+           (prior knowledge), https:// URLs negotiate HTTP/2 with ALPN.
+           The connection is owned by an event loop in a background thread: the sync HTTP/2 connection of
+           httpcore can send the streams of several threads out of order, which the server rejects
+
+        Args:
+            max_connections (int, optional): Connections per host, a new one is only opened when the streams
+                                             of the others reach the limit of the server. Defaults to 1.
+            timeout (float, optional): Seconds to connect, read or write, None waits forever like requests.
+                                       Defaults to None.
+        """
+        self.archive = None
+        self.max_connections = max_connections
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="http2-session", daemon=True)
+        self._thread.start()
+        self._client = self._run(self._create_client(max_connections, timeout))
+        self._lock = threading.Lock()
+        self._latency = LatencyHistogram()
+        self.requests = 0
+        self.new_connections = 0
+        self.streams_in_flight = 0
+        self.max_concurrent_streams = 0
+
+    def request(self, method: str, url: str, headers: dict | None = None, data=None, **kwargs) -> requests.Response:
+        """Sends the request as one stream and returns it as a requests.Response
+
+        Args:
+            method (str): HTTP method
+            url (str): Target URL
+            headers (dict, optional): Request headers. Defaults to None.
+            data (bytes, optional): Encoded body. Defaults to None.
+
+        Returns:
+            requests.Response: Response with status_code, headers, content, elapsed and request
+
+        Raises:
+            requests.exceptions.ConnectionError: When the connection fails or the server closes it
+            requests.exceptions.Timeout: When the timeout is reached
+        """
+        try:
+            response, elapsed = self._run(self._stream(method, url, headers, data))
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except (httpx.NetworkError, httpx.RemoteProtocolError) as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        except httpx.HTTPError as e:
+            raise requests.exceptions.RequestException(str(e)) from e
+        return self._to_requests_response(method, url, headers, data, response, elapsed)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", url, **kwargs)
+
+    def warm_up(self, url: str, connections: int) -> None:
+        """Opens the connection to the host of the URL with a HEAD request, one connection carries every stream
+
+        Args:
+            url (str): URL of the host to connect
+            connections (int): Ignored, kept for the interface of PooledSession
+        """
+        LOGGER.info(f"Warm up the HTTP/2 connection to {url}")
+        try:
+            self._run(self._client.head(url, extensions={"trace": self._trace}))
+        except httpx.HTTPError as e:
+            LOGGER.error(f"Warm up Error: {e}")
+
+    def stats(self) -> dict:
+        """Counts the streams sent, the connections opened and the streams in flight at the same time
+
+        Returns:
+            dict: requests, new_connections, max_concurrent_streams and stream_latency with count, p50, p90,
+                  p99 and max in seconds
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "max_concurrent_streams": self.max_concurrent_streams,
+                "stream_latency": self._latency.summary(),
+            }
+
+    def close(self) -> None:
+        if self._loop.is_closed():
+            return
+        self._run(self._client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    @staticmethod
+    async def _create_client(max_connections: int, timeout: float | None):
+        return httpx.AsyncClient(
+            http1=False,
+            http2=True,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def _stream(self, method: str, url: str, headers: dict | None, data) -> tuple:
+        """Sends one request in the event loop and returns the httpx Response and the seconds of the stream"""
+        with self._lock:
+            self.streams_in_flight += 1
+            self.max_concurrent_streams = max(self.max_concurrent_streams, self.streams_in_flight)
+        started = time.perf_counter()
+        try:
+            response = await self._client.request(
+                method, url, headers=headers, content=data, extensions={"trace": self._trace}
+            )
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.streams_in_flight -= 1
+                self.requests += 1
+                self._latency.record(elapsed)
+        return response, elapsed
+
+    async def _trace(self, event_name: str, info: dict) -> None:
+        # httpcore reports each TCP connection it opens
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.new_connections += 1
+
+    @staticmethod
+    def _to_requests_response(method: str, url: str, headers: dict | None, data, response, elapsed: float):
+        prepared = requests.PreparedRequest()
+        prepared.method = method
+        prepared.url = url
+        prepared.headers = CaseInsensitiveDict(headers or {})
+        prepared.body = data
+        converted = requests.Response()
+        converted.status_code = response.status_code
+        converted.headers = CaseInsensitiveDict(response.headers.items())
+        converted._content = response.content
+        converted.encoding = response.charset_encoding
+        converted.reason = response.reason_phrase
+        converted.url = url
+        converted.request = prepared
+        converted.elapsed = datetime.timedelta(seconds=elapsed)
+        return converted
@@ -0,0 +1,310 @@
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util import parse_url
+from config.config import http_pool_size, http_keep_alive, http_phase_timing, http_transport
+from helper.traffic_archive import TrafficArchive, get_shared_archive
+from utils.logger import get_logger
+
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+# timing of the request sent by the current thread, set by PooledAdapter when phase timing is enabled
+_current = threading.local()
+
+PHASES = ("dns", "connect", "tls", "ttfb", "download")
+
+
+class RequestTiming:
+    """Seconds spent in each phase of one request, connection phases are 0 when a pooled connection is reused"""
+
+    __slots__ = PHASES + ("connected_at", "sent_at")
+
+    def __init__(self) -> None:
+        for phase in PHASES:
+            setattr(self, phase, 0.0)
+        self.connected_at = 0.0
+        self.sent_at = 0.0
+
+    def as_dict(self) -> dict:
+        return {phase: getattr(self, phase) for phase in PHASES}
+
+
+class TimingConnectionMixin:
+    """Records DNS, TCP connect, TLS handshake and time to first byte in the timing of the current thread"""
+
+    def _new_conn(self):
+        timing = getattr(_current, "timing", None)
+        if timing is None:
+            return super()._new_conn()
+        started = time.perf_counter()
+        dns_host = self._dns_host
+        try:
+            # resolved once here so the DNS lookup is not counted as connect time
+            self._dns_host = socket.getaddrinfo(dns_host, self.port, 0, socket.SOCK_STREAM)[0][4][0]
+        except OSError:
+            pass
+        resolved = time.perf_counter()
+        try:
+            sock = super()._new_conn()
+        finally:
+            self._dns_host = dns_host
+        timing.dns = resolved - started
+        timing.connect = time.perf_counter() - resolved
+        return sock
+
+    def connect(self) -> None:
+        timing = getattr(_current, "timing", None)
+        started = time.perf_counter()
+        super().connect()
+        if timing is not None:
+            timing.connected_at = time.perf_counter()
+            if isinstance(self, HTTPSConnection):
+                timing.tls = max(timing.connected_at - started - timing.dns - timing.connect, 0.0)
+
+    def request(self, *args, **kwargs) -> None:
+        timing = getattr(_current, "timing", None)
+        if timing is not None:
+            timing.sent_at = time.perf_counter()
+        super().request(*args, **kwargs)
+
+    def getresponse(self):
+        response = super().getresponse()
+        timing = getattr(_current, "timing", None)
+        if timing is not None:
+            timing.ttfb = time.perf_counter() - max(timing.sent_at, timing.connected_at)
+        return response
+
+
+
+class CountingConnectionMixin:
+    on_connect = None
+
+    def connect(self) -> None:
+        super().connect()
+        if self.on_connect is not None:
+            self.on_connect()
+
+
+class CountingHTTPConnection(CountingConnectionMixin, TimingConnectionMixin, HTTPConnection):
+    pass
+
+
+class CountingHTTPSConnection(CountingConnectionMixin, TimingConnectionMixin, HTTPSConnection):
+    pass
+
+
+class CountingPoolMixin:
+    """Counts the sockets opened by the connections of the pool, including reconnects of dropped connections"""
+
+    num_connects = 0
+
+    def _new_conn(self):
+        conn = super()._new_conn()
+        conn.on_connect = self._count_connect
+        return conn
+
+    def _count_connect(self) -> None:
+        self.num_connects += 1
+
+
+class CountingHTTPConnectionPool(CountingPoolMixin, HTTPConnectionPool):
+    ConnectionCls = CountingHTTPConnection
+
+
+class CountingHTTPSConnectionPool(CountingPoolMixin, HTTPSConnectionPool):
+    ConnectionCls = CountingHTTPSConnection
+
+
+class PooledAdapter(HTTPAdapter):
+    def __init__(
+        self, *args, phase_timing: bool = False, archive: TrafficArchive | None = None, **kwargs
+    ) -> None:
+        """Adapter with counting connection pools
+
+        Args:
+            phase_timing (bool, optional): Attach the RequestTiming of each request to the Response as
+                                           `timing`. Defaults to False.
+            archive (TrafficArchive, optional): Archive that records the responses, or serves them without
+                                                network in replay mode. Defaults to None.
+        """
+        self.phase_timing = phase_timing
+        self.archive = archive
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, stream=False, **kwargs):
+        if self.archive is None:
+            return self._send(request, stream=stream, **kwargs)
+        if self.archive.replaying:
+            return self.archive.replay(request)
+        response = self._send(request, stream=stream, **kwargs)
+        self.archive.record(request, response)
+        return response
+
+    def _send(self, request, stream=False, **kwargs):
+        if not self.phase_timing:
+            return super().send(request, stream=stream, **kwargs)
+        _current.timing = timing = RequestTiming()
+        try:
+            response = super().send(request, stream=stream, **kwargs)
+            if not stream:
+                started = time.perf_counter()
+                response.content
+                timing.download = time.perf_counter() - started
+        finally:
+            _current.timing = None
+        response.timing = timing
+        return response
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": CountingHTTPConnectionPool,
+            "https": CountingHTTPSConnectionPool,
+        }
+
+
+class PooledSession(requests.Session):
+    def __init__(
+        self,
+        pool_size: int = 10,
+        keep_alive: bool = True,
+        phase_timing: bool = False,
+        archive: TrafficArchive | None = None,
+    ) -> None:
+        """Session whose connections are kept in a pool and reused between requests
+
+        Args:
+            pool_size (int, optional): Connections kept open per host. Defaults to 10.
+            keep_alive (bool, optional): Reuse connections, when False every request closes its connection.
+                                         Defaults to True.
+            phase_timing (bool, optional): Time DNS, connect, TLS, time to first byte and download of each
+                                           request. Defaults to False.
+            archive (TrafficArchive, optional): Record the responses to the archive, or replay them from it.
+                                                Defaults to None.
+        """
+        super().__init__()
+        self.pool_size = pool_size
+        self.warmed_connections = 0
+        self._warm_up_requests = 0
+        self.archive = archive
+        adapter = PooledAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, phase_timing=phase_timing, archive=archive
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        if not keep_alive:
+            self.headers["Connection"] = "close"
+
+    def warm_up(self, url: str, connections: int) -> None:
+        """Opens connections to the host of the URL in parallel and leaves them in the pool,
+           so the first requests skip the TCP and TLS handshakes. Each connection sends one HEAD request
+           and keeps its response until every request is answered, so no request reuses another one's connection
+
+        Args:
+            url (str): URL of the host to connect
+            connections (int): Number of connections to open, limited by the pool size
+        """
+        if self.archive is not None and self.archive.replaying:
+            return
+        connections = min(connections, self.pool_size)
+        LOGGER.info(f"Warm up {connections} connections to {url}")
+        request = requests.Request("HEAD", url).prepare()
+        # same TLS settings as a request of the session, so the warmed pool is the one the requests use
+        settings = self.merge_environment_settings(url, {}, None, None, None)
+        pool = self.get_adapter(url).get_connection_with_tls_context(
+            request, verify=settings["verify"], proxies=settings["proxies"], cert=settings["cert"]
+        )
+        path = parse_url(url).request_uri
+
+        def open_connection(_):
+            try:
+                return pool.urlopen("HEAD", path, retries=False, redirect=False, preload_content=False)
+            except (urllib3.exceptions.HTTPError, OSError) as e:
+                LOGGER.error(f"Warm up Error: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            responses = [response for response in executor.map(open_connection, range(connections)) if response]
+        for response in responses:
+            response.drain_conn()
+            response.release_conn()
+        self.warmed_connections += len(responses)
+        self._warm_up_requests += connections
+
+    def stats(self) -> dict:
+        """Counts requests sent through the pools, new connections opened and requests that reused one
+
+        Returns:
+            dict: requests without the warm up ones, new_connections, warmed_connections and pool_hits
+        """
+        total_requests = 0
+        new_connections = 0
+        for adapter in set(self.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    total_requests += pool.num_requests
+                    new_connections += pool.num_connects
+        # the warm up requests are not counted, the first request on a warmed connection is a hit
+        requests_sent = total_requests - self._warm_up_requests
+        return {
+            "requests": requests_sent,
+            "new_connections": new_connections,
+            "warmed_connections": self.warmed_connections,
+            "pool_hits": requests_sent - new_connections + self.warmed_connections,
+        }
+
+
+def create_session(transport: str = "http1"):
+    """Builds a session for RestClient with the HTTP settings of the configuration
+
+    Args:
+        transport (str, optional): http1 for a PooledSession with HTTP_POOL_SIZE, HTTP_KEEP_ALIVE,
+                                   HTTP_PHASE_TIMING and the archive of TRAFFIC_MODE, http2 for an Http2Session,
+                                   without archive or phase timing. Defaults to "http1".
+
+    Returns:
+        PooledSession | Http2Session: New session
+
+    Raises:
+        ValueError: When the transport is not http1 or http2
+    """
+    if transport == "http2":
+        # httpx is only needed by the HTTP/2 transport
+        from helper.http2_session import Http2Session
+
+        if get_shared_archive() is not None:
+            LOGGER.warning("TRAFFIC_MODE is ignored by the HTTP/2 transport")
+        return Http2Session()
+    if transport != "http1":
+        raise ValueError(f"Unknown HTTP transport {transport!r}, expected http1 or http2")
+    return PooledSession(
+        pool_size=http_pool_size,
+        keep_alive=http_keep_alive,
+        phase_timing=http_phase_timing,
+        archive=get_shared_archive(),
+    )
+
+
+def get_shared_session():
+    """Returns the session shared by every RestClient of the process
+
+    Returns:
+        PooledSession | Http2Session: Shared session of HTTP_TRANSPORT, built on first use
+    """
+    global _shared_session
+    if _shared_session is None:
+        with _shared_session_lock:
+            if _shared_session is None:
+                _shared_session = create_session(http_transport)
+    return _shared_session
@@ -0,0 +1,148 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from utils.logger import get_logger
+
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+
+class ResourceNode:
+    __slots__ = ("name", "create", "delete", "depends")
+
+    def __init__(self, name: str, create, delete=None, depends: tuple = ()) -> None:
+        """Resource created for a test
+
+        Args:
+            name (str): Name of the fixture that gives the resource
+            create (callable): Called with the values of the dependencies and the parameters of resolve as keyword
+                               arguments, returns the value
+            delete (callable, optional): Called with the value and the parameters of teardown after the test.
+                                         Defaults to None.
+            depends (tuple, optional): Names of the resources it needs. Defaults to ().
+        """
+        self.name = name
+        self.create = create
+        self.delete = delete
+        self.depends = tuple(depends)
+
+
+class ResourceGraph:
+    def __init__(self, max_workers: int = 4) -> None:
+        """Dependency graph of the resources created by the fixtures. The resources of a test are created as soon
+           as their dependencies exist, so independent ones are created at the same time and the setup takes as
+           long as the longest chain of dependencies. Deletes run the same way, from the dependents up
+
+        Args:
+            max_workers (int, optional): Resources created or deleted at the same time, 1 creates them one
+                                         after another. Defaults to 4.
+        """
+        self.max_workers = max_workers
+        self._nodes = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="resource-graph")
+
+    def add(self, name: str, create, delete=None, depends: tuple = ()) -> None:
+        """Adds a resource, its dependencies must be added before it
+
+        Raises:
+            ValueError: When a dependency is unknown, so the graph can not have cycles
+        """
+        unknown = [dependency for dependency in depends if dependency not in self._nodes]
+        if unknown:
+            raise ValueError(f"Resource {name} depends on unknown resources {unknown}")
+        self._nodes[name] = ResourceNode(name, create, delete, depends)
+
+    @property
+    def names(self) -> list:
+        return list(self._nodes)
+
+    def closure(self, names) -> list:
+        """Returns the resources and all their dependencies, each one after its dependencies
+
+        Args:
+            names (Iterable): Names of resources, names that are not in the graph are skipped
+
+        Returns:
+            list: Names in creation order
+        """
+        ordered = []
+
+        def visit(name):
+            if name in ordered:
+                return
+            for dependency in self._nodes[name].depends:
+                visit(dependency)
+            ordered.append(name)
+
+        for name in names:
+            if name in self._nodes:
+                visit(name)
+        return ordered
+
+    def resolve(self, names, **params) -> dict:
+        """Creates the resources and their dependencies, each one as soon as its dependencies exist.
+           When a creation fails, the resources already created are deleted and the error is raised
+
+        Args:
+            names (Iterable): Names of the resources needed
+            **params: Keyword arguments given to every create, like the lease mode of the test
+
+        Returns:
+            dict: Value of each resource created, in creation order
+        """
+        pending = self.closure(names)
+        values = {}
+        running = {}
+        started = time.perf_counter()
+        try:
+            while pending or running:
+                for name in [name for name in pending if all(d in values for d in self._nodes[name].depends)]:
+                    pending.remove(name)
+                    node = self._nodes[name]
+                    kwargs = {**params, **{dependency: values[dependency] for dependency in node.depends}}
+                    running[self._executor.submit(node.create, **kwargs)] = name
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    values[running.pop(future)] = future.result()
+        except BaseException:
+            wait(running)
+            for future, name in running.items():
+                if future.exception() is None:
+                    values[name] = future.result()
+            self.teardown(values, **params)
+            raise
+        LOGGER.debug(f"Resources {list(values)} created in {time.perf_counter() - started:.3f} s")
+        return values
+
+    def teardown(self, values: dict, **params) -> None:
+        """Deletes the resources created by resolve, each one once the resources that depend on it are deleted.
+           A failed delete is logged and does not stop the others
+
+        Args:
+            values (dict): Value of each resource returned by resolve
+            **params: Keyword arguments given to every delete
+        """
+        dependents = {name: {other for other in values if name in self._nodes[other].depends} for name in values}
+        deleted = set()
+        running = {}
+        started = time.perf_counter()
+        while len(deleted) < len(values):
+            for name in values:
+                if name in deleted or name in running.values() or not dependents[name] <= deleted:
+                    continue
+                delete = self._nodes[name].delete
+                if delete is None:
+                    deleted.add(name)
+                else:
+                    running[self._executor.submit(delete, values[name], **params)] = name
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                deleted.add(name)
+                if future.exception() is not None:
+                    LOGGER.error(f"Delete of {name} failed: {future.exception()}")
+        LOGGER.debug(f"Resources {list(values)} deleted in {time.perf_counter() - started:.3f} s")
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,225 @@
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from helper import asana_resources
+from helper.cleanup_queue import CleanupQueue
+from helper.rest_client import RestClient
+from utils.logger import get_logger
+
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+# how a test uses the resources of its fixtures, set with the readonly and destructive markers
+READONLY = "readonly"
+MUTABLE = "mutable"
+DESTRUCTIVE = "destructive"
+
+KINDS = ("projects", "sections", "tasks")
+# fields the tests change, restored with the original name before a resource goes back to the pool
+RESET_FIELDS = {
+    "projects": {"notes": "", "color": None, "default_view": "list"},
+    "sections": {},
+    "tasks": {"notes": "", "completed": False},
+}
+
+
+def lease_mode(node) -> str:
+    """Returns how the test uses its resources from its markers, mutable when it has none
+
+    Args:
+        node (pytest.Item): Test item
+
+    Returns:
+        str: readonly, mutable or destructive
+    """
+    for mode in (DESTRUCTIVE, READONLY):
+        if node.get_closest_marker(mode) is not None:
+            return mode
+    return MUTABLE
+
+
+class ResourcePool:
+    def __init__(
+        self,
+        rest_client: RestClient,
+        projects: int = 0,
+        tasks: int = 0,
+        max_workers: int = 8,
+        cleanup_queue: CleanupQueue | None = None,
+    ) -> None:
+        """Projects, each with one section, and tasks created ahead of the tests and leased to their fixtures
+
+        Readonly tests get a pooled resource as it is, mutable tests get one that is reset when they finish,
+        destructive tests get one never used before and it is deleted afterwards. A resource is created on the
+        spot when the pool has none left (a miss), so a pool of size 0 creates and deletes one per test.
+
+        Args:
+            rest_client (RestClient): Client used to create, reset and delete the resources
+            projects (int, optional): Projects kept in the pool. Defaults to 0.
+            tasks (int, optional): Tasks kept in the pool. Defaults to 0.
+            max_workers (int, optional): Resources created or deleted at the same time. Defaults to 8.
+            cleanup_queue (CleanupQueue, optional): Queue of the deletes, sent in the background instead of
+                                                    during the release. Defaults to None.
+        """
+        self.rest_client = rest_client
+        self.sizes = {"projects": projects, "tasks": tasks}
+        self.max_workers = max_workers
+        self.cleanup_queue = cleanup_queue
+        self._lock = threading.Lock()
+        # never leased resources, and resources given back by readonly or mutable tests
+        self._fresh = {kind: deque() for kind in self.sizes}
+        self._recycled = {kind: deque() for kind in self.sizes}
+        # shared by the fixture threads and the creations of the executor, only used under the lock
+        self._names = {}
+        self._sections = {}
+        self._leased = {}
+        self._stats = {kind: dict.fromkeys(("hits", "misses", "resets", "discarded"), 0) for kind in KINDS}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="resource-pool")
+
+    def fill(self) -> None:
+        """Creates the resources of the pool concurrently and waits for them"""
+        futures = [
+            self._executor.submit(self._replenish, kind)
+            for kind, size in self.sizes.items()
+            for _ in range(size)
+        ]
+        wait(futures)
+        LOGGER.info(f"Resource pool filled: { {kind: len(self._fresh[kind]) for kind in self.sizes} }")
+
+    def acquire(self, kind: str, mode: str = MUTABLE) -> str:
+        """Leases a project or a task
+
+        Args:
+            kind (str): projects or tasks
+            mode (str, optional): readonly, mutable or destructive. Defaults to MUTABLE.
+
+        Returns:
+            str: GID of the resource
+        """
+        with self._lock:
+            if mode == DESTRUCTIVE:
+                free = self._fresh[kind]
+            else:
+                free = self._recycled[kind] or self._fresh[kind]
+            gid = free.popleft() if free else None
+            self._stats[kind]["hits" if gid else "misses"] += 1
+        if gid is None:
+            create = asana_resources.create_project if kind == "projects" else asana_resources.create_task
+            gid = create(self.rest_client)["body"]["data"]["gid"]
+        elif mode == DESTRUCTIVE:
+            self._executor.submit(self._replenish, kind)
+        with self._lock:
+            self._leased[gid] = gid in self._names
+        return gid
+
+    def acquire_section(self, project_gid: str, mode: str = MUTABLE) -> str:
+        """Leases the section created with a pooled project, or creates one in the project
+
+        Args:
+            project_gid (str): GID of a leased project
+            mode (str, optional): readonly, mutable or destructive. Defaults to MUTABLE.
+
+        Returns:
+            str: GID of the section
+        """
+        with self._lock:
+            section_gid = self._sections.get(project_gid)
+            self._stats["sections"]["hits" if section_gid else "misses"] += 1
+        if section_gid is None:
+            response = asana_resources.create_section(self.rest_client, project_gid)
+            section_gid = response["body"]["data"]["gid"]
+        with self._lock:
+            self._leased[section_gid] = section_gid in self._names
+        return section_gid
+
+    def release(self, kind: str, gid: str, mode: str = MUTABLE) -> None:
+        """Gives back a leased resource: it is reset and pooled again, or deleted
+
+        Args:
+            kind (str): projects, sections or tasks
+            gid (str): GID of the resource
+            mode (str, optional): Mode used to acquire it. Defaults to MUTABLE.
+        """
+        with self._lock:
+            pooled = self._leased.pop(gid, False)
+        if kind == "sections":
+            # sections are deleted with their project, which gets a new one on its next lease
+            if pooled and mode == MUTABLE and not self._reset(kind, gid):
+                with self._lock:
+                    for project, section in list(self._sections.items()):
+                        if section == gid:
+                            del self._sections[project]
+            return
+        if not pooled or mode == DESTRUCTIVE:
+            self._forget(gid)
+            self._delete(kind, gid)
+            return
+        if mode == MUTABLE and not self._reset(kind, gid):
+            self._executor.submit(self._replenish, kind)
+            return
+        with self._lock:
+            self._recycled[kind].append(gid)
+
+    def stats(self) -> dict:
+        """Returns hits, misses, resets and discarded resources of each kind"""
+        with self._lock:
+            return {kind: dict(stats) for kind, stats in self._stats.items()}
+
+    def close(self) -> None:
+        """Waits for the pending creations and deletes the resources left in the pool"""
+        self._executor.shutdown(wait=True)
+        gids = [(kind, gid) for kind in self.sizes for gid in (*self._fresh[kind], *self._recycled[kind])]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for kind, gid in gids:
+                executor.submit(self._delete, kind, gid)
+        for kind in self.sizes:
+            self._fresh[kind].clear()
+            self._recycled[kind].clear()
+
+    def _create(self, kind: str) -> str | None:
+        if kind == "projects":
+            response = asana_resources.create_project(self.rest_client, "Pooled project")
+        else:
+            response = asana_resources.create_task(self.rest_client, "Pooled task")
+        if response.get("status_code") != 201:
+            LOGGER.error(f"Resource pool could not create {kind}: {response.get('body')}")
+            return None
+        data = response["body"]["data"]
+        with self._lock:
+            self._names[data["gid"]] = data["name"]
+        if kind == "projects":
+            section = asana_resources.create_section(self.rest_client, data["gid"], "Pooled section")["body"]["data"]
+            with self._lock:
+                self._names[section["gid"]] = section["name"]
+                self._sections[data["gid"]] = section["gid"]
+        return data["gid"]
+
+    def _delete(self, kind: str, gid: str) -> None:
+        if self.cleanup_queue is not None:
+            self.cleanup_queue.enqueue(kind, gid)
+        else:
+            asana_resources.delete_resource(self.rest_client, kind, gid)
+
+    def _forget(self, gid: str) -> None:
+        with self._lock:
+            self._names.pop(gid, None)
+            self._sections.pop(gid, None)
+
+    def _replenish(self, kind: str) -> None:
+        gid = self._create(kind)
+        if gid is not None:
+            with self._lock:
+                self._fresh[kind].append(gid)
+
+    def _reset(self, kind: str, gid: str) -> bool:
+        update = {"projects": asana_resources.update_project, "sections": asana_resources.update_section,
+                  "tasks": asana_resources.update_task}[kind]
+        with self._lock:
+            name = self._names[gid]
+        response = update(self.rest_client, gid, {"name": name, **RESET_FIELDS[kind]})
+        reset = response.get("status_code") == 200
+        with self._lock:
+            self._stats[kind]["resets" if reset else "discarded"] += 1
+        if not reset:
+            self._forget(gid)
+        return reset
@@ -1,40 +1,89 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
 import requests
+from config.config import rate_limit_max_retries
+from helper.http_session import get_shared_session
+from helper.retry import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    default_retry_policies,
+    get_shared_circuit_breaker,
+)
+from utils.json_codec import get_codec
+from utils.latency_histogram import LATENCY_RECORDER
 from utils.logger import get_logger
+from utils.rate_limiter import SharedRateLimiter, get_shared_rate_limiter, parse_retry_after
 
 
 LOGGER = get_logger(__name__, "DEBUG")
 
 
 class RestClient:
-    def __init__(self) -> None:
-        """Initiate requests session"""
-        self.session = requests.Session()
+    def __init__(
+        self,
+        session: requests.Session | None = None,
+        rate_limiter: SharedRateLimiter | None = None,
+        retry_policies: dict | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        codec=None,
+    ) -> None:
+        """Initiate requests session, by default the pooled session shared by the whole process
 
-    def send_request(self, method_name: str, url: str, headers: dict, body=None) -> dict:
+        Args:
+            session (requests.Session, optional): Session used to send the requests. Defaults to None.
+            rate_limiter (SharedRateLimiter, optional): Limiter of the requests, by default the one shared
+                                                        by the whole process when RATE_LIMIT_PER_SECOND is set.
+                                                        Defaults to None.
+            retry_policies (dict, optional): RetryPolicy by HTTP method, methods without policy are sent once.
+                                             Defaults to the policies of RETRY_METHODS.
+            circuit_breaker (CircuitBreaker, optional): Breaker of the hosts. Defaults to the one shared by the
+                                                        whole process.
+            codec (optional): JSON codec of the bodies. Defaults to the one of JSON_CODEC.
+        """
+        self.session = session or get_shared_session()
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.retry_policies = default_retry_policies() if retry_policies is None else retry_policies
+        self.circuit_breaker = circuit_breaker or get_shared_circuit_breaker()
+        self.codec = codec or get_codec()
+
+    def send_request(
+        self, method_name: str, url: str, headers: dict, body=None, retry_policy: RetryPolicy | None = None
+    ) -> dict:
         """Sends the Request method and returns a modified Response
 
         Args:
             method_name (str): HTTP method
             url (str): Target URL
             headers (dict): Cantains the headers for the request
-            body (dict, optional): Dictionary with the Request Body. Defaults to None.
+            body (dict | bytes, optional): Request Body, a dictionary or JSON already encoded. Defaults to None.
+            retry_policy (RetryPolicy, optional): Retries of this request, for example to opt in a POST.
+                                                  Defaults to the policy of the method.
 
         Returns:
             dict: Updated Response
         """
 
         response_updated = {}
+        response = None
         methods = {
             "GET": self.session.get,
             "POST": self.session.post,
             "PUT": self.session.put,
             "DELETE": self.session.delete,
         }
+        # encoded once, the retries send the same bytes
+        headers, body = self._encode_body(headers, body)
         try:
-            response = methods[method_name](url=url, headers=headers, json=body)
+            response, response_updated["retries"] = self._send_with_retries(
+                method_name, methods[method_name], url, headers, body, retry_policy
+            )
             response.raise_for_status()
 
-            response_updated["body"] = response.json() if response.text else {"message": "No body content"}
+            decode_start = time.perf_counter()
+            response_updated["body"] = self._decode_body(response) if response.content else {"message": "No body content"}
+            self._add_timing(response_updated, response, time.perf_counter() - decode_start)
             response_updated["status_code"] = response.status_code
             response_updated["headers"] = dict(response.headers)
             response_updated["time"] = response.elapsed.total_seconds()
@@ -42,24 +91,189 @@ class RestClient:
 
         except requests.exceptions.HTTPError as e:
             LOGGER.error(f"HTTP Error: {e}")
-            response_updated["body"] = response.json() if response.text else {"message": "HTTP Error"}
+            decode_start = time.perf_counter()
+            response_updated["body"] = self._decode_body(response) if response.content else {"message": "HTTP Error"}
+            self._add_timing(response_updated, response, time.perf_counter() - decode_start)
             response_updated["status_code"] = response.status_code
             response_updated["headers"] = dict(response.headers)
             response_updated["time"] = response.elapsed.total_seconds()
             response_updated["request"] = {"url":response.request.url,"method":response.request.method}
 
         except requests.exceptions.ConnectionError as e:
+            # no Response: the connection failed or the circuit of the host is open
             LOGGER.error(f"Connection Error: {e}")
-            response_updated["body"] = response.json() if response.text else {"message": "Connection Error"}
-            response_updated["status_code"] = response.status_code
+            response_updated["body"] = {"message": "Connection Error"}
+            response_updated["status_code"] = None
             response_updated["headers"] = {}
+            response_updated["request"] = {"url": url, "method": method_name}
+            response_updated["retries"] = getattr(e, "retries", 0)
 
         except requests.exceptions.RequestException as e:
+            # timeouts have no Response, an invalid JSON body has one
             LOGGER.error(f"Request Exception: {e}")
-            response_updated["body"] = response.json() if response.text else {"message": "Request Failed"}
-            response_updated["status_code"] = response.status_code
+            response_updated["body"] = {"message": "Request Failed"}
+            response_updated["status_code"] = response.status_code if response is not None else None
             response_updated["headers"] = {}
-            response_updated["time"] = response.elapsed.total_seconds()
-            response_updated["request"] = {"url":response.request.url,"method":response.request.method}
+            if response is not None:
+                response_updated["time"] = response.elapsed.total_seconds()
+            response_updated["request"] = {"url": url, "method": method_name}
+            response_updated.setdefault("retries", getattr(e, "retries", 0))
 
+        if "time" in response_updated:
+            LATENCY_RECORDER.record(method_name, url, response_updated["time"], response_updated["retries"])
         return response_updated
+
+    def _send_with_retries(
+        self, method_name: str, method, url: str, headers: dict, body, retry_policy: RetryPolicy | None
+    ) -> tuple:
+        """Sends the request through the circuit breaker of the host, connection errors, timeouts and 5xx
+           are sent again with the backoff of the retry policy
+
+        Returns:
+            tuple: Last Response and number of retries
+
+        Raises:
+            requests.exceptions.RequestException: Error of the last attempt, with the number of retries
+                                                  in its `retries` attribute
+        """
+        policy = retry_policy or self.retry_policies.get(method_name)
+        max_retries = policy.max_retries if policy is not None else 0
+        host = urlsplit(url).netloc
+        retries = 0
+        while True:
+            try:
+                self.circuit_breaker.check(host)
+                response = self._send(method, url, headers, body)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                e.retries = retries
+                if isinstance(e, CircuitOpenError):
+                    raise
+                self.circuit_breaker.record(host, success=False)
+                if retries >= max_retries:
+                    raise
+                LOGGER.warning(f"Retry {retries + 1} of {method_name} {url}: {e}")
+            except Exception:
+                # the trial request of a half open circuit must always be recorded, or the circuit never closes
+                self.circuit_breaker.record(host, success=False)
+                raise
+            else:
+                self.circuit_breaker.record(host, success=response.status_code < 500)
+                if retries >= max_retries or response.status_code not in policy.statuses:
+                    return response, retries
+                LOGGER.warning(f"Retry {retries + 1} of {method_name} {url}: status {response.status_code}")
+            time.sleep(policy.delay(retries))
+            retries += 1
+
+    def _send(self, method, url: str, headers: dict, body) -> requests.Response:
+        """Sends the request once the rate limiter gives a token, a 429 slows down the limiter of every
+           process and the request is sent again after its Retry-After, up to RATE_LIMIT_MAX_RETRIES times
+        """
+        if self.rate_limiter is None:
+            return method(url=url, headers=headers, data=body)
+        for attempt in range(rate_limit_max_retries + 1):
+            self.rate_limiter.acquire()
+            response = method(url=url, headers=headers, data=body)
+            if response.status_code != 429 or attempt == rate_limit_max_retries:
+                return response
+            self.rate_limiter.throttle(parse_retry_after(response.headers.get("Retry-After")))
+
+    def _encode_body(self, headers: dict, body) -> tuple:
+        """Encodes the Request Body with the codec, bytes are sent as they are
+
+        Args:
+            headers (dict): Headers of the request, they are not changed
+            body (dict | bytes): Request Body or None
+
+        Returns:
+            tuple: Headers with the JSON Content-Type when there is a body, and the body bytes or None
+        """
+        if body is None:
+            return headers, None
+        if not isinstance(body, (bytes, bytearray)):
+            body = self.codec.dumps(body)
+        if not any(key.lower() == "content-type" for key in headers or {}):
+            headers = {**(headers or {}), "Content-Type": "application/json"}
+        return headers, body
+
+    def _decode_body(self, response: requests.Response):
+        """Decodes the raw bytes of the Response Body with the codec
+
+        Raises:
+            requests.exceptions.JSONDecodeError: When the body is not valid JSON, like Response.json
+        """
+        try:
+            return self.codec.loads(response.content)
+        except ValueError as e:
+            raise requests.exceptions.JSONDecodeError(
+                getattr(e, "msg", str(e)), getattr(e, "doc", ""), getattr(e, "pos", 0)
+            ) from e
+
+    def iter_pages(self, url: str, headers: dict, limit: int = 100, prefetch: bool = False):
+        """Yields the pages of a collection endpoint, following next_page.offset until the last page.
+           Only the current page, and the next one when prefetching, are kept in memory
+
+        Args:
+            url (str): Collection URL, it can have query parameters
+            headers (dict): Cantains the headers for the request
+            limit (int, optional): Items per page, from 1 to 100. Defaults to 100.
+            prefetch (bool, optional): Request the next page while the caller handles the current one.
+                                       Defaults to False.
+
+        Yields:
+            dict: Updated Response of each page, a failed page is the last one
+        """
+        separator = "&" if "?" in url else "?"
+
+        def get_page(offset):
+            params = {"limit": limit, "offset": offset} if offset else {"limit": limit}
+            return self.send_request("GET", url=f"{url}{separator}{urlencode(params)}", headers=headers)
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch") if prefetch else None
+        try:
+            page = get_page(None)
+            while True:
+                next_page = page["body"].get("next_page") if page.get("status_code") == 200 else None
+                upcoming = None
+                if next_page and executor is not None:
+                    upcoming = executor.submit(get_page, next_page["offset"])
+                yield page
+                if not next_page:
+                    return
+                page = upcoming.result() if upcoming is not None else get_page(next_page["offset"])
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def iter_items(self, url: str, headers: dict, limit: int = 100, prefetch: bool = False):
+        """Yields the items of every page of a collection endpoint
+
+        Args:
+            url (str): Collection URL, it can have query parameters
+            headers (dict): Cantains the headers for the request
+            limit (int, optional): Items per page, from 1 to 100. Defaults to 100.
+            prefetch (bool, optional): Request the next page while the caller handles the current one.
+                                       Defaults to False.
+
+        Yields:
+            dict: Item of the collection
+
+        Raises:
+            requests.HTTPError: When a page request fails, so a partial collection is never taken as complete
+        """
+        for page in self.iter_pages(url, headers, limit=limit, prefetch=prefetch):
+            if page.get("status_code") != 200:
+                raise requests.HTTPError(f"Page request failed with status {page.get('status_code')}: {page.get('body')}")
+            yield from page["body"]["data"]
+
+    @staticmethod
+    def _add_timing(response_updated: dict, response: requests.Response, json_decode: float) -> None:
+        """Adds the phases of the request to the Response when the session records them
+
+        Args:
+            response_updated (dict): Updated Response
+            response (requests.Response): Response of the session, with `timing` when phase timing is enabled
+            json_decode (float): Seconds spent decoding the body
+        """
+        timing = getattr(response, "timing", None)
+        if timing is not None:
+            response_updated["timing"] = {**timing.as_dict(), "json_decode": json_decode}
@@ -0,0 +1,142 @@
+import random
+import threading
+import time
+import requests
+from config.config import (
+    retry_max_retries,
+    retry_backoff_base,
+    retry_backoff_max,
+    retry_methods,
+    circuit_failure_threshold,
+    circuit_reset_seconds,
+)
+from utils.logger import get_logger
+
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+RETRY_STATUSES = (500, 502, 503, 504)
+
+_shared_breaker = None
+_shared_breaker_lock = threading.Lock()
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised without sending the request while the circuit of the host is open"""
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 10.0,
+        statuses: tuple = RETRY_STATUSES,
+    ) -> None:
+        """Retries of connection errors, timeouts and 5xx responses with exponential backoff and full jitter
+
+        Args:
+            max_retries (int, optional): Attempts after the first one. Defaults to 2.
+            backoff_base (float, optional): Max seconds before the first retry, doubled on each retry.
+                                            Defaults to 0.5.
+            backoff_max (float, optional): Max seconds before any retry. Defaults to 10.0.
+            statuses (tuple, optional): Status codes sent again. Defaults to RETRY_STATUSES.
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.statuses = statuses
+
+    def delay(self, retry: int) -> float:
+        """Returns a random wait between 0 and the exponential backoff of the retry
+
+        Args:
+            retry (int): Number of the retry, from 0
+
+        Returns:
+            float: Seconds to wait
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** retry))
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0) -> None:
+        """Per host circuit breaker: after failure_threshold failures in a row the requests to the host fail
+           at once, after reset_seconds one request is let through and its result closes or opens the circuit
+
+        Args:
+            failure_threshold (int, optional): Failures in a row that open the circuit. Defaults to 5.
+            reset_seconds (float, optional): Seconds the circuit stays open. Defaults to 30.0.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._failures = {}
+        self._opened_at = {}
+        self._trial = set()
+
+    def check(self, host: str) -> None:
+        """Lets the request through or raises CircuitOpenError
+
+        Args:
+            host (str): Host of the request
+
+        Raises:
+            CircuitOpenError: The circuit of the host is open, or its trial request is in flight
+        """
+        with self._lock:
+            opened_at = self._opened_at.get(host)
+            if opened_at is None:
+                return
+            if host not in self._trial and time.monotonic() - opened_at >= self.reset_seconds:
+                self._trial.add(host)
+                return
+        raise CircuitOpenError(f"Circuit open for {host}, failing fast")
+
+    def record(self, host: str, success: bool) -> None:
+        """Records the result of a request to the host
+
+        Args:
+            host (str): Host of the request
+            success (bool): False for connection errors, timeouts and 5xx responses
+        """
+        with self._lock:
+            self._trial.discard(host)
+            if success:
+                if self._opened_at.pop(host, None) is not None:
+                    LOGGER.info(f"Circuit closed for {host}")
+                self._failures[host] = 0
+                return
+            self._failures[host] = self._failures.get(host, 0) + 1
+            if self._failures[host] >= self.failure_threshold:
+                if host not in self._opened_at:
+                    LOGGER.error(f"Circuit opened for {host} after {self._failures[host]} failures")
+                self._opened_at[host] = time.monotonic()
+
+    def is_open(self, host: str) -> bool:
+        with self._lock:
+            return host in self._opened_at
+
+
+def default_retry_policies() -> dict:
+    """Returns the retry policy of each method in RETRY_METHODS, methods without policy are sent once
+
+    Returns:
+        dict: RetryPolicy by HTTP method
+    """
+    policy = RetryPolicy(retry_max_retries, retry_backoff_base, retry_backoff_max)
+    return {method: policy for method in retry_methods}
+
+
+def get_shared_circuit_breaker() -> CircuitBreaker:
+    """Returns the circuit breaker shared by every RestClient of the process
+
+    Returns:
+        CircuitBreaker: Breaker built on first use with CIRCUIT_FAILURE_THRESHOLD and CIRCUIT_RESET_SECONDS
+    """
+    global _shared_breaker
+    if _shared_breaker is None:
+        with _shared_breaker_lock:
+            if _shared_breaker is None:
+                _shared_breaker = CircuitBreaker(circuit_failure_threshold, circuit_reset_seconds)
+    return _shared_breaker
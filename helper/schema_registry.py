@@ -0,0 +1,113 @@
+import json
+import threading
+from pathlib import Path
+from utils.lazy_import import lazy_import
+from utils.logger import get_logger
+
+
+LOGGER = get_logger(__name__, "DEBUG")
+# loaded by the first schema compiled, not during the collection of the tests
+jsonschema = lazy_import("jsonschema")
+
+INPUT_JSON_DIR = Path(__file__).parent.parent / "src" / "api" / "input_json"
+
+
+class ExpectedResponse:
+    """Expected Response loaded from one file of input_json: schema, compiled validator, status code and headers"""
+
+    __slots__ = ("name", "body", "validator", "status_code", "headers")
+
+    def __init__(self, name: str, body: dict, validator, status_code: int, headers: dict) -> None:
+        self.name = name
+        self.body = body
+        self.validator = validator
+        self.status_code = status_code
+        self.headers = headers
+
+
+class SchemaRegistry:
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, directory: Path | str = INPUT_JSON_DIR) -> None:
+        """Loads every expected Response file of the directory once and compiles its body schema
+
+        Args:
+            directory (Path | str, optional): Folder with the expected Responses. Defaults to INPUT_JSON_DIR.
+        """
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self._validators = {}
+        self._expected = {}
+        for path in sorted(self.directory.glob("*.json")):
+            self._load(path)
+        LOGGER.debug(
+            f"Schema registry loaded {len(self._expected)} files, {len(self._validators)} unique schemas"
+        )
+
+    @classmethod
+    def default(cls) -> "SchemaRegistry":
+        """Returns the registry shared by the whole process, built on first use
+
+        Returns:
+            SchemaRegistry: Shared registry for the input_json folder
+        """
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    cls._default = cls()
+        return cls._default
+
+    def get(self, name: str) -> ExpectedResponse:
+        """Returns the expected Response of a file, loading it if it was added after start up
+
+        Args:
+            name (str): File name without the .json extension
+
+        Returns:
+            ExpectedResponse: Expected Response with its compiled validator
+        """
+        expected = self._expected.get(name)
+        if expected is None:
+            with self._lock:
+                expected = self._expected.get(name) or self._load(self.directory / f"{name}.json")
+        return expected
+
+    def compile(self, schema: dict):
+        """Returns a compiled validator for the schema, identical schemas share the same validator
+
+        Args:
+            schema (dict): JSON schema
+
+        Returns:
+            jsonschema.protocols.Validator: Validator already checked against its meta schema
+        """
+        key = json.dumps(schema, sort_keys=True, separators=(",", ":"))
+        validator = self._validators.get(key)
+        if validator is None:
+            validator_class = jsonschema.validators.validator_for(schema)
+            validator_class.check_schema(schema)
+            validator = validator_class(schema)
+            self._validators[key] = validator
+        return validator
+
+    @property
+    def names(self) -> list:
+        return sorted(self._expected)
+
+    @property
+    def unique_schemas(self) -> int:
+        return len(self._validators)
+
+    def _load(self, path: Path) -> ExpectedResponse:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        expected = ExpectedResponse(
+            name=path.stem,
+            body=data["body"],
+            validator=self.compile(data["body"]),
+            status_code=data["status_code"],
+            headers=data["headers"],
+        )
+        self._expected[path.stem] = expected
+        return expected
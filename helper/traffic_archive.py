@@ -0,0 +1,257 @@
+import hashlib
+import json
+import os
+import struct
+import threading
+import zlib
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from config.config import traffic_mode, traffic_dir
+from utils.latency_histogram import endpoint_key
+from utils.logger import get_logger
+from utils.parallel import worker_file
+
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+RECORD = "record"
+REPLAY = "replay"
+ARCHIVE_NAME = "traffic"
+_LENGTH = struct.Struct(">I")
+
+_shared_archive = None
+_shared_archive_lock = threading.Lock()
+
+
+class ReplayMissError(requests.exceptions.RequestException):
+    """Raised in replay mode for a request that is not in the archive"""
+
+
+def normalize_url(url: str) -> str:
+    """Returns the path and the sorted query of a URL, so an archive recorded on one host replays on another
+
+    Args:
+        url (str): Request URL
+
+    Returns:
+        str: Path and query like /api/1.0/tasks?limit=10&offset=20
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{parts.path}?{query}" if query else parts.path
+
+
+def body_hash(body: bytes | str | None) -> str:
+    """Returns a short hash of a request body, JSON bodies are hashed with sorted keys
+
+    Args:
+        body (bytes | str | None): Request body
+
+    Returns:
+        str: 16 hex characters, empty without body
+    """
+    if not body:
+        return ""
+    if isinstance(body, str):
+        body = body.encode()
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode()
+    except ValueError:
+        pass
+    return hashlib.sha256(body).hexdigest()[:16]
+
+
+def body_shape(body: bytes | str | None) -> str:
+    """Returns the hash of a JSON body with its strings blanked, the same for bodies with other generated names
+
+    Args:
+        body (bytes | str | None): Request body
+
+    Returns:
+        str: 16 hex characters, empty without body
+    """
+    if not body:
+        return ""
+    try:
+        shape = _blank_strings(json.loads(body))
+    except ValueError:
+        return body_hash(body)
+    return body_hash(json.dumps(shape))
+
+
+def _blank_strings(value):
+    if isinstance(value, str):
+        return ""
+    if isinstance(value, dict):
+        return {key: _blank_strings(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_blank_strings(item) for item in value]
+    return value
+
+
+def current_test() -> str:
+    """Returns the node id of the pytest test running in the process, empty outside pytest"""
+    return os.environ.get("PYTEST_CURRENT_TEST", "").rsplit(" ", 1)[0]
+
+
+class TrafficArchive:
+    def __init__(self, directory: Path | str, mode: str) -> None:
+        """Append-only archive of the requests and responses of the HTTP sessions
+
+        Each worker appends to its own data file: records of a 4 byte length and a zlib compressed JSON
+        Response. The index file has one JSON line per record with the method, the normalized URL, the body
+        hash, the body shape, the pytest test and the position of the record. Replay reads the indexes of
+        every worker and answers a request with the first response not served yet of the same body, else of
+        the same body shape, else of the same URL, else of the same endpoint with other GIDs, so generated
+        names and pooled resources still replay. Responses recorded by the same test come first, so the tests
+        may run on other workers, once all are served the last one is repeated.
+
+        Args:
+            directory (Path | str): Folder of the archive files
+            mode (str): record or replay
+        """
+        self.directory = Path(directory)
+        self.mode = mode
+        self.replayed = 0
+        self.missed = 0
+        self._lock = threading.Lock()
+        self._positions = {}
+        self._served = set()
+        if mode == RECORD:
+            self._data_file = worker_file(directory, ARCHIVE_NAME, "bin")
+            self._index_file = self._data_file.with_suffix(".idx")
+            self._data = open(self._data_file, "ab")
+            self._index = open(self._index_file, "a", encoding="utf-8")
+        elif mode == REPLAY:
+            self._load_indexes()
+        else:
+            raise ValueError(f"Unknown traffic mode: {mode}")
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    def record(self, request: requests.PreparedRequest, response: requests.Response) -> None:
+        """Appends a Response, its body must already be read
+
+        Args:
+            request (requests.PreparedRequest): Request sent
+            response (requests.Response): Response received
+        """
+        payload = zlib.compress(json.dumps({
+            "status_code": response.status_code,
+            "reason": response.reason,
+            "headers": dict(response.headers),
+            "content": response.content.decode("latin-1"),
+        }).encode())
+        with self._lock:
+            offset = self._data.tell()
+            self._data.write(_LENGTH.pack(len(payload)) + payload)
+            self._data.flush()
+            entry = {
+                "method": request.method,
+                "url": normalize_url(request.url),
+                "body": body_hash(request.body),
+                "shape": body_shape(request.body),
+                "test": current_test(),
+                "file": self._data_file.name,
+                "offset": offset,
+            }
+            self._index.write(json.dumps(entry) + "\n")
+            self._index.flush()
+
+    def replay(self, request: requests.PreparedRequest) -> requests.Response:
+        """Returns a recorded Response of the request
+
+        Args:
+            request (requests.PreparedRequest): Request to answer
+
+        Returns:
+            requests.Response: Recorded Response
+
+        Raises:
+            ReplayMissError: The archive has no Response for the method and URL
+        """
+        url = normalize_url(request.url)
+        keys = self._keys(request.method, url, body_hash(request.body), body_shape(request.body), current_test())
+        with self._lock:
+            candidates = [self._positions[key] for key in keys if key in self._positions]
+            if not candidates:
+                self.missed += 1
+                raise ReplayMissError(f"No recorded response for {request.method} {url}", request=request)
+            position = next(
+                (position for positions in candidates for position in positions if position not in self._served),
+                candidates[0][-1],
+            )
+            self._served.add(position)
+            self.replayed += 1
+        return self._build_response(request, self._read(*position))
+
+    def close(self) -> None:
+        if self.mode == RECORD:
+            self._data.close()
+            self._index.close()
+
+    def _load_indexes(self) -> None:
+        index_files = sorted(self.directory.glob(f"{ARCHIVE_NAME}*.idx"))
+        responses = 0
+        for index_file in index_files:
+            with open(index_file, encoding="utf-8") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    responses += 1
+                    keys = self._keys(entry["method"], entry["url"], entry["body"], entry["shape"], entry["test"])
+                    for key in keys:
+                        self._positions.setdefault(key, []).append((entry["file"], entry["offset"]))
+        LOGGER.info(f"Replaying {responses} responses from {len(index_files)} archives")
+
+    @staticmethod
+    def _keys(method: str, url: str, body: str, shape: str, test: str) -> tuple:
+        # from the most to the least specific match
+        endpoint = endpoint_key(method, url)
+        return (
+            (method, url, "test body", test, body),
+            (method, url, "test shape", test, shape),
+            (method, url, "body", body),
+            (method, url, "shape", shape),
+            (method, url),
+            (endpoint, test),
+            endpoint,
+        )
+
+    def _read(self, file_name: str, offset: int) -> dict:
+        with open(self.directory / file_name, "rb") as f:
+            f.seek(offset)
+            (length,) = _LENGTH.unpack(f.read(_LENGTH.size))
+            return json.loads(zlib.decompress(f.read(length)))
+
+    @staticmethod
+    def _build_response(request: requests.PreparedRequest, recorded: dict) -> requests.Response:
+        response = requests.Response()
+        response.status_code = recorded["status_code"]
+        response.reason = recorded["reason"]
+        response.headers = CaseInsensitiveDict(recorded["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = recorded["content"].encode("latin-1")
+        response.url = request.url
+        response.request = request
+        return response
+
+
+def get_shared_archive() -> TrafficArchive | None:
+    """Returns the archive of the process
+
+    Returns:
+        TrafficArchive | None: Archive in TRAFFIC_DIR built on first use, None when TRAFFIC_MODE is not set
+    """
+    global _shared_archive
+    if not traffic_mode:
+        return None
+    if _shared_archive is None:
+        with _shared_archive_lock:
+            if _shared_archive is None:
+                _shared_archive = TrafficArchive(traffic_dir, traffic_mode)
+    return _shared_archive
@@ -1,12 +1,22 @@
-import json
-import jsonschema
+from helper.schema_registry import SchemaRegistry
+from utils.json_codec import get_codec
+from utils.lazy_import import lazy_import
 from utils.logger import get_logger
 
 
 LOGGER = get_logger(__name__, "DEBUG")
+jsonschema = lazy_import("jsonschema")
 
 
 class ValidateResponse:
+    def __init__(self, registry: SchemaRegistry | None = None) -> None:
+        """Uses the shared registry of expected Responses unless another one is given
+
+        Args:
+            registry (SchemaRegistry, optional): Registry with the compiled schemas. Defaults to None.
+        """
+        self.registry = registry or SchemaRegistry.default()
+
     def validate_response(self, actual_response: dict, file_name: str) -> None:
         """Validates the response by comparing with a File containing the expected Response:
            Headers, Schema and Status Code
@@ -15,11 +25,11 @@ class ValidateResponse:
             actual_response (dict): Response return by Server
             file_name (str): File containing expected Response
         """
-        expected_response = self.read_input_data(f"src/api/input_json/{file_name}.json")
+        expected_response = self.registry.get(file_name)
 
-        self.validate_value(actual_response["body"], expected_response["body"], "body")
-        self.validate_value(actual_response["status_code"], expected_response["status_code"], "status_code")
-        self.validate_value(actual_response["headers"], expected_response["headers"], "headers")
+        self.validate_body(actual_response["body"], expected_response.validator)
+        self.validate_value(actual_response["status_code"], expected_response.status_code, "status_code")
+        self.validate_value(actual_response["headers"], expected_response.headers, "headers")
 
     def validate_value(self, actual_value, expected_value, key_compare):
         """Validates different parts of the Response
@@ -32,18 +42,27 @@ class ValidateResponse:
         if key_compare == "status_code":
             assert actual_value == expected_value, f"Expected Status Code: {expected_value} but received {actual_value}"
         elif key_compare == "headers":
-            assert actual_value.keys() <= expected_value.keys(), (
+            # header names are case insensitive, HTTP/2 sends them in lowercase
+            actual_names = {name.lower() for name in actual_value}
+            assert actual_names <= {name.lower() for name in expected_value}, (
                 f"Expected Headers: {expected_value} but received {actual_value}"
             )
         elif key_compare == "body":
-            schema = False
-            try:
-                jsonschema.validate(instance=actual_value, schema=expected_value)
-                schema = True
-                LOGGER.debug("Schema is valid")
-            except jsonschema.exceptions.ValidationError as e:
-                LOGGER.debug(f"JSON Validator Error: {e}")
-            assert schema, f"Expected body schema: {expected_value} but received {actual_value}"
+            self.validate_body(actual_value, self.registry.compile(expected_value))
+
+    def validate_body(self, actual_value, validator) -> None:
+        """Validates the body of the Response with a compiled schema validator
+
+        Args:
+            actual_value (_type_): Actual Response body
+            validator (jsonschema.protocols.Validator): Validator from the schema registry
+        """
+        schema = validator.is_valid(actual_value)
+        if schema:
+            LOGGER.debug("Schema is valid")
+        else:
+            LOGGER.debug(f"JSON Validator Error: {jsonschema.exceptions.best_match(validator.iter_errors(actual_value))}")
+        assert schema, f"Expected body schema: {validator.schema} but received {actual_value}"
 
     def read_input_data(self, file_name: str) -> dict:  # -> Any:
         """Reads a File and returns a dictionary with its content
@@ -55,7 +74,7 @@ class ValidateResponse:
             dict: Content of the file
         """
         LOGGER.debug(f"Reading input data from {file_name}")
-        with open(file_name, encoding="utf-8") as f:
-            data = json.load(f)
+        with open(file_name, "rb") as f:
+            data = get_codec().loads(f.read())
         # LOGGER.debug(f"Content data {data}")
         return data
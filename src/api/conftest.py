@@ -1,127 +1,278 @@
-import requests
+import json
+import os
+import uuid
+from pathlib import Path
 import pytest
+import pytest_asyncio
+from helper import asana_resources
+from helper.async_rest_client import AsyncRestClient
+from helper.cleanup_queue import CleanupQueue, get_shared_cleanup_queue
+from helper.http_session import get_shared_session
+from helper.resource_graph import ResourceGraph
+from helper.resource_pool import DESTRUCTIVE, ResourcePool, lease_mode
+from helper.rest_client import RestClient
+from utils.latency_histogram import LATENCY_RECORDER, LatencyRecorder, format_summary
 from utils.logger import get_logger
-from config.config import url_base, headers, workspace_gid
+from utils.parallel import is_worker, merge_worker_files, run_id
+from utils.rate_limiter import get_shared_rate_limiter, remove_state_file
+from utils.regression_gate import check_regressions, format_result
+from config.config import (
+    url_base,
+    fixture_workers,
+    http_warm_up_connections,
+    metrics_dir,
+    rate_limit_per_second,
+    regression_gate,
+    resource_pool_projects,
+    resource_pool_tasks,
+)
 
 
 LOGGER = get_logger(__name__, "DEBUG")
 
+# With workers the html, excel and markdown reports are written once by the controller, from the results sent by
+# every worker: pytest-excel only skips the workers of old xdist versions, named slaves.
+# Each worker writes its own allure results to the alluredir, cleaned by the controller before the workers start.
+# The workers get the test run uid chosen by the controller, so it has the same run id and rate limiter bucket.
+# The controller sends again the deletions left in the cleanup journal by the previous runs, once per run:
+# pytest_configure is also called for this conftest when pytest is started from the repository root
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    if not is_worker():
+        if getattr(config.option, "testrunuid", "") is None:
+            config.option.testrunuid = os.environ["PYTEST_XDIST_TESTRUNUID"] = uuid.uuid4().hex
+        get_shared_cleanup_queue().replay()
+        return
+    config.slaveinput = config.workerinput
+    for option in ("md_report", "clean_alluredir"):
+        if hasattr(config.option, option):
+            setattr(config.option, option, False)
+
+
+# Session shared by fixtures and tests, warmed up at start and its pool usage logged at the end,
+# with TRAFFIC_MODE it records its responses to the archive or replays them
+@pytest.fixture(scope="session", autouse=True)
+def http_session():
+    session = get_shared_session()
+    if http_warm_up_connections:
+        session.warm_up(url_base, http_warm_up_connections)
+    yield session
+    LOGGER.info(f"HTTP pool stats: {session.stats()}")
+    if session.archive is not None:
+        if session.archive.replaying:
+            LOGGER.info(f"Replayed {session.archive.replayed} responses, {session.archive.missed} not in the archive")
+        session.archive.close()
+
+
+# Rate limiter shared by every worker when RATE_LIMIT_PER_SECOND is set, its wait times logged at the end
+@pytest.fixture(scope="session", autouse=True)
+def rate_limiter():
+    limiter = get_shared_rate_limiter()
+    yield limiter
+    if limiter is not None:
+        LOGGER.info(f"Rate limiter stats: {limiter.stats()}")
+
+
+# Merge the metrics written by each worker and remove the rate limiter state once the whole run is finished,
+# workers wait for their deletions and send their latency histograms, cleanup stats and run id to the controller
+def pytest_sessionfinish(session):
+    cleanup_queue = get_shared_cleanup_queue()
+    cleanup_queue.close(compact=not is_worker())
+    if is_worker():
+        session.config.workeroutput["latency"] = LATENCY_RECORDER.to_dict()
+        session.config.workeroutput["cleanup"] = cleanup_queue.to_dict()
+        session.config.workeroutput["run_id"] = run_id()
+        return
+    if metrics_dir:
+        merge_worker_files(metrics_dir, "response_time", "lp")
+        with open(Path(metrics_dir) / "latency_histograms.json", "w", encoding="utf-8") as f:
+            json.dump(LATENCY_RECORDER.to_dict(), f)
+    for endpoint, summary in LATENCY_RECORDER.summary().items():
+        LOGGER.info(f"Latency {endpoint}: {format_summary(summary)}")
+    LOGGER.info(f"Cleanup queue stats: {cleanup_queue.stats()}")
+    if rate_limit_per_second:
+        remove_state_file(session.config.stash.get(RUN_ID_KEY, run_id()))
+    if regression_gate != "off":
+        check_latency_regressions(session)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    workeroutput = getattr(node, "workeroutput", {})
+    if workeroutput.get("latency"):
+        LATENCY_RECORDER.merge(LatencyRecorder.from_dict(workeroutput["latency"]))
+    if workeroutput.get("cleanup"):
+        get_shared_cleanup_queue().merge(workeroutput["cleanup"])
+    if workeroutput.get("run_id"):
+        node.config.stash[RUN_ID_KEY] = workeroutput["run_id"]
+
+
+RUN_ID_KEY = pytest.StashKey[str]()
+REGRESSIONS_KEY = pytest.StashKey[list]()
+
+
+# Compare the response times of the run with the previous runs when REGRESSION_GATE is warn or fail,
+# fail also fails the session when an endpoint regressed
+def check_latency_regressions(session):
+    try:
+        results = check_regressions(session.config.stash.get(RUN_ID_KEY, run_id()))
+    except Exception as e:  # an unreachable InfluxDB or a missing metrics file must not hide the test results
+        LOGGER.error(f"Regression check skipped: {e}")
+        return
+    regressions = [result for result in results if result["regressed"]]
+    session.config.stash[REGRESSIONS_KEY] = regressions
+    for result in regressions:
+        LOGGER.error(f"Latency regression {format_result(result)}")
+    if regressions and regression_gate == "fail":
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter):
+    summary = LATENCY_RECORDER.summary()
+    if is_worker() or not summary:
+        return
+    terminalreporter.section("latency per endpoint")
+    for endpoint, endpoint_summary in summary.items():
+        terminalreporter.write_line(f"{endpoint:<40}{format_summary(endpoint_summary)}")
+    write_cleanup_summary(terminalreporter)
+    regressions = terminalreporter.config.stash.get(REGRESSIONS_KEY, [])
+    if regressions:
+        terminalreporter.section("latency regressions", red=True)
+        for result in regressions:
+            terminalreporter.write_line(format_result(result))
+
+
+def write_cleanup_summary(terminalreporter):
+    stats = get_shared_cleanup_queue().stats()
+    if not stats["latency"]["count"]:
+        return
+    terminalreporter.section("resource cleanup", red=bool(stats["failed"]))
+    terminalreporter.write_line(
+        f"queued={stats['enqueued']} replayed={stats['replayed']} deleted={stats['deleted']} gone={stats['gone']} "
+        f"retries={stats['retries']} failed={stats['failed']}"
+    )
+    terminalreporter.write_line(f"delete latency {format_summary(stats['latency'])}")
+    for resource, gid, status in stats["failures"]:
+        terminalreporter.write_line(f"{resource} {gid} not deleted (status {status}), left for the next run")
+
+
+# Client used by the fixtures to create and delete resources
+@pytest.fixture(scope="session")
+def rest_client(http_session):
+    return RestClient(http_session)
+
+
+# Client for async tests and async fixtures, use it with @pytest.mark.asyncio
+@pytest_asyncio.fixture
+async def async_rest_client():
+    async with AsyncRestClient() as client:
+        yield client
+
+
+# Queue of the deletes sent in the background, with CLEANUP_WORKERS, it is drained when the session finishes
+@pytest.fixture(scope="session")
+def cleanup_queue():
+    return get_shared_cleanup_queue()
+
+
+# Projects with a section and tasks created ahead of the tests, sizes from RESOURCE_POOL_PROJECTS
+# and RESOURCE_POOL_TASKS, the pool is empty by default and every fixture creates its own resources,
+# the resources are deleted through the cleanup queue
+@pytest.fixture(scope="session")
+def resource_pool(rest_client: RestClient, cleanup_queue: CleanupQueue):
+    pool = ResourcePool(
+        rest_client, projects=resource_pool_projects, tasks=resource_pool_tasks, cleanup_queue=cleanup_queue
+    )
+    pool.fill()
+    yield pool
+    pool.close()
+    LOGGER.info(f"Resource pool stats: {pool.stats()}")
+
+
+# Dependency graph of the fixtures that create resources, the resources of a test are created as soon as
+# their dependencies exist and deleted the same way, FIXTURE_WORKERS of them at the same time
+@pytest.fixture(scope="session")
+def resource_graph(rest_client: RestClient, resource_pool: ResourcePool, cleanup_queue: CleanupQueue):
+    def create_task_on_section(section_task: str, create_section: str, create_project: str, mode: str) -> str:
+        asana_resources.add_task_to_section(rest_client, section_task, create_project, create_section)
+        return section_task
+
+    graph = ResourceGraph(max_workers=fixture_workers)
+    graph.add(
+        "create_project",
+        create=lambda mode: resource_pool.acquire("projects", mode),
+        delete=lambda gid, mode: resource_pool.release("projects", gid, mode),
+    )
+    graph.add(
+        "create_section",
+        create=lambda create_project, mode: resource_pool.acquire_section(create_project, mode),
+        delete=lambda gid, mode: resource_pool.release("sections", gid, mode),
+        depends=("create_project",),
+    )
+    graph.add(
+        "create_task",
+        create=lambda mode: resource_pool.acquire("tasks", mode),
+        delete=lambda gid, mode: resource_pool.release("tasks", gid, mode),
+    )
+    # the task added to the section is never reused, it is leased while the project and section are created
+    graph.add(
+        "section_task",
+        create=lambda mode: resource_pool.acquire("tasks", DESTRUCTIVE),
+        delete=lambda gid, mode: resource_pool.release("tasks", gid, DESTRUCTIVE),
+    )
+    graph.add(
+        "create_task_on_section",
+        create=create_task_on_section,
+        depends=("section_task", "create_section", "create_project"),
+    )
+    graph.add(
+        "create_portfolio",
+        create=lambda mode: asana_resources.create_portfolio(rest_client)["body"]["data"]["gid"],
+        delete=lambda gid, mode: cleanup_queue.enqueue("portfolios", gid),
+    )
+    yield graph
+    graph.close()
+
+
+# Resources of every fixture of the graph the test uses, with their lease mode from the test markers
+@pytest.fixture
+def resources(resource_graph: ResourceGraph, request):
+    mode = lease_mode(request.node)
+    values = resource_graph.resolve(request.fixturenames, mode=mode)
+    yield values
+    resource_graph.teardown(values, mode=mode)
+
+
 # Fixture to create projects as preconditions
 @pytest.fixture
-def create_project():
+def create_project(resources: dict):
     LOGGER.info("Create Project fixture")
-    # body
-    project_body = {
-        "data": {
-            "name": "Test project from fixture",
-            "workspace": f"{workspace_gid}"
-        }
-    }
-    # call to endpoint
-    response = requests.post(
-        url=f"{url_base}projects", headers=headers, json=project_body
-    )
-    LOGGER.debug(response.json())
-    # get gid project
-    project_gid = response.json()["data"]["gid"]
-    yield project_gid
-    delete_project(project_gid)
+    return resources["create_project"]
 
 
 # Fixture to create portfolios as preconditions
 @pytest.fixture
-def create_portfolio():
+def create_portfolio(resources: dict):
     LOGGER.info("Create Portfolio fixture")
-    # body
-    portfolio_body = {
-        "data": {
-            "name": "Test portfolio from fixture",
-            "workspace": f"{workspace_gid}"
-        }
-    }
-    # call to endpoint
-    response = requests.post(
-        url=f"{url_base}portfolios", headers=headers, json=portfolio_body
-    )
-    LOGGER.debug(response.json())
-    # get gid portfolio
-    portfolio_gid = response.json()["data"]["gid"]
-    yield portfolio_gid
-    delete_portfolio(portfolio_gid)
+    return resources["create_portfolio"]
 
 # Fixture to create sections as preconditions
 @pytest.fixture
-def create_section(create_project:str):
+def create_section(resources: dict):
     LOGGER.info("Create Section fixture")
-    # body
-    section_body = {
-        "data": {
-            "name": "Test section from fixture"
-        }
-    }
-    # call to endpoint
-    response = requests.post(
-        url=f"{url_base}projects/{create_project}/sections", headers=headers, json=section_body
-    )
-    LOGGER.debug(response.json())
-    # get gid section
-    section_gid = response.json()["data"]["gid"]
-    yield section_gid
+    return resources["create_section"]
 
 # Fixture to create tasks as preconditions
 @pytest.fixture
-def create_task():
+def create_task(resources: dict):
     LOGGER.info("Create Task fixture")
-    # body
-    task_body = {
-        "data": {
-            "name": "Test task from fixture",
-            "workspace": workspace_gid
-        }
-    }
-    # call to endpoint
-    response = requests.post(
-        url=f"{url_base}tasks", headers=headers, json=task_body
-    )
-    LOGGER.debug(response.json())
-    # get gid task
-    task_gid = response.json()["data"]["gid"]
-    yield task_gid
-    delete_task(task_gid)
+    return resources["create_task"]
 
-# Fixture to create tasks within a section as preconditions
+# Fixture to create tasks within a section as preconditions, the task is never reused
 @pytest.fixture
-def create_task_on_section(create_section:str, create_project:str):
+def create_task_on_section(resources: dict):
     LOGGER.info("Create Task on Section fixture")
-    # body
-    task_body = {
-        "data": {
-            "name": "Test task on section from fixture",
-            "workspace": workspace_gid,
-            "projects":[
-                create_project
-            ]
-        }
-    }
-    # call to endpoint
-    response = requests.post(
-        url=f"{url_base}tasks", headers=headers, json=task_body
-    )
-    LOGGER.debug(response.json())
-    # get gid task
-    task_gid = response.json()["data"]["gid"]
-    # add task to projects section
-    url_add_task_to_project = f"{url_base}tasks/{task_gid}/addProject"
-    LOGGER.debug(f"URL DELETE Task: {url_add_task_to_project}")
-    add_task_to_project_body = {
-        "data": {
-            "project": create_project,
-            "section": create_section,
-        }
-    }
-    response = requests.post(url=f"{url_add_task_to_project}", headers=headers, json=add_task_to_project_body)
-    yield task_gid
-    delete_task(task_gid)
+    return resources["create_task_on_section"]
 
 # Fixture to log the current test
 @pytest.fixture
@@ -132,31 +283,3 @@ def test_log_name(request):
         LOGGER.info(f"End test: '{request.node.name}'")
 
     request.addfinalizer(end)
-
-# functions to delete resources
-def delete_project(project_gid):
-    LOGGER.info("Delete Project fixture")
-    url_delete_project = f"{url_base}projects/{project_gid}"
-    LOGGER.debug(f"=> Delete Project Fixture: {url_delete_project}")
-    response = requests.delete(url=url_delete_project, headers=headers)
-    LOGGER.debug(f"=> STATUS CODE: {response.status_code}")
-    if response.status_code == 200:
-        LOGGER.debug(f"=> Project with GID {project_gid} deleted")
-
-def delete_portfolio(portfolio_gid):
-    LOGGER.info("Delete Portfolio fixture")
-    url_delete_portfolio = f"{url_base}portfolios/{portfolio_gid}"
-    LOGGER.debug(f"=> Delete Portfolio Fixture: {url_delete_portfolio}")
-    response = requests.delete(url=url_delete_portfolio, headers=headers)
-    LOGGER.debug(f"=> STATUS CODE: {response.status_code}")
-    if response.status_code == 200:
-        LOGGER.debug(f"=> Portfolio with GID {portfolio_gid} deleted")
-
-def delete_task(task_gid):
-    LOGGER.info("Delete Task fixture")
-    url_delete_task = f"{url_base}tasks/{task_gid}"
-    LOGGER.debug(f"=> Delete Task Fixture: {url_delete_task}")
-    response = requests.delete(url=url_delete_task, headers=headers)
-    LOGGER.debug(f"=> STATUS CODE: {response.status_code}")
-    if response.status_code == 200:
-        LOGGER.debug(f"=> Task with GID {task_gid} deleted")
@@ -1,12 +1,10 @@
-import json
 import allure
-from faker import Faker
 import pytest
 from config.config import url_base, headers
 from helper.rest_client import RestClient
 from helper.validate_response import ValidateResponse
 from utils.influxdb_connection import InfluxDBConnection
-from utils.logger import get_logger
+from utils.logger import LazyJson, get_logger
 
 LOGGER = get_logger(__name__, "DEBUG")
 
@@ -19,13 +17,10 @@ class TestPortfolios:
         """Setup before all tests"""
         # arrange
         LOGGER.info("Test Portfolio Setup Class")
-        cls.portfolio_list = []
         # set RestClient in the setup
         cls.rest_client = RestClient()
         # use the validation library
         cls.validate = ValidateResponse()
-        # use random generator with faker
-        cls.faker = Faker()
         # use influxdb_client
         cls.influxdb_client = InfluxDBConnection()
 
@@ -36,6 +31,7 @@ class TestPortfolios:
         self.influxdb_client.store_data_influxdb(self.response, "portfolios")
 
     @pytest.mark.e2e
+    @pytest.mark.destructive
     @allure.title("Test add a Project to a Portfolio")
     @allure.tag("e2e")
     @allure.label("owner", "Joanna Yujra")
@@ -61,7 +57,7 @@ class TestPortfolios:
                                                  url=url_add_project,
                                                  headers=headers,
                                                  body=add_project_body)
-        LOGGER.debug(f"=> RESPONSE: {json.dumps(self.response, indent=4)}")
+        LOGGER.debug("=> RESPONSE: %s", LazyJson(self.response))
         # assertion
         self.validate.validate_response(self.response, "add_project_to_portfolio")
 
@@ -1,12 +1,13 @@
-import json
 import allure
-from faker import Faker
 import pytest
 from config.config import url_base, headers, workspace_gid
+from helper.cleanup_queue import get_shared_cleanup_queue
+from helper.data_factory import get_shared_data_factory
 from helper.rest_client import RestClient
 from helper.validate_response import ValidateResponse
 from utils.influxdb_connection import InfluxDBConnection
-from utils.logger import get_logger
+from utils.logger import LazyJson, get_logger
+from utils.parallel import resource_name
 
 LOGGER = get_logger(__name__, "DEBUG")
 
@@ -19,13 +20,13 @@ class TestProjects:
         """Setup before all tests"""
         # arrange
         LOGGER.info("Test Project Setup Class")
-        cls.project_list = []
+        cls.cleanup_queue = get_shared_cleanup_queue()
         # set RestClient in the setup
         cls.rest_client = RestClient()
         # use the validation library
         cls.validate = ValidateResponse()
-        # use random generator with faker
-        cls.faker = Faker()
+        # use the names generated ahead from the test data seed
+        cls.test_data = get_shared_data_factory()
         # use influxdb_client
         cls.influxdb_client = InfluxDBConnection()
 
@@ -51,7 +52,7 @@ class TestProjects:
         # body to create the project
         project_body = {
             "data": {
-                "name": f"Auto New {self.faker.company()}",
+                "name": resource_name(f"Auto New {self.test_data.project_name()}"),
                 "workspace": workspace_gid
             }
         }
@@ -60,13 +61,14 @@ class TestProjects:
                                                  url=url_create_project,
                                                  headers=headers,
                                                  body=project_body)
-        LOGGER.debug(f"=> RESPONSE: {json.dumps(self.response, indent=4)}")
-        self.project_list.append(self.response["body"]["data"]["gid"])
+        LOGGER.debug("=> RESPONSE: %s", LazyJson(self.response))
+        self.cleanup_queue.enqueue("projects", self.response["body"]["data"]["gid"])
         # assertion
         self.validate.validate_response(self.response, "create_project")
 
 
     @pytest.mark.acceptance
+    @pytest.mark.readonly
     @allure.title("Test Get Project")
     @allure.tag("acceptance")
     @allure.label("owner", "Joanna Yujra")
@@ -84,7 +86,7 @@ class TestProjects:
         self.response = self.rest_client.send_request("GET",
                                                  url=url_get_project,
                                                  headers=headers)
-        LOGGER.debug(f"=> RESPONSE: {json.dumps(self.response, indent=4)}")
+        LOGGER.debug("=> RESPONSE: %s", LazyJson(self.response))
         # assertion
         self.validate.validate_response(self.response, "get_project")
 
@@ -105,7 +107,7 @@ class TestProjects:
         # body to update the project
         update_project_body = {
             "data": {
-                "name": f"Auto Updated {self.faker.company()}",
+                "name": resource_name(f"Auto Updated {self.test_data.project_name()}"),
                 "color": "light-green",
                 "default_view": "calendar",
                 "notes": "These is an auto updated project.",
@@ -116,11 +118,12 @@ class TestProjects:
                                                  url=url_update_project,
                                                  headers=headers,
                                                  body=update_project_body)
-        LOGGER.debug(f"=> RESPONSE: {json.dumps(self.response, indent=4)}")
+        LOGGER.debug("=> RESPONSE: %s", LazyJson(self.response))
         # assertion
         self.validate.validate_response(self.response, "update_project")
 
     @pytest.mark.acceptance
+    @pytest.mark.destructive
     @allure.title("Test Delete Project")
     @allure.tag("acceptance")
     @allure.label("owner", "Joanna Yujra")
@@ -138,7 +141,7 @@ class TestProjects:
         self.response = self.rest_client.send_request("DELETE",
                                                  url=url_delete_project,
                                                  headers=headers)
-        LOGGER.debug(f"=> RESPONSE: {json.dumps(self.response, indent=4)}")
+        LOGGER.debug("=> RESPONSE: %s", LazyJson(self.response))
         # assertion
         self.validate.validate_response(self.response, "delete_project")
 
@@ -159,7 +162,7 @@ class TestProjects:
         self.response = self.rest_client.send_request("POST",
                                                  url=url_create_project,
                                                  headers=headers)
-        LOGGER.debug(f"=> RESPONSE: {json.dumps(self.response, indent=4)}")
+        LOGGER.debug("=> RESPONSE: %s", LazyJson(self.response))
         # assertion
         self.validate.validate_response(self.response, "create_project_without_body")
 
@@ -192,24 +195,13 @@ class TestProjects:
                                                  url=url_create_project,
                                                  headers=headers,
                                                  body=project_body)
-        LOGGER.debug(f"=> RESPONSE: {json.dumps(self.response, indent=4)}")
-        self.project_list.append(self.response["body"]["data"]["gid"])
+        LOGGER.debug("=> RESPONSE: %s", LazyJson(self.response))
+        self.cleanup_queue.enqueue("projects", self.response["body"]["data"]["gid"])
         # assertion
         self.validate.validate_response(self.response, "create_project")
 
     @classmethod
     def teardown_class(cls) -> None:
-        """Clean up after all tests"""
-        # Clean up projects
+        """Close influx connection after all tests, the created resources are deleted by the cleanup queue"""
         LOGGER.info("Test Project Teardown Class")
-        for project_gid in cls.project_list:
-            url_delete_project = f"{url_base}projects/{project_gid}"
-            LOGGER.debug(f"=> Delete Project Fixture: {url_delete_project}")
-            response = cls.rest_client.send_request("DELETE",
-                                                    url=url_delete_project,
-                                                    headers=headers)
-            LOGGER.debug(f"=> STATUS CODE: {response['status_code']}")
-            if response["status_code"] == 200:
-                LOGGER.debug(f"=> Project with GID {project_gid} deleted")
-
         cls.influxdb_client.close()
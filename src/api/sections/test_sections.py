@@ -1,12 +1,12 @@
-import json
 import allure
-from faker import Faker
 import pytest
 from config.config import url_base, headers
+from helper.data_factory import get_shared_data_factory
 from helper.rest_client import RestClient
 from helper.validate_response import ValidateResponse
 from utils.influxdb_connection import InfluxDBConnection
-from utils.logger import get_logger
+from utils.logger import LazyJson, get_logger
+from utils.parallel import resource_name
 
 LOGGER = get_logger(__name__, "DEBUG")
 
@@ -23,8 +23,8 @@ class TestSections:
         cls.rest_client = RestClient()
         # use the validation library
         cls.validate = ValidateResponse()
-        # use random generator with faker
-        cls.faker = Faker()
+        # use the names generated ahead from the test data seed
+        cls.test_data = get_shared_data_factory()
         # use influxdb_client
         cls.influxdb_client = InfluxDBConnection()
 
@@ -36,6 +36,7 @@ class TestSections:
 
     @pytest.mark.acceptance
     @pytest.mark.smoke
+    @pytest.mark.destructive
     @allure.title("Test Create Section")
     @allure.tag("smoke", "acceptance")
     @allure.label("owner", "Joanna Yujra")
@@ -51,7 +52,7 @@ class TestSections:
         # body to create the Section
         section_body = {
             "data": {
-                "name": f"Auto Section {self.faker.word()}"
+                "name": resource_name(f"Auto Section {self.test_data.section_name()}")
             }
         }
         # call POST endpoint (act)
@@ -59,11 +60,12 @@ class TestSections:
                                                  url=url_create_section,
                                                  headers=headers,
                                                  body=section_body)
-        LOGGER.debug(f"RESPONSE: {json.dumps(self.response, indent=4)}")
+        LOGGER.debug("RESPONSE: %s", LazyJson(self.response))
         # assertion
         self.validate.validate_response(self.response, "create_section")
 
     @pytest.mark.acceptance
+    @pytest.mark.readonly
     @allure.title("Test Get Section")
     @allure.tag("acceptance")
     @allure.label("owner", "Joanna Yujra")
@@ -81,7 +83,7 @@ class TestSections:
         self.response = self.rest_client.send_request("GET",
                                                  url=url_get_section,
                                                  headers=headers)
-        LOGGER.debug(f"RESPONSE: {json.dumps(self.response, indent=4)}")
+        LOGGER.debug("RESPONSE: %s", LazyJson(self.response))
         # assertion
         self.validate.validate_response(self.response, "get_section")
 
@@ -102,7 +104,7 @@ class TestSections:
         # body to update the Section
         update_section_body = {
             "data": {
-                "name": f"Auto Updated {self.faker.word()}"
+                "name": resource_name(f"Auto Updated {self.test_data.section_name()}")
             }
         }
         # call PUT endpoint (act)
@@ -110,11 +112,12 @@ class TestSections:
                                                  url=url_update_section,
                                                  headers=headers,
                                                  body=update_section_body)
-        LOGGER.debug(f"RESPONSE: {json.dumps(self.response, indent=4)}")
+        LOGGER.debug("RESPONSE: %s", LazyJson(self.response))
         # assertion
         self.validate.validate_response(self.response, "update_section")
 
     @pytest.mark.acceptance
+    @pytest.mark.destructive
     @allure.title("Test Delete Section")
     @allure.tag("acceptance")
     @allure.label("owner", "Joanna Yujra")
@@ -132,7 +135,7 @@ class TestSections:
         self.response = self.rest_client.send_request("DELETE",
                                                  url=url_delete_section,
                                                  headers=headers)
-        LOGGER.debug(f"RESPONSE: {json.dumps(self.response, indent=4)}")
+        LOGGER.debug("RESPONSE: %s", LazyJson(self.response))
         # assertion
         self.validate.validate_response(self.response, "delete_section")
 
@@ -156,7 +159,7 @@ class TestSections:
         # body to update the Section
         update_section_body = {
             "data": {
-                "name": f"Auto Error Updated {self.faker.word()}"
+                "name": f"Auto Error Updated {self.test_data.section_name()}"
             }
         }
         # call PUT endpoint (act)
@@ -164,7 +167,7 @@ class TestSections:
                                                  url=url_update_section,
                                                  headers=headers,
                                                  body=update_section_body)
-        LOGGER.debug(f"RESPONSE: {json.dumps(self.response, indent=4)}")
+        LOGGER.debug("RESPONSE: %s", LazyJson(self.response))
         # assertion
         self.validate.validate_response(self.response, "update_section_with_string_section_gid")
 
@@ -1,13 +1,13 @@
-import json
 import allure
-from faker import Faker
 import pytest
-import requests
 from config.config import url_base, headers, workspace_gid
+from helper.cleanup_queue import get_shared_cleanup_queue
+from helper.data_factory import get_shared_data_factory
 from helper.rest_client import RestClient
 from helper.validate_response import ValidateResponse
 from utils.influxdb_connection import InfluxDBConnection
-from utils.logger import get_logger
+from utils.logger import LazyJson, get_logger
+from utils.parallel import resource_name
 
 LOGGER = get_logger(__name__, "DEBUG")
 
@@ -20,13 +20,13 @@ class TestTasks:
         """Setup before all tests"""
         # arrange
         LOGGER.info("Test Task Setup Class")
-        cls.task_list = []
+        cls.cleanup_queue = get_shared_cleanup_queue()
         # set RestClient in the setup
         cls.rest_client = RestClient()
         # use the validation library
         cls.validate = ValidateResponse()
-        # use random generator with faker
-        cls.faker = Faker()
+        # use the names generated ahead from the test data seed
+        cls.test_data = get_shared_data_factory()
         # use influxdb_client
         cls.influxdb_client = InfluxDBConnection()
 
@@ -52,7 +52,7 @@ class TestTasks:
         # body to create the Task
         task_body = {
             "data": {
-                "name": f"Auto Task {self.faker.sentence()}",
+                "name": resource_name(f"Auto Task {self.test_data.task_name()}"),
                 "workspace": workspace_gid,
                 "notes": "These is an auto created task.",
             }
@@ -62,12 +62,13 @@ class TestTasks:
                                                  url=url_create_task,
                                                  headers=headers,
                                                  body=task_body)
-        LOGGER.debug(f"RESPONSE: {json.dumps(self.response, indent=4)}")
-        self.task_list.append(self.response["body"]["data"]["gid"])
+        LOGGER.debug("RESPONSE: %s", LazyJson(self.response))
+        self.cleanup_queue.enqueue("tasks", self.response["body"]["data"]["gid"])
         # assertion
         self.validate.validate_response(self.response, "create_task")
 
     @pytest.mark.acceptance
+    @pytest.mark.readonly
     @allure.title("Test Get Task")
     @allure.tag("acceptance")
     @allure.label("owner", "Joanna Yujra")
@@ -85,7 +86,7 @@ class TestTasks:
         self.response = self.rest_client.send_request("GET",
                                                  url=url_get_task,
                                                  headers=headers)
-        LOGGER.debug(f"RESPONSE: {json.dumps(self.response, indent=4)}")
+        LOGGER.debug("RESPONSE: %s", LazyJson(self.response))
         # assertion
         self.validate.validate_response(self.response, "get_task")
 
@@ -106,7 +107,7 @@ class TestTasks:
         # body to update the Task
         update_task_body = {
             "data": {
-                "name": f"Auto Updated {self.faker.sentence()}",
+                "name": resource_name(f"Auto Updated {self.test_data.task_name()}"),
                 "notes": "These is an auto updated task.",
             }
         }
@@ -115,11 +116,12 @@ class TestTasks:
                                                  url=url_update_task,
                                                  headers=headers,
                                                  body=update_task_body)
-        LOGGER.debug(f"RESPONSE: {json.dumps(self.response, indent=4)}")
+        LOGGER.debug("RESPONSE: %s", LazyJson(self.response))
         # assertion
         self.validate.validate_response(self.response, "update_task")
 
     @pytest.mark.acceptance
+    @pytest.mark.destructive
     @allure.title("Test Delete Task")
     @allure.tag("acceptance")
     @allure.label("owner", "Joanna Yujra")
@@ -137,11 +139,12 @@ class TestTasks:
         self.response = self.rest_client.send_request("DELETE",
                                                  url=url_delete_task,
                                                  headers=headers)
-        LOGGER.debug(f"RESPONSE: {json.dumps(self.response, indent=4)}")
+        LOGGER.debug("RESPONSE: %s", LazyJson(self.response))
         # assertion
         self.validate.validate_response(self.response, "delete_task")
 
     @pytest.mark.functional
+    @pytest.mark.destructive
     @allure.title("Test Create Task with a Project")
     @allure.tag("functional")
     @allure.label("owner", "Joanna Yujra")
@@ -152,7 +155,7 @@ class TestTasks:
         # body to for Task with a project
         task_body = {
             "data": {
-                "name": f"Test task {self.faker.sentence()} on Project",
+                "name": resource_name(f"Test task {self.test_data.task_name()} on Project"),
                 "workspace": workspace_gid,
                 "projects": [create_project]
             }
@@ -161,12 +164,13 @@ class TestTasks:
                                                  url=url_create_task_with_project,
                                                  headers=headers,
                                                  body=task_body)
-        LOGGER.debug(f"RESPONSE: {json.dumps(self.response, indent=4)}")
-        self.task_list.append(self.response["body"]["data"]["gid"])
+        LOGGER.debug("RESPONSE: %s", LazyJson(self.response))
+        self.cleanup_queue.enqueue("tasks", self.response["body"]["data"]["gid"])
         # assertion
         self.validate.validate_response(self.response, "create_task")
 
     @pytest.mark.e2e
+    @pytest.mark.destructive
     @allure.title("Test Add a Task to a Project's section")
     @allure.tag("e2e")
     @allure.label("owner", "Joanna Yujra")
@@ -186,11 +190,12 @@ class TestTasks:
                                                  url=url_add_task_to_project,
                                                  headers=headers,
                                                  body=add_task_to_project_section)
-        LOGGER.debug(f"RESPONSE: {json.dumps(self.response, indent=4)}")
+        LOGGER.debug("RESPONSE: %s", LazyJson(self.response))
         # assertion
         self.validate.validate_response(self.response, "add_task_to_project_section")
 
     @pytest.mark.e2e
+    @pytest.mark.destructive
     @allure.title("Test Insert a Task before another task on a Project's section")
     @allure.tag("e2e")
     @allure.label("owner", "Joanna Yujra")
@@ -210,24 +215,13 @@ class TestTasks:
                                                  url=url_insert_task,
                                                  headers=headers,
                                                  body=insert_task_body)
-        LOGGER.debug(f"RESPONSE: {json.dumps(self.response, indent=4)}")
+        LOGGER.debug("RESPONSE: %s", LazyJson(self.response))
         # assertion
         self.validate.validate_response(self.response, "insert_task_before_another")
 
 
     @classmethod
     def teardown_class(cls) -> None:
-        """Clean up after all tests"""
-        # Clean up Tasks
+        """Close influx connection after all tests, the created resources are deleted by the cleanup queue"""
         LOGGER.info("Test Task Teardown Class")
-        for task_gid in cls.task_list:
-            url_delete_task = f"{url_base}tasks/{task_gid}"
-            LOGGER.debug(f"Delete Task Fixture: {url_delete_task}")
-            response = cls.rest_client.send_request("DELETE",
-                                                    url=url_delete_task,
-                                                    headers=headers)
-            LOGGER.debug(f"=> STATUS CODE: {response['status_code']}")
-            if response["status_code"] == 200:
-                LOGGER.debug(f"=> Task with GID {task_gid} deleted")
-
         cls.influxdb_client.close()
@@ -0,0 +1,95 @@
+import asyncio
+import socket
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from helper.async_rest_client import AsyncRestClient
+from utils.logger import get_logger
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        time.sleep(0.1)
+        body = b'{"data": {}}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def client_threads():
+    # the test server answers each connection from its own thread
+    return sum("process_request_thread" not in thread.name for thread in threading.enumerate())
+
+
+class SlowServer(ThreadingHTTPServer):
+    request_queue_size = 256
+
+
+class TestAsyncRestClient(unittest.IsolatedAsyncioTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = SlowServer(("127.0.0.1", 0), SlowHandler)
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}/"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    async def test_response_shape(self):
+        LOGGER.info("Test async client returns the RestClient response")
+        async with AsyncRestClient() as client:
+            response = await client.send_request("GET", url=self.url, headers={})
+        self.assertEqual(response["status_code"], 200)
+        self.assertEqual(response["body"], {"data": {}})
+        self.assertEqual(set(response), {"body", "status_code", "headers", "time", "request", "retries"})
+
+    async def test_requests_run_concurrently(self):
+        LOGGER.info("Test async client sends requests concurrently")
+        async with AsyncRestClient(concurrency=10, per_host_limit=10) as client:
+            start = time.perf_counter()
+            responses = await client.send_requests([("GET", self.url, {})] * 10)
+            elapsed = time.perf_counter() - start
+        self.assertTrue(all(response["status_code"] == 200 for response in responses))
+        self.assertLess(elapsed, 0.5)
+
+    async def test_concurrency_limit(self):
+        LOGGER.info("Test async client respects the per host limit")
+        async with AsyncRestClient(concurrency=10, per_host_limit=2) as client:
+            await asyncio.gather(*(client.send_request("GET", self.url, {}) for _ in range(6)))
+        self.assertEqual(client.max_in_flight, 2)
+
+    async def test_hundreds_in_flight_without_threads(self):
+        LOGGER.info("Test hundreds of requests are in flight on the event loop without a thread each")
+        threads = client_threads()
+        async with AsyncRestClient(concurrency=200) as client:
+            start = time.perf_counter()
+            responses = await client.send_requests([("GET", self.url, {})] * 200)
+            elapsed = time.perf_counter() - start
+            self.assertEqual(client.max_in_flight, 200)
+            self.assertLess(client_threads() - threads, 10)
+        self.assertEqual({response["status_code"] for response in responses}, {200})
+        # 20 s one after another, the threaded test server takes most of the time
+        self.assertLess(elapsed, 8)
+
+    async def test_connection_error_negative(self):
+        LOGGER.info("Test a closed port gives the Connection Error response of RestClient")
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        async with AsyncRestClient() as client:
+            client.retry_policies = {}
+            response = await client.send_request("GET", f"http://127.0.0.1:{port}/", {})
+        self.assertEqual((response["status_code"], response["body"]), (None, {"message": "Connection Error"}))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
@@ -0,0 +1,131 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+from helper import cleanup_queue
+from helper.cleanup_queue import CleanupQueue, read_pending
+from helper.retry import RetryPolicy
+from utils.logger import get_logger
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+DELAY = 0.05
+
+
+class FakeApi:
+    def __init__(self, statuses=None, delay=0.0):
+        """Answers the deletes with the statuses queued for each gid, then with 200"""
+        self.statuses = {gid: list(codes) for gid, codes in (statuses or {}).items()}
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def delete_resource(self, rest_client, resource, gid):
+        time.sleep(self.delay)
+        with self.lock:
+            self.calls.append((resource, gid))
+            codes = self.statuses.get(gid)
+            status = codes.pop(0) if codes else 200
+        return {"status_code": status, "body": {}}
+
+
+class TestCleanupQueue(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.journal = Path(directory.name) / "cleanup_journal.jsonl"
+
+    def queue(self, api, max_workers=4, max_retries=2):
+        patcher = mock.patch.object(cleanup_queue, "delete_resource", api.delete_resource)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return CleanupQueue(None, self.journal, max_workers=max_workers,
+                            retry_policy=RetryPolicy(max_retries=max_retries, backoff_base=0))
+
+    def test_deletes_run_in_background(self):
+        LOGGER.info("Test enqueue returns at once and the deletes run concurrently")
+        api = FakeApi(delay=DELAY)
+        queue = self.queue(api)
+        started = time.perf_counter()
+        for index in range(8):
+            queue.enqueue("tasks", str(index))
+        self.assertLess(time.perf_counter() - started, DELAY)
+        queue.close()
+        self.assertLess(time.perf_counter() - started, 4 * DELAY)
+        self.assertEqual(sorted(gid for _, gid in api.calls), [str(index) for index in range(8)])
+        stats = queue.stats()
+        self.assertEqual((stats["enqueued"], stats["deleted"], stats["failed"]), (8, 8, 0))
+        self.assertEqual(stats["latency"]["count"], 8)
+        self.assertFalse(self.journal.exists())
+
+    def test_deferred_deletes_sent_on_close(self):
+        LOGGER.info("Test a deferred delete is journaled at once and only sent on close")
+        api = FakeApi()
+        queue = self.queue(api)
+        queue.enqueue("tasks", "1", defer=True)
+        queue.enqueue("tasks", "2")
+        queue.drain()
+        self.assertEqual(api.calls, [("tasks", "2")])
+        self.assertEqual(read_pending(self.journal), [("tasks", "1")])
+        queue.close()
+        self.assertEqual(sorted(api.calls), [("tasks", "1"), ("tasks", "2")])
+        self.assertFalse(self.journal.exists())
+
+    def test_retries_server_errors(self):
+        LOGGER.info("Test a 5xx or a connection error is retried, a 404 is already deleted")
+        queue = self.queue(FakeApi({"1": [503, None], "2": [404]}))
+        queue.enqueue("projects", "1")
+        queue.enqueue("portfolios", "2")
+        queue.close()
+        stats = queue.stats()
+        self.assertEqual((stats["deleted"], stats["gone"], stats["retries"], stats["failed"]), (1, 1, 2, 0))
+
+    def test_failed_deletes_replayed_on_next_run_negative(self):
+        LOGGER.info("Test the deletes that failed stay in the journal and are sent by the next run")
+        queue = self.queue(FakeApi({"1": [500, 500], "2": [403]}), max_retries=1)
+        for gid in ("1", "2", "3"):
+            queue.enqueue("tasks", gid)
+        queue.close()
+        stats = queue.stats()
+        self.assertEqual((stats["deleted"], stats["failed"]), (1, 2))
+        self.assertEqual(sorted(stats["failures"]), [("tasks", "1", 500), ("tasks", "2", 403)])
+        self.assertEqual(sorted(read_pending(self.journal)), [("tasks", "1"), ("tasks", "2")])
+        api = FakeApi()
+        queue = self.queue(api)
+        self.assertEqual(queue.replay(), 2)
+        queue.close()
+        self.assertEqual(sorted(api.calls), [("tasks", "1"), ("tasks", "2")])
+        self.assertEqual((queue.stats()["replayed"], queue.stats()["deleted"]), (2, 2))
+        self.assertFalse(self.journal.exists())
+
+    def test_killed_run_replayed(self):
+        LOGGER.info("Test the deletes of a run killed before they were sent are replayed, a broken line is skipped")
+        self.journal.write_text(
+            '{"op": "add", "resource": "projects", "gid": "1"}\n'
+            '{"op": "add", "resource": "tasks", "gid": "2"}\n'
+            '{"op": "done", "resource": "projects", "gid": "1"}\n'
+            '{"op": "add", "resource": "tas',
+            encoding="utf-8",
+        )
+        self.assertEqual(read_pending(self.journal), [("tasks", "2")])
+
+    def test_merge_worker_stats(self):
+        LOGGER.info("Test the stats of the workers add up in the controller")
+        worker = self.queue(FakeApi({"2": [403]}), max_retries=0)
+        worker.enqueue("tasks", "1")
+        worker.enqueue("tasks", "2")
+        worker.close(compact=False)
+        controller = CleanupQueue(None, self.journal)
+        controller.merge(worker.to_dict())
+        controller.close(compact=False)
+        stats = controller.stats()
+        self.assertEqual((stats["enqueued"], stats["deleted"], stats["failed"]), (2, 1, 1))
+        self.assertEqual(stats["failures"], [("tasks", "2", 403)])
+        self.assertEqual(stats["latency"]["count"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from helper.data_factory import DataFactory, NameStream
+from utils.logger import get_logger
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+
+class TestDataFactory(unittest.TestCase):
+
+    def test_same_seed_same_names(self):
+        LOGGER.info("Test two factories with the same seed return the same names in the same order")
+        first = DataFactory(seed=7, worker_index=0, worker_count=1, batch_size=16)
+        second = DataFactory(seed=7, worker_index=0, worker_count=1, batch_size=64)
+        names = [first.project_name() for _ in range(40)]
+        self.assertEqual(names, [second.project_name() for _ in range(40)])
+        other = DataFactory(seed=8, worker_index=0, worker_count=1)
+        self.assertNotEqual(names, [other.project_name() for _ in range(40)])
+
+    def test_names_unique_across_workers(self):
+        LOGGER.info("Test the workers of a run never get the same name")
+        names = []
+        for worker_index in range(3):
+            factory = DataFactory(seed=0, worker_index=worker_index, worker_count=3)
+            names += [factory.section_name() for _ in range(2000)]
+        self.assertEqual(len(set(names)), len(names))
+
+    def test_names_unique_after_every_combination(self):
+        LOGGER.info("Test the names get a number suffix once the combinations run out")
+        stream = NameStream("task", seed=0)
+        names = stream.batch(stream.size + 10)
+        self.assertEqual(len(set(names)), len(names))
+        self.assertEqual(names[stream.size], f"{names[0]} 2")
+
+    def test_kinds(self):
+        LOGGER.info("Test every kind of name has its own format")
+        factory = DataFactory(seed=0, worker_index=0, worker_count=1)
+        self.assertEqual(len(factory.project_name().split()), 3)
+        self.assertIn(" the ", factory.task_name())
+        self.assertEqual(len(factory.section_name().split()), 3)
+        self.assertTrue(factory.notes().endswith("."))
+
+
+if __name__ == "__main__":
+    unittest.main()
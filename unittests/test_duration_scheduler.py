@@ -0,0 +1,90 @@
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from utils.duration_scheduler import DEFAULT_DURATION, DurationHistory, pack_shards
+from utils.logger import get_logger
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+REPO_ROOT = Path(__file__).parent.parent
+TEST_FILE = """
+import time
+
+
+class TestFast:
+    def test_one(self):
+        pass
+
+
+class TestSlow:
+    def test_one(self):
+        time.sleep(0.3)
+
+    def test_two(self):
+        pass
+
+
+class TestMedium:
+    def test_one(self):
+        time.sleep(0.1)
+"""
+
+
+class TestDurationScheduler(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def run_pytest(self, *args) -> list:
+        """Runs the tests of TEST_FILE with the plugin and returns the node ids in the order they ran"""
+        (self.directory / "test_sample.py").write_text(TEST_FILE)
+        (self.directory / "pytest.ini").write_text("[pytest]\n")
+        output = subprocess.run(
+            [sys.executable, "-m", "pytest", "-v", "-p", "utils.duration_scheduler", "-p", "no:cacheprovider",
+             "-c", str(self.directory / "pytest.ini"), "--rootdir", str(self.directory),
+             "--durations-file", str(self.directory / "durations.json"), str(self.directory), *args],
+            cwd=REPO_ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+        ).stdout
+        return [line.split(" ")[0] for line in output.splitlines() if " PASSED" in line]
+
+    def test_pack_shards_balances_durations(self):
+        LOGGER.info("Test longest processing time packing balances the shards")
+        shards = pack_shards({"a": 7, "b": 5, "c": 4, "d": 3, "e": 1}, 2)
+        self.assertEqual(shards, [["a", "d"], ["b", "c", "e"]])
+        self.assertEqual(pack_shards({"a": 1}, 3), [["a"], [], []])
+
+    def test_history_smooths_durations(self):
+        LOGGER.info("Test the history mixes the new durations with the previous ones")
+        history = DurationHistory(self.directory / "durations.json")
+        self.assertEqual(history.default_duration(), DEFAULT_DURATION)
+        history.update({"test_a": 2.0, "test_b": 1.0})
+        history.update({"test_a": 4.0})
+        history = DurationHistory(self.directory / "durations.json")
+        self.assertEqual(history.durations, {"test_a": 3.0, "test_b": 1.0})
+        self.assertEqual(history.estimate("test_c", history.default_duration()), 2.0)
+
+    def test_slowest_class_runs_first(self):
+        LOGGER.info("Test the second run orders the classes by their duration in the first one")
+        first = self.run_pytest()
+        # without history every test has the default duration, the class with more tests goes first
+        self.assertEqual([nodeid.split("::")[1] for nodeid in first], ["TestSlow", "TestSlow", "TestFast", "TestMedium"])
+        durations = json.loads((self.directory / "durations.json").read_text())
+        self.assertEqual(len(durations), 4)
+        second = self.run_pytest()
+        self.assertEqual([nodeid.split("::")[1] for nodeid in second], ["TestSlow", "TestSlow", "TestMedium", "TestFast"])
+
+    def test_shards_split_the_classes(self):
+        LOGGER.info("Test the shards run every test once")
+        all_tests = self.run_pytest()
+        shards = [self.run_pytest("--shard-count", "2", "--shard-index", str(index)) for index in range(2)]
+        self.assertEqual([nodeid.split("::")[1] for nodeid in shards[0]], ["TestSlow", "TestSlow"])
+        self.assertEqual(sorted(shards[0] + shards[1]), sorted(all_tests))
+
+
+if __name__ == "__main__":
+    unittest.main()
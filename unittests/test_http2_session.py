@@ -0,0 +1,70 @@
+import socket
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from helper.http2_session import Http2Session
+from helper.http_session import create_session
+from helper.rest_client import RestClient
+from helper.retry import CircuitBreaker
+from helper.validate_response import ValidateResponse
+from utils.logger import get_logger
+from utils.mock_asana_h2_server import MockAsanaH2Server
+from utils.mock_asana_server import Latency, MockAsanaApp
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+WORKSPACE_GID = "1100000000000000"
+
+
+class TestHttp2Session(unittest.TestCase):
+
+    def setUp(self):
+        self.session = Http2Session()
+        self.addCleanup(self.session.close)
+        self.rest_client = RestClient(self.session, retry_policies={}, circuit_breaker=CircuitBreaker(100))
+
+    def test_responses_match_schemas(self):
+        LOGGER.info("Test the HTTP/2 stand-in answers like the HTTP/1.1 stub")
+        with MockAsanaH2Server() as server:
+            url = f"{server.url_base}projects"
+            body = {"data": {"name": "Mock", "workspace": WORKSPACE_GID}}
+            response = self.rest_client.send_request("POST", url=url, headers={}, body=body)
+            ValidateResponse().validate_response(response, "create_project")
+            project_gid = response["body"]["data"]["gid"]
+            response = self.rest_client.send_request("GET", url=f"{url}/{project_gid}", headers={})
+            ValidateResponse().validate_response(response, "get_project")
+            response = self.rest_client.send_request("GET", url=f"{url}/{project_gid}0", headers={})
+        self.assertEqual(response["status_code"], 404)
+        self.assertEqual(response["request"], {"url": f"{url}/{project_gid}0", "method": "GET"})
+
+    def test_concurrent_streams_share_one_connection(self):
+        LOGGER.info("Test concurrent requests are streams of one connection")
+        with MockAsanaH2Server(MockAsanaApp(latency=Latency("fixed:0.05"))) as server:
+            url = f"{server.url_base}projects"
+            with ThreadPoolExecutor(max_workers=20) as executor:
+                responses = list(executor.map(
+                    lambda _: self.rest_client.send_request("GET", url=url, headers={}), range(20)
+                ))
+        self.assertEqual({response["status_code"] for response in responses}, {200})
+        stats = self.session.stats()
+        self.assertEqual((stats["requests"], stats["new_connections"], server.connections_accepted), (20, 1, 1))
+        self.assertGreater(stats["max_concurrent_streams"], 1)
+        self.assertGreater(server.max_active_streams, 1)
+        self.assertEqual(stats["stream_latency"]["count"], 20)
+        self.assertGreaterEqual(stats["stream_latency"]["p50"], 0.05)
+
+    def test_connection_error_negative(self):
+        LOGGER.info("Test a closed port is a Connection Error of RestClient")
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        response = self.rest_client.send_request("GET", url=f"http://127.0.0.1:{port}/api/1.0/projects", headers={})
+        self.assertEqual((response["status_code"], response["body"]), (None, {"message": "Connection Error"}))
+
+    def test_unknown_transport_negative(self):
+        LOGGER.info("Test an unknown transport is rejected")
+        with self.assertRaises(ValueError):
+            create_session("http3")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import socket
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from helper.http_session import PooledSession
+from helper.rest_client import RestClient
+from utils.logger import get_logger
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+
+    do_HEAD = do_GET
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestPooledSession(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}/"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    def test_requests_reuse_pooled_connection(self):
+        LOGGER.info("Test requests reuse the pooled connection")
+        session = PooledSession(pool_size=2)
+        rest_client = RestClient(session)
+        for _ in range(5):
+            rest_client.send_request("GET", url=self.url, headers={})
+        self.assertEqual(
+            session.stats(), {"requests": 5, "new_connections": 1, "warmed_connections": 0, "pool_hits": 4}
+        )
+
+    def test_warm_up_opens_connections(self):
+        LOGGER.info("Test warm up opens connections in parallel")
+        session = PooledSession(pool_size=3)
+        session.warm_up(self.url, 3)
+        self.assertEqual(session.stats()["new_connections"], 3)
+        for _ in range(3):
+            session.get(self.url)
+        self.assertEqual(
+            session.stats(), {"requests": 3, "new_connections": 3, "warmed_connections": 3, "pool_hits": 3}
+        )
+
+    def test_warm_up_failed_connections_not_counted_negative(self):
+        LOGGER.info("Test warm up only counts the connections it opened")
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        session = PooledSession(pool_size=2)
+        session.warm_up(f"http://127.0.0.1:{port}/", 2)
+        self.assertEqual(
+            session.stats(), {"requests": 0, "new_connections": 0, "warmed_connections": 0, "pool_hits": 0}
+        )
+
+    def test_without_keep_alive_opens_new_connections(self):
+        LOGGER.info("Test session without keep alive opens a connection per request")
+        session = PooledSession(pool_size=2, keep_alive=False)
+        for _ in range(3):
+            session.get(self.url)
+        self.assertEqual(session.stats()["pool_hits"], 0)
+
+    def test_phase_timing(self):
+        LOGGER.info("Test phase timing of new and reused connections")
+        rest_client = RestClient(PooledSession(pool_size=1, phase_timing=True))
+        first = rest_client.send_request("GET", url=self.url, headers={})["timing"]
+        second = rest_client.send_request("GET", url=self.url, headers={})["timing"]
+        self.assertEqual(list(first), ["dns", "connect", "tls", "ttfb", "download", "json_decode"])
+        self.assertGreater(first["connect"], 0)
+        self.assertEqual(first["tls"], 0)
+        self.assertGreater(second["ttfb"], 0)
+        self.assertEqual((second["dns"], second["connect"]), (0, 0))
+
+    def test_without_phase_timing(self):
+        LOGGER.info("Test Response has no timing when phase timing is disabled")
+        rest_client = RestClient(PooledSession(pool_size=1))
+        self.assertNotIn("timing", rest_client.send_request("GET", url=self.url, headers={}))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
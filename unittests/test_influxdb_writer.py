@@ -0,0 +1,102 @@
+import tempfile
+import threading
+import time
+import unittest
+from utils.influxdb_connection import InfluxDBConnection
+from utils.influxdb_writer import BatchingWriter
+from utils.logger import get_logger
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+
+class TestBatchingWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.batches = []
+
+    def write_batch(self, batch):
+        self.batches.append(list(batch))
+
+    def test_flush_by_size(self):
+        LOGGER.info("Test writer flush by batch size")
+        writer = BatchingWriter(self.write_batch, batch_size=3, flush_interval=60)
+        for record in range(6):
+            writer.put(record)
+        writer.flush(timeout=5)
+        writer.close(timeout=5)
+        self.assertEqual(self.batches, [[0, 1, 2], [3, 4, 5]])
+
+    def test_flush_by_interval(self):
+        LOGGER.info("Test writer flush by interval")
+        writer = BatchingWriter(self.write_batch, batch_size=100, flush_interval=0.05)
+        writer.put("record")
+        time.sleep(0.5)
+        self.assertEqual(self.batches, [["record"]])
+        writer.close(timeout=5)
+
+    def test_close_writes_pending_records(self):
+        LOGGER.info("Test writer close writes pending records")
+        writer = BatchingWriter(self.write_batch, batch_size=100, flush_interval=60)
+        for record in range(10):
+            writer.put(record)
+        writer.close(timeout=5)
+        self.assertEqual(self.batches, [list(range(10))])
+        self.assertEqual(writer.written, 10)
+
+    def test_full_queue_drops_records_negative(self):
+        LOGGER.info("Test writer drops records when the queue is full")
+        blocked = threading.Event()
+        writer = BatchingWriter(lambda batch: blocked.wait(5), batch_size=1, flush_interval=60, queue_size=2)
+        results = [writer.put(record) for record in range(10)]
+        self.assertFalse(all(results))
+        self.assertGreater(writer.dropped, 0)
+        blocked.set()
+        writer.close(timeout=5)
+
+    def test_write_error_is_counted_negative(self):
+        LOGGER.info("Test writer counts failed writes")
+
+        def fail(batch):
+            raise ConnectionError("InfluxDB down")
+
+        writer = BatchingWriter(fail, batch_size=2, flush_interval=60)
+        writer.put(1)
+        writer.put(2)
+        writer.close(timeout=5)
+        self.assertEqual(writer.failed, 2)
+
+
+class TestInfluxDBConnection(unittest.TestCase):
+
+    def test_points_written_to_metrics_file(self):
+        LOGGER.info("Test points are written to the worker metrics file")
+        response = {"request": {"url": "http://localhost/tasks", "method": "GET"}, "status_code": 200, "time": 0.25}
+        with tempfile.TemporaryDirectory() as directory:
+            connection = InfluxDBConnection(enabled=False, directory=directory)
+            connection.store_data_influxdb(response, "tasks")
+            connection.close()
+            lines = connection.metrics_file.read_text().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertRegex(lines[0], r"^response_time,endpoint=tasks,method=GET,run_id=\w+,status=200,url=\S+,worker=\w+ value=0.25 \d+$")
+
+    def test_phase_timing_written_as_fields(self):
+        LOGGER.info("Test request phases are written as extra fields")
+        response = {
+            "request": {"url": "http://localhost/tasks", "method": "GET"},
+            "status_code": 200,
+            "time": 0.25,
+            "timing": {"connect": 0.01, "ttfb": 0.2},
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            connection = InfluxDBConnection(enabled=False, directory=directory)
+            connection.store_data_influxdb(response, "tasks")
+            connection.close()
+            lines = connection.metrics_file.read_text().splitlines()
+        self.assertRegex(lines[0], r" connect=0.01,ttfb=0.2,value=0.25 \d+$")
+
+    def test_disabled_connection_stores_nothing(self):
+        LOGGER.info("Test disabled connection does not create a writer")
+        connection = InfluxDBConnection(enabled=False, directory="")
+        self.assertIsNone(connection.writer)
+        connection.store_data_influxdb({}, "tasks")
+        connection.close()
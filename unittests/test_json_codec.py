@@ -0,0 +1,78 @@
+import unittest
+from helper.http_session import PooledSession
+from helper.rest_client import RestClient
+from utils.json_codec import StdlibCodec, available_codecs, create_codec
+from utils.logger import get_logger
+from utils.mock_asana_server import MockAsanaServer
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+VALUE = {"data": {"name": "Café ☕", "gid": "1200000000000001", "followers": [1, 2.5, None, True], "notes": ""}}
+
+
+class TestJsonCodec(unittest.TestCase):
+
+    def test_codecs_round_trip(self):
+        LOGGER.info("Test every installed codec encodes to bytes and decodes bytes and text")
+        for name in available_codecs():
+            with self.subTest(codec=name):
+                codec = create_codec(name)
+                encoded = codec.dumps(VALUE)
+                self.assertIsInstance(encoded, bytes)
+                self.assertEqual(codec.loads(encoded), VALUE)
+                self.assertEqual(codec.loads(encoded.decode("utf-8")), VALUE)
+                self.assertEqual(StdlibCodec.loads(encoded), VALUE)
+
+    def test_invalid_json_is_value_error(self):
+        LOGGER.info("Test every codec raises ValueError on invalid JSON")
+        for name in available_codecs():
+            with self.subTest(codec=name), self.assertRaises(ValueError):
+                create_codec(name).loads(b"{not json")
+
+    def test_dumps_text_for_logs(self):
+        LOGGER.info("Test the log text is indented and writes values that are not serializable with str")
+        for name in available_codecs():
+            with self.subTest(codec=name):
+                text = create_codec(name).dumps_text({"when": object, "items": [1]}, indent=4)
+                self.assertIn("\n", text)
+                self.assertIn("<class 'object'>", text)
+
+    def test_auto_and_unknown_codec(self):
+        LOGGER.info("Test auto picks the first installed codec and an unknown name fails")
+        self.assertEqual(available_codecs()[-1], "stdlib")
+        self.assertEqual(create_codec("auto").name, available_codecs()[0])
+        with self.assertRaises(ValueError):
+            create_codec("yaml")
+
+
+class TestRestClientCodec(unittest.TestCase):
+
+    def test_dict_and_encoded_bodies(self):
+        LOGGER.info("Test dictionary and pre-encoded bodies create the same project with every codec")
+        with MockAsanaServer() as server:
+            for name in available_codecs():
+                with self.subTest(codec=name):
+                    rest_client = RestClient(PooledSession(), codec=create_codec(name))
+                    url = f"{server.url_base}projects"
+                    body = {"data": {"name": "Codec ☕", "workspace": "1100000000000000"}}
+                    from_dict = rest_client.send_request("POST", url=url, headers={}, body=body)
+                    from_bytes = rest_client.send_request(
+                        "POST", url=url, headers={}, body=rest_client.codec.dumps(body)
+                    )
+                    self.assertEqual((from_dict["status_code"], from_bytes["status_code"]), (201, 201))
+                    self.assertEqual(from_dict["body"]["data"]["name"], "Codec ☕")
+                    self.assertEqual(from_bytes["body"]["data"]["name"], "Codec ☕")
+
+    def test_caller_headers_not_changed(self):
+        LOGGER.info("Test the JSON Content-Type is added to a copy of the headers")
+        headers = {"Authorization": "Bearer token"}
+        rest_client = RestClient(PooledSession(), codec=StdlibCodec())
+        encoded_headers, body = rest_client._encode_body(headers, {"data": {}})
+        self.assertEqual(encoded_headers["Content-Type"], "application/json")
+        self.assertEqual(headers, {"Authorization": "Bearer token"})
+        self.assertEqual(body, b'{"data":{}}')
+        self.assertEqual(rest_client._encode_body(headers, None), (headers, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
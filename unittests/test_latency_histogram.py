@@ -0,0 +1,67 @@
+import random
+import unittest
+from utils.latency_histogram import LatencyHistogram, LatencyRecorder, endpoint_key
+from utils.logger import get_logger
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_percentiles_within_precision(self):
+        LOGGER.info("Test histogram percentiles keep two significant digits")
+        generator = random.Random(7)
+        values = sorted(generator.lognormvariate(-3, 1) for _ in range(10000))
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+        for percent in (50, 90, 99):
+            expected = values[int(percent / 100 * len(values)) - 1]
+            self.assertAlmostEqual(histogram.percentile(percent), expected, delta=expected * 0.01 + 2e-6)
+        self.assertAlmostEqual(histogram.summary()["max"], values[-1], delta=1e-6)
+        self.assertEqual(histogram.total, 10000)
+
+    def test_merge_is_lossless(self):
+        LOGGER.info("Test merged histograms equal one histogram with every value")
+        generator = random.Random(3)
+        values = [generator.expovariate(20) for _ in range(2000)]
+        single, first, second = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for index, value in enumerate(values):
+            single.record(value)
+            (first if index % 2 else second).record(value)
+        first.merge(LatencyHistogram.from_dict(second.to_dict()))
+        self.assertEqual(first.counts, single.counts)
+        self.assertEqual(first.summary(), single.summary())
+
+    def test_merge_different_configuration_negative(self):
+        LOGGER.info("Test merge of histograms with different precision")
+        with self.assertRaises(ValueError):
+            LatencyHistogram(significant_digits=2).merge(LatencyHistogram(significant_digits=3))
+
+    def test_values_above_highest_are_counted(self):
+        LOGGER.info("Test values above the highest trackable value")
+        histogram = LatencyHistogram(highest_us=1_000_000)
+        histogram.record(120)
+        self.assertEqual(histogram.total, 1)
+        self.assertEqual(histogram.percentile(100), 120)
+
+
+class TestLatencyRecorder(unittest.TestCase):
+
+    def test_endpoint_key(self):
+        LOGGER.info("Test endpoint key replaces GIDs")
+        url = "https://app.asana.com/api/1.0/tasks/1208765432101234/addProject"
+        self.assertEqual(endpoint_key("POST", url), ("POST", "tasks/{gid}/addProject"))
+        self.assertEqual(endpoint_key("GET", "http://127.0.0.1:8080/api/1.0/projects"), ("GET", "projects"))
+
+    def test_recorder_summary_and_merge(self):
+        LOGGER.info("Test recorder keyed by endpoint and method")
+        worker_1, worker_2 = LatencyRecorder(), LatencyRecorder()
+        worker_1.record("GET", "http://localhost/api/1.0/tasks/1", 0.1)
+        worker_2.record("GET", "http://localhost/api/1.0/tasks/2", 0.3)
+        worker_2.record("DELETE", "http://localhost/api/1.0/tasks/2", 0.2)
+        worker_1.merge(LatencyRecorder.from_dict(worker_2.to_dict()))
+        summary = worker_1.summary()
+        self.assertEqual(list(summary), ["DELETE tasks/{gid}", "GET tasks/{gid}"])
+        self.assertEqual(summary["GET tasks/{gid}"]["count"], 2)
+        self.assertAlmostEqual(summary["GET tasks/{gid}"]["max"], 0.3)
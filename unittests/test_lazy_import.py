@@ -0,0 +1,54 @@
+import subprocess
+import sys
+import types
+import unittest
+from utils.lazy_import import lazy_import
+from utils.logger import get_logger
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+
+class TestLazyImport(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = sys.modules.pop("colorsys", None)
+        self.addCleanup(self.restore)
+
+    def restore(self):
+        sys.modules.pop("colorsys", None)
+        if self.saved is not None:
+            sys.modules["colorsys"] = self.saved
+
+    def test_module_loads_on_first_attribute(self):
+        LOGGER.info("Test the module is executed on its first attribute access")
+        colorsys = lazy_import("colorsys")
+        self.assertIsNot(type(colorsys), types.ModuleType)
+        self.assertEqual(colorsys.rgb_to_hsv(1.0, 0.0, 0.0), (0.0, 1.0, 1.0))
+        self.assertIs(type(colorsys), types.ModuleType)
+        self.assertIs(lazy_import("colorsys"), colorsys)
+
+    def test_missing_module(self):
+        LOGGER.info("Test a missing module fails at once")
+        with self.assertRaises(ModuleNotFoundError):
+            lazy_import("module_that_does_not_exist")
+
+    def test_config_resolves_on_first_use(self):
+        LOGGER.info("Test settings are read on first use, environment changes after the import are seen")
+        code = (
+            "import os, sys\n"
+            "import config.config as config\n"
+            "os.environ['HTTP_POOL_SIZE'] = '42'\n"
+            "from config.config import http_pool_size\n"
+            "print(http_pool_size, 'influxdb_client' in sys.modules, 'jsonschema' in sys.modules)\n"
+            "import utils.influxdb_connection, helper.validate_response\n"
+            "print('influxdb_client' in sys.modules and type(sys.modules['influxdb_client']).__name__)\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=True
+        ).stdout.split("\n")
+        self.assertEqual(output[0], "42 False False")
+        self.assertEqual(output[1], "_LazyModule")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+from helper import asana_resources
+from helper.cleanup_queue import CleanupQueue
+from helper.http_session import PooledSession
+from helper.rest_client import RestClient
+from utils.load_runner import CreateTask, LoadScenario, OpenLoopRunner, arrival_times
+from utils.logger import get_logger
+from utils.mock_asana_server import Latency, MockAsanaApp, MockAsanaServer
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+
+class ListProjects(LoadScenario):
+    endpoint = "projects"
+    url = None
+
+    def run(self, prepared=None):
+        return self.rest_client.send_request("GET", url=f"{self.url}projects", headers={})
+
+
+class PreparedListProjects(ListProjects):
+    def prepare(self):
+        return self.rest_client.send_request("GET", url=f"{self.url}projects", headers={})
+
+
+class TestLoadRunner(unittest.TestCase):
+
+    def test_arrival_times(self):
+        LOGGER.info("Test open-loop arrival schedule")
+        self.assertEqual(len(list(arrival_times(rate=10, duration=2))), 20)
+        ramped = list(arrival_times(rate=10, duration=2, ramp_up=1))
+        self.assertEqual(len(ramped), 15)
+        self.assertEqual(ramped, sorted(ramped))
+        self.assertGreater(ramped[1] - ramped[0], ramped[-1] - ramped[-2])
+
+    def test_rate_and_duration_validated_negative(self):
+        LOGGER.info("Test a rate or a duration of 0 is rejected")
+        for rate, duration in ((0, 1), (-5, 1), (10, 0)):
+            with self.assertRaises(ValueError):
+                OpenLoopRunner(ListProjects(None, None), rate=rate, duration=duration)
+
+    def test_run_reports_achieved_rate(self):
+        LOGGER.info("Test open-loop run against the mock server")
+        with MockAsanaServer(MockAsanaApp(latency=Latency("fixed:0.05"))) as server:
+            ListProjects.url = server.url_base
+            scenario = ListProjects(RestClient(PooledSession(pool_size=20)), None)
+            report = OpenLoopRunner(scenario, rate=40, duration=1, max_workers=20).run()
+        self.assertEqual(report["scheduled"], 40)
+        self.assertEqual(report["completed"], 40)
+        self.assertEqual(report["errors"], 0)
+        # the requests still in flight at the end of the schedule are not counted
+        self.assertAlmostEqual(report["achieved_rate"], 40, delta=3)
+        self.assertGreaterEqual(report["latency_p50"], 0.05)
+
+    def test_achieved_rate_shows_shortfall_negative(self):
+        LOGGER.info("Test the achieved rate falls below the target when the server cannot keep up")
+        with MockAsanaServer(MockAsanaApp(latency=Latency("fixed:0.2"))) as server:
+            ListProjects.url = server.url_base
+            scenario = ListProjects(RestClient(PooledSession(pool_size=2)), None)
+            report = OpenLoopRunner(scenario, rate=20, duration=1, max_workers=2).run()
+        self.assertEqual(report["completed"], 20)
+        self.assertLess(report["completed_in_window"], 15)
+        self.assertLess(report["achieved_rate"], 15)
+        self.assertGreater(report["elapsed"], 1.5)
+
+    def test_prepare_not_measured(self):
+        LOGGER.info("Test the resources created by prepare are not part of the latency")
+        with MockAsanaServer(MockAsanaApp(latency=Latency("fixed:0.1"))) as server:
+            PreparedListProjects.url = server.url_base
+            scenario = PreparedListProjects(RestClient(PooledSession(pool_size=10)), None)
+            report = OpenLoopRunner(scenario, rate=10, duration=1, max_workers=10).run()
+        self.assertEqual(report["completed"], 10)
+        self.assertLess(report["latency_p99"], 0.18)
+        self.assertLess(report["service_time_p99"], 0.18)
+
+    def test_created_resources_deleted_after_run(self):
+        LOGGER.info("Test the resources created by a load run are journaled and deleted once it is over")
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        journal = Path(directory.name) / "cleanup_journal.jsonl"
+        app = MockAsanaApp()
+        with MockAsanaServer(app) as server, mock.patch.multiple(
+            asana_resources, url_base=server.url_base, workspace_gid="1100000000000000"
+        ):
+            rest_client = RestClient(PooledSession(pool_size=4))
+            cleanup_queue = CleanupQueue(rest_client, journal)
+            report = OpenLoopRunner(CreateTask(rest_client, cleanup_queue), rate=10, duration=0.5).run()
+            self.assertEqual(len(app._store["tasks"]), 5)
+            self.assertTrue(journal.exists())
+            cleanup_queue.close()
+        self.assertEqual((report["completed"], report["errors"]), (5, 0))
+        self.assertEqual(app._store["tasks"], {})
+        self.assertEqual(cleanup_queue.stats()["deleted"], 5)
+        self.assertFalse(journal.exists())
@@ -1,5 +1,8 @@
+import logging
+import queue
 import unittest
-from utils.logger import get_logger
+from logging.handlers import RotatingFileHandler
+from utils.logger import DeferredQueueHandler, LazyJson, get_logger
 
 LOGGER = get_logger(__name__, "DEBUG")
 
@@ -10,3 +13,46 @@ class TestLogger(unittest.TestCase):
         LOGGER.warning('log WARNING level')
         LOGGER.error('log ERROR level')
         LOGGER.critical('log CRITICAL level')
+
+    def test_loggers_share_one_file_handler(self):
+        LOGGER.info("Test every logger writes through the same handlers")
+        first = get_logger("test_logger.first", "DEBUG")
+        second = get_logger("test_logger.second", "INFO")
+        self.assertEqual(first.handlers, second.handlers)
+        self.assertEqual(first.handlers, LOGGER.handlers)
+        file_handlers = [handler for handler in first.handlers if isinstance(handler, RotatingFileHandler)]
+        self.assertLessEqual(len(file_handlers), 1)
+
+    def test_lazy_json_is_built_only_when_emitted(self):
+        LOGGER.info("Test LazyJson is serialized only for emitted records")
+        serialized = []
+
+        class Payload:
+            def __str__(self):
+                serialized.append(1)
+                return "payload"
+
+        logger = get_logger("test_logger.lazy", "INFO")
+        logger.debug("RESPONSE: %s", LazyJson({"value": Payload()}))
+        self.assertEqual(serialized, [])
+        lazy = LazyJson({"value": Payload()})
+        self.assertEqual(str(lazy), str(lazy))
+        self.assertEqual(serialized, [1])
+
+    def test_deferred_queue_handler_formats_in_listener(self):
+        LOGGER.info("Test queue handler defers the message formatting to the listener")
+        records = queue.SimpleQueue()
+        logger = logging.getLogger("test_logger.queue")
+        logger.propagate = False
+        handler = DeferredQueueHandler(records)
+        logger.addHandler(handler)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.error("Failed %s", LazyJson({"a": 1}, indent=None), exc_info=True)
+        logger.removeHandler(handler)
+        record = records.get_nowait()
+        # the stdlib codec separates with a space, orjson writes compact JSON
+        self.assertIn(record.getMessage(), ('Failed {"a": 1}', 'Failed {"a":1}'))
+        self.assertIn("ValueError: boom", record.exc_text)
+        self.assertIsNone(record.exc_info)
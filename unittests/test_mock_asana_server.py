@@ -0,0 +1,111 @@
+import json
+import time
+import unittest
+from helper.http_session import PooledSession
+from helper.rest_client import RestClient
+from helper.validate_response import ValidateResponse
+from utils.logger import get_logger
+from utils.mock_asana_server import Latency, MockAsanaApp, MockAsanaServer
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+WORKSPACE_GID = "1100000000000000"
+
+
+class TestMockAsanaServer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockAsanaServer().start()
+        cls.url_base = cls.server.url_base
+        cls.rest_client = RestClient(PooledSession())
+        cls.validate = ValidateResponse()
+
+    def send(self, method, path, body=None):
+        return self.rest_client.send_request(method, url=f"{self.url_base}{path}", headers={}, body=body)
+
+    def test_project_responses_match_schemas(self):
+        LOGGER.info("Test mock project responses match input_json")
+        response = self.send("POST", "projects", {"data": {"name": "Mock", "workspace": WORKSPACE_GID}})
+        self.validate.validate_response(response, "create_project")
+        project_gid = response["body"]["data"]["gid"]
+        self.validate.validate_response(self.send("GET", f"projects/{project_gid}"), "get_project")
+        response = self.send("PUT", f"projects/{project_gid}", {"data": {"name": "Updated", "color": "light-green"}})
+        self.validate.validate_response(response, "update_project")
+        self.validate.validate_response(self.send("DELETE", f"projects/{project_gid}"), "delete_project")
+        self.assertEqual(self.send("GET", f"projects/{project_gid}")["status_code"], 404)
+
+    def test_section_and_task_responses_match_schemas(self):
+        LOGGER.info("Test mock section and task responses match input_json")
+        project = self.send("POST", "projects", {"data": {"name": "Mock", "workspace": WORKSPACE_GID}})
+        project_gid = project["body"]["data"]["gid"]
+        section = self.send("POST", f"projects/{project_gid}/sections", {"data": {"name": "Section"}})
+        self.validate.validate_response(section, "create_section")
+        section_gid = section["body"]["data"]["gid"]
+        self.validate.validate_response(self.send("GET", f"sections/{section_gid}"), "get_section")
+        task = self.send("POST", "tasks", {"data": {"name": "Task", "workspace": WORKSPACE_GID}})
+        self.validate.validate_response(task, "create_task")
+        task_gid = task["body"]["data"]["gid"]
+        self.validate.validate_response(self.send("GET", f"tasks/{task_gid}"), "get_task")
+        response = self.send("POST", f"tasks/{task_gid}/addProject",
+                             {"data": {"project": project_gid, "section": section_gid}})
+        self.validate.validate_response(response, "add_task_to_project_section")
+        self.validate.validate_response(self.send("DELETE", f"tasks/{task_gid}"), "delete_task")
+        self.validate.validate_response(self.send("DELETE", f"sections/{section_gid}"), "delete_section")
+
+    def test_portfolio_responses_match_schemas(self):
+        LOGGER.info("Test mock portfolio responses match input_json")
+        project = self.send("POST", "projects", {"data": {"name": "Mock", "workspace": WORKSPACE_GID}})
+        portfolio = self.send("POST", "portfolios", {"data": {"name": "Portfolio", "workspace": WORKSPACE_GID}})
+        portfolio_gid = portfolio["body"]["data"]["gid"]
+        response = self.send("POST", f"portfolios/{portfolio_gid}/addItem",
+                             {"data": {"item": project["body"]["data"]["gid"]}})
+        self.validate.validate_response(response, "add_project_to_portfolio")
+        self.validate.validate_response(self.send("DELETE", f"portfolios/{portfolio_gid}"), "delete_portfolio")
+
+    def test_error_responses_negative(self):
+        LOGGER.info("Test mock error responses match input_json")
+        self.validate.validate_response(self.send("POST", "projects"), "create_project_without_body")
+        response = self.send("PUT", "sections/InvalidGID", {"data": {"name": "Section"}})
+        self.validate.validate_response(response, "update_section_with_string_section_gid")
+        self.assertEqual(self.send("GET", "project")["status_code"], 404)
+
+    def test_list_opt_fields(self):
+        LOGGER.info("Test mock lists compact records with the fields of opt_fields")
+        app = MockAsanaApp()
+        app.handle("POST", "/api/1.0/projects", b'{"data": {"name": "Mock", "workspace": "1100000000000000"}}')
+        status, _, body = app.handle("GET", "/api/1.0/projects?limit=10&opt_fields=created_at,unknown", b"")
+        self.assertEqual(status, 200)
+        self.assertEqual(sorted(json.loads(body)["data"][0]), ["created_at", "gid", "name", "resource_type"])
+
+    def test_list_project_tasks(self):
+        LOGGER.info("Test mock lists only the tasks of the project")
+        app = MockAsanaApp()
+        _, _, body = app.handle("POST", "/api/1.0/projects", b'{"data": {"name": "P", "workspace": "1100000000000000"}}')
+        project = json.loads(body)["data"]["gid"]
+        app.handle("POST", "/api/1.0/tasks", f'{{"data": {{"name": "In", "projects": ["{project}"]}}}}'.encode())
+        app.handle("POST", "/api/1.0/tasks", b'{"data": {"name": "Out", "workspace": "1100000000000000"}}')
+        _, _, body = app.handle("GET", f"/api/1.0/projects/{project}/tasks?limit=10", b"")
+        self.assertEqual([task["name"] for task in json.loads(body)["data"]], ["In"])
+        status, _, _ = app.handle("GET", "/api/1.0/projects/99/tasks", b"")
+        self.assertEqual(status, 404)
+
+    def test_error_injection(self):
+        LOGGER.info("Test mock error injection with Retry-After")
+        app = MockAsanaApp(error_rate=1.0, error_codes=(429,), retry_after=3)
+        status, headers, body = app.handle("GET", "/api/1.0/projects", b"")
+        self.assertEqual(status, 429)
+        self.assertEqual(headers["Retry-After"], "3")
+
+    def test_latency(self):
+        LOGGER.info("Test mock latency distribution")
+        app = MockAsanaApp(latency=Latency("fixed:0.05"))
+        start = time.perf_counter()
+        app.handle("GET", "/api/1.0/projects", b"")
+        self.assertGreaterEqual(time.perf_counter() - start, 0.05)
+        with self.assertRaises(ValueError):
+            Latency("pareto:1")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
@@ -0,0 +1,110 @@
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest import mock
+from helper import asana_resources
+from helper.cleanup_queue import CleanupQueue
+from helper.http_session import PooledSession
+from helper.rest_client import RestClient
+from helper.retry import RetryPolicy
+from utils import orphan_sweeper
+from utils.logger import get_logger
+from utils.mock_asana_server import MockAsanaApp, MockAsanaServer
+from utils.orphan_sweeper import SUITE_NAMES, OrphanSweeper
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+NOW = datetime.now(timezone.utc)
+TWO_DAYS_AGO = (NOW - timedelta(days=2)).isoformat(timespec="milliseconds")
+
+
+class TestOrphanSweeper(unittest.TestCase):
+
+    def setUp(self):
+        self.app = MockAsanaApp()
+        self.server = MockAsanaServer(self.app).start()
+        self.addCleanup(self.server.stop)
+        patchers = (
+            mock.patch.object(asana_resources, "url_base", self.server.url_base),
+            mock.patch.multiple(orphan_sweeper, url_base=self.server.url_base, workspace_gid="1100000000000000"),
+        )
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.rest_client = RestClient(PooledSession(pool_size=16))
+        self.cleanup_queue = CleanupQueue(self.rest_client, Path(directory.name) / "cleanup_journal.jsonl",
+                                          max_workers=16, retry_policy=RetryPolicy(max_retries=1, backoff_base=0))
+        self.addCleanup(self.cleanup_queue.close)
+        self.sweeper = OrphanSweeper(self.rest_client, self.cleanup_queue, older_than=24)
+
+    def seed(self, resource, name, created_at=TWO_DAYS_AGO, projects=()):
+        projects = [self.app._compact(self.app._store["projects"][gid]) for gid in projects]
+        item = self.app._new(resource[:-1], {"name": name}, {"projects": projects} if resource == "tasks" else {})
+        if created_at is not None:
+            item["created_at"] = created_at
+        return item["gid"]
+
+    def test_suite_names(self):
+        LOGGER.info("Test the names of the suite match, with or without the run prefix")
+        for name in ("[1a2b3c4d-gw0] Test project from fixture", "Auto New Bold Falcon", "[1a2b3c4d-main] Auto Task x",
+                     "Test task Quick Fox on Project", "Pooled section", "Test portfolio from fixture",
+                     "[1a2b3c4d-gw1] <script>alert('test');</script>"):
+            self.assertIsNotNone(SUITE_NAMES.match(name), name)
+        for name in ("Quarterly plan", "Automation backlog", "My Test project", "[draft] Auto New plan", "1234567890"):
+            self.assertIsNone(SUITE_NAMES.match(name), name)
+
+    def test_sweep_deletes_old_suite_objects(self):
+        LOGGER.info("Test the sweep deletes the old objects named by the suite and keeps the others")
+        projects = [
+            self.seed("projects", "[1a2b3c4d-gw0] Test project from fixture"),
+            self.seed("projects", "Auto New Bold Falcon"),
+            self.seed("projects", "[1a2b3c4d-gw0] !#$%&/()=?"),
+        ]
+        kept = [
+            self.seed("projects", "Quarterly plan"),
+            self.seed("projects", "[1a2b3c4d-gw0] Test project from fixture", created_at=NOW.isoformat()),
+            self.seed("tasks", "Auto Task without date", created_at=None, projects=projects[1:2]),
+        ]
+        # the tasks of the projects kept are not listed
+        kept.append(self.seed("tasks", "Auto Task of a plan", projects=kept[:1]))
+        orphans = projects + [
+            # listed once for both projects
+            self.seed("tasks", "[1a2b3c4d-gw1] Auto Task Quick Fox", projects=projects[::2]),
+            self.seed("portfolios", "Test portfolio from fixture"),
+        ]
+        report = self.sweeper.sweep()
+        self.assertEqual(report["listed"], {"projects": 5, "tasks": 2, "portfolios": 1})
+        self.assertEqual(report["orphans"], {"projects": 3, "tasks": 1, "portfolios": 1})
+        self.assertEqual((report["deleted"], report["failed"]), (5, 0))
+        remaining = {gid for store in self.app._store.values() for gid in store}
+        self.assertFalse(remaining & set(orphans))
+        self.assertEqual(remaining, set(kept))
+
+    def test_dry_run_deletes_nothing(self):
+        LOGGER.info("Test a dry run only counts the orphans")
+        project = self.seed("projects", "Pooled project")
+        self.seed("tasks", "Pooled task", projects=[project])
+        report = self.sweeper.sweep(dry_run=True)
+        self.assertEqual(report["orphans"]["tasks"], 1)
+        self.assertNotIn("deleted", report)
+        self.assertEqual(len(self.app._store["tasks"]), 1)
+
+    def test_sweep_thousands_concurrently(self):
+        LOGGER.info("Test thousands of orphans are listed by pages and deleted concurrently")
+        project = self.seed("projects", "Test project from fixture")
+        for index in range(1000):
+            self.seed("tasks", f"Auto Task {index}", projects=[project])
+        started = time.perf_counter()
+        report = self.sweeper.sweep(("tasks",))
+        LOGGER.info(f"Swept 1000 tasks in {time.perf_counter() - started:.2f} s, "
+                    f"{report['deletes_per_second']:.0f} deletes/s")
+        self.assertEqual((report["listed"]["tasks"], report["deleted"]), (1000, 1000))
+        self.assertFalse(self.app._store["tasks"])
+
+
+if __name__ == "__main__":
+    unittest.main()
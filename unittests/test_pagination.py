@@ -0,0 +1,53 @@
+import json
+import unittest
+import requests
+from helper.http_session import PooledSession
+from helper.rest_client import RestClient
+from utils.logger import get_logger
+from utils.mock_asana_server import MockAsanaApp, MockAsanaServer
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+WORKSPACE_GID = "1100000000000000"
+
+
+class TestPagination(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = MockAsanaApp()
+        for number in range(250):
+            body = json.dumps({"data": {"name": f"Task {number}", "workspace": WORKSPACE_GID}}).encode()
+            cls.app.handle("POST", "/api/1.0/tasks", body)
+        cls.server = MockAsanaServer(cls.app).start()
+        cls.url = f"{cls.server.url_base}tasks"
+        cls.rest_client = RestClient(PooledSession())
+
+    def test_iter_pages_follows_next_page(self):
+        LOGGER.info("Test pages follow next_page.offset until the last page")
+        pages = list(self.rest_client.iter_pages(self.url, headers={}, limit=100))
+        self.assertEqual([len(page["body"]["data"]) for page in pages], [100, 100, 50])
+        self.assertIsNone(pages[-1]["body"]["next_page"])
+
+    def test_iter_items_with_prefetch(self):
+        LOGGER.info("Test items with prefetch keep the collection order")
+        names = [item["name"] for item in self.rest_client.iter_items(self.url, headers={}, limit=30, prefetch=True)]
+        self.assertEqual(names, [f"Task {number}" for number in range(250)])
+
+    def test_prefetch_requests_one_page_ahead(self):
+        LOGGER.info("Test prefetch keeps at most one page ahead")
+        pages = self.rest_client.iter_pages(f"{self.url}?opt_fields=name", headers={}, limit=10, prefetch=True)
+        requests_before = self.app.requests
+        next(pages)
+        next(pages)
+        self.assertLessEqual(self.app.requests - requests_before, 3)
+        pages.close()
+
+    def test_iter_items_failed_page_negative(self):
+        LOGGER.info("Test failed page raises instead of ending the collection")
+        with self.assertRaises(requests.HTTPError):
+            list(self.rest_client.iter_items(self.url, headers={}, limit=500))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
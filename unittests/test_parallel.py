@@ -0,0 +1,32 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from utils.logger import get_logger
+from utils.parallel import merge_worker_files, resource_name, worker_file, worker_id
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+
+class TestParallel(unittest.TestCase):
+
+    def test_resource_name_has_worker_prefix(self):
+        LOGGER.info("Test resource names are prefixed with run and worker")
+        with mock.patch.dict(os.environ, {"PYTEST_XDIST_WORKER": "gw3"}):
+            self.assertEqual(worker_id(), "gw3")
+            self.assertRegex(resource_name("Test project"), r"^\[\w{8}-gw3\] Test project$")
+
+    def test_merge_worker_files(self):
+        LOGGER.info("Test merge of the files written by each worker")
+        with tempfile.TemporaryDirectory() as directory:
+            for worker in ["gw0", "gw1"]:
+                with mock.patch.dict(os.environ, {"PYTEST_XDIST_WORKER": worker}):
+                    worker_file(directory, "metrics", "lp").write_text(f"{worker}\n")
+            merged = merge_worker_files(directory, "metrics", "lp")
+            self.assertEqual(merged.read_text().splitlines(), ["gw0", "gw1"])
+            self.assertEqual(os.listdir(directory), ["metrics.lp"])
+
+    def test_merge_without_worker_files(self):
+        LOGGER.info("Test merge when no worker wrote files")
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertIsNone(merge_worker_files(directory, "metrics", "lp"))
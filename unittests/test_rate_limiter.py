@@ -0,0 +1,83 @@
+import tempfile
+import threading
+import time
+import unittest
+from email.utils import formatdate
+from pathlib import Path
+from unittest import mock
+from helper.http_session import PooledSession
+from helper.rest_client import RestClient
+from utils.logger import get_logger
+from utils.mock_asana_server import MockAsanaApp, MockAsanaServer
+from utils import rate_limiter
+from utils.rate_limiter import SharedRateLimiter, default_state_file, parse_retry_after, remove_state_file
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+
+class TestSharedRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "rate_limit.json"
+
+    def limiter(self, rate, burst=1):
+        limiter = SharedRateLimiter(rate, burst=burst, path=self.path)
+        self.addCleanup(limiter.close)
+        return limiter
+
+    def test_parse_retry_after(self):
+        LOGGER.info("Test Retry-After in seconds and as HTTP date")
+        self.assertEqual(parse_retry_after("3"), 3)
+        self.assertAlmostEqual(parse_retry_after(formatdate(time.time() + 10, usegmt=True)), 10, delta=1.5)
+        self.assertEqual(parse_retry_after("soon", default=2), 2)
+        self.assertEqual(parse_retry_after(None), 1)
+
+    def test_rate_shared_by_limiters_of_the_same_file(self):
+        LOGGER.info("Test limiters sharing the state file share the rate")
+        # each limiter has its own file lock, like the limiter of another worker process
+        limiters = [self.limiter(rate=40), self.limiter(rate=40)]
+        start = time.perf_counter()
+        threads = [threading.Thread(target=lambda l=limiter: [l.acquire() for _ in range(10)]) for limiter in limiters]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertGreaterEqual(time.perf_counter() - start, 19 / 40 - 0.02)
+        self.assertEqual(sum(limiter.stats()["acquired"] for limiter in limiters), 20)
+        self.assertGreater(limiters[0].stats()["wait_max"], 0)
+
+    def test_state_file_per_run(self):
+        LOGGER.info("Test the default state file belongs to the run and RATE_LIMIT_FILE is shared on purpose")
+        self.assertNotEqual(default_state_file("1a2b3c4d"), default_state_file("5e6f7a8b"))
+        limiter = SharedRateLimiter(10)
+        self.addCleanup(limiter.path.unlink, missing_ok=True)
+        self.addCleanup(limiter.close)
+        self.assertEqual(limiter.path, default_state_file())
+        with mock.patch.object(rate_limiter, "rate_limit_file", str(self.path)):
+            self.assertEqual(self.limiter(rate=10).path, self.path)
+        run_file = default_state_file("1a2b3c4d")
+        run_file.write_text("{}", encoding="utf-8")
+        remove_state_file("1a2b3c4d")
+        self.assertFalse(run_file.exists())
+
+    def test_throttle_blocks_and_lowers_rate(self):
+        LOGGER.info("Test 429 blocks the bucket for Retry-After and halves the rate")
+        limiter = self.limiter(rate=100, burst=10)
+        limiter.throttle(0.3)
+        self.assertAlmostEqual(limiter.rate, 50, delta=1)
+        self.assertGreaterEqual(limiter.acquire(), 0.28)
+        self.assertEqual(limiter.stats()["throttled"], 1)
+
+    def test_rest_client_retries_after_429(self):
+        LOGGER.info("Test RestClient sends the request again after a 429")
+        app = MockAsanaApp(error_rate=1.0, error_codes=(429,), retry_after=0)
+        with MockAsanaServer(app) as server:
+            limiter = self.limiter(rate=1000, burst=10)
+            response = RestClient(PooledSession(), rate_limiter=limiter).send_request(
+                "GET", url=f"{server.url_base}projects", headers={}
+            )
+        self.assertEqual(response["status_code"], 429)
+        self.assertEqual(app.requests, 4)
+        self.assertEqual(limiter.stats()["throttled"], 3)
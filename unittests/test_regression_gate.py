@@ -0,0 +1,89 @@
+import random
+import tempfile
+import time
+import unittest
+from pathlib import Path
+import numpy as np
+from influxdb_client import Point, WritePrecision
+from utils.logger import get_logger
+from utils.regression_gate import Samples, compare, load_metrics_file, mann_whitney_greater, parse_line_protocol
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+URL = "http://127.0.0.1:8080/api/1.0/tasks/1200000000000001"
+
+
+def run_samples(samples: Samples, run_id: str, method: str, mean: float, count: int, started: int) -> None:
+    rng = random.Random(run_id)
+    for number in range(count):
+        samples.add(method, URL, run_id, rng.gauss(mean, mean / 10), started + number)
+
+
+class TestRegressionGate(unittest.TestCase):
+
+    def test_parse_line_protocol(self):
+        LOGGER.info("Test lines of Point.to_line_protocol are parsed with their escapes")
+        point = (
+            Point("response_time")
+            .tag("url", f"{URL}?opt_fields=name,notes")
+            .tag("method", "GET")
+            .tag("run_id", "1a2b3c4d")
+            .field("value", 0.125)
+            .field("retries", 2)
+            .time(1700000000000000000, WritePrecision.NS)
+        )
+        measurement, tags, fields, timestamp = parse_line_protocol(point.to_line_protocol())
+        self.assertEqual(measurement, "response_time")
+        self.assertEqual(tags, {"method": "GET", "run_id": "1a2b3c4d", "url": f"{URL}?opt_fields=name,notes"})
+        self.assertEqual(fields, {"retries": 2, "value": 0.125})
+        self.assertEqual(timestamp, 1700000000000000000)
+
+    def test_mann_whitney_greater(self):
+        LOGGER.info("Test the p-value is small only when the current times are larger")
+        self.assertLess(mann_whitney_greater(np.arange(6.0, 11.0), np.arange(1.0, 6.0)), 0.01)
+        self.assertGreater(mann_whitney_greater(np.arange(1.0, 6.0), np.arange(6.0, 11.0)), 0.99)
+        self.assertEqual(mann_whitney_greater(np.ones(5), np.ones(5)), 1.0)
+
+    def test_compare_flags_p95_regression(self):
+        LOGGER.info("Test an endpoint slower than its baseline is flagged, a stable one is not")
+        samples = Samples()
+        for run in range(3):
+            run_samples(samples, f"base{run}", "GET", 0.100, 30, run * 100)
+            run_samples(samples, f"base{run}", "PUT", 0.100, 30, run * 100 + 50)
+        run_samples(samples, "current", "GET", 0.150, 30, 1000)
+        run_samples(samples, "current", "PUT", 0.101, 30, 1050)
+        results = {result["method"]: result for result in compare(samples, threshold=0.2, alpha=0.05)}
+        self.assertTrue(results["GET"]["regressed"])
+        self.assertGreater(results["GET"]["change"], 0.2)
+        self.assertFalse(results["PUT"]["regressed"])
+        self.assertEqual(results["PUT"]["status"], "ok")
+        self.assertEqual(results["GET"]["endpoint"], "tasks/{gid}")
+        self.assertEqual(results["GET"]["baseline_samples"], 90)
+
+    def test_compare_needs_samples(self):
+        LOGGER.info("Test endpoints without enough samples are not compared")
+        samples = Samples()
+        run_samples(samples, "base", "GET", 0.1, 3, 0)
+        run_samples(samples, "current", "GET", 1.0, 30, 100)
+        (result,) = compare(samples, "current", min_samples=5)
+        self.assertEqual(result["status"], "not enough samples")
+        self.assertFalse(result["regressed"])
+
+    def test_load_metrics_file_latest_run(self):
+        LOGGER.info("Test the metrics file is read and the last run is the current one")
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "response_time.lp"
+            now = time.time_ns()
+            points = [
+                Point("response_time").tag("url", URL).tag("method", "GET").tag("run_id", run_id)
+                .field("value", 0.1).time(now - age, WritePrecision.NS)
+                for run_id, age in (("old", 40 * 86400 * 10 ** 9), ("base", 2000), ("current", 1000))
+            ]
+            path.write_text("".join(f"{point.to_line_protocol()}\n" for point in points))
+            samples = load_metrics_file(path, days=30)
+        self.assertEqual(samples.run_ids, ["base", "current"])
+        self.assertEqual(samples.latest_run(), "current")
+
+
+if __name__ == "__main__":
+    unittest.main()
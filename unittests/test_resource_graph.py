@@ -0,0 +1,88 @@
+import threading
+import time
+import unittest
+from helper.resource_graph import ResourceGraph
+from utils.logger import get_logger
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+DELAY = 0.05
+
+
+class TestResourceGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.events = []
+        self.lock = threading.Lock()
+        self.graph = ResourceGraph(max_workers=4)
+        self.addCleanup(self.graph.close)
+        self.graph.add("project", self.creator("project"), self.deleter("project"))
+        self.graph.add("section", self.creator("section"), self.deleter("section"), depends=("project",))
+        self.graph.add("task", self.creator("task"), self.deleter("task"))
+        self.graph.add("task_on_section", self.creator("task_on_section"), self.deleter("task_on_section"),
+                       depends=("section", "project"))
+
+    def creator(self, name):
+        def create(mode, **dependencies):
+            time.sleep(DELAY)
+            with self.lock:
+                self.events.append(("create", name))
+            return f"{name}:{mode}:{','.join(sorted(dependencies.values()))}"
+        return create
+
+    def deleter(self, name):
+        def delete(value, mode):
+            time.sleep(DELAY)
+            with self.lock:
+                self.events.append(("delete", name))
+        return delete
+
+    def test_closure_in_dependency_order(self):
+        LOGGER.info("Test the closure adds the dependencies before each resource and skips other fixtures")
+        self.assertEqual(self.graph.closure(["task_on_section", "test_log_name", "task"]),
+                         ["project", "section", "task_on_section", "task"])
+
+    def test_independent_resources_created_concurrently(self):
+        LOGGER.info("Test the setup takes the critical path, not the sum of the creations")
+        started = time.perf_counter()
+        values = self.graph.resolve(["task_on_section", "task"], mode="readonly")
+        elapsed = time.perf_counter() - started
+        self.assertLess(elapsed, 3.5 * DELAY)
+        self.assertEqual(values["section"], "section:readonly:project:readonly:")
+        self.assertEqual(values["task"], "task:readonly:")
+        order = [name for _, name in self.events]
+        self.assertLess(order.index("project"), order.index("section"))
+        self.assertLess(order.index("section"), order.index("task_on_section"))
+
+    def test_teardown_deletes_dependents_first(self):
+        LOGGER.info("Test deletes run concurrently, each one after the resources that depend on it")
+        values = self.graph.resolve(["task_on_section", "task"], mode="mutable")
+        self.events.clear()
+        started = time.perf_counter()
+        self.graph.teardown(values, mode="mutable")
+        self.assertLess(time.perf_counter() - started, 3.5 * DELAY)
+        order = [name for _, name in self.events]
+        self.assertEqual(sorted(order), ["project", "section", "task", "task_on_section"])
+        self.assertLess(order.index("task_on_section"), order.index("section"))
+        self.assertLess(order.index("section"), order.index("project"))
+
+    def test_failed_creation_deletes_created_negative(self):
+        LOGGER.info("Test a failed creation deletes what was created and raises")
+
+        def fail(mode, project):
+            raise KeyError("gid")
+
+        self.graph.add("broken", fail, depends=("project",))
+        with self.assertRaises(KeyError):
+            self.graph.resolve(["broken", "task"], mode="mutable")
+        self.assertEqual(sorted(event for event in self.events if event[0] == "delete"),
+                         [("delete", "project"), ("delete", "task")])
+
+    def test_unknown_dependency_negative(self):
+        LOGGER.info("Test a resource can only depend on resources already in the graph")
+        with self.assertRaises(ValueError):
+            self.graph.add("portfolio_item", self.creator("portfolio_item"), depends=("portfolio",))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from helper import asana_resources
+from helper.http_session import PooledSession
+from helper.resource_pool import DESTRUCTIVE, MUTABLE, READONLY, ResourcePool
+from helper.rest_client import RestClient
+from utils.logger import get_logger
+from utils.mock_asana_server import MockAsanaApp, MockAsanaServer
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+
+class TestResourcePool(unittest.TestCase):
+
+    def setUp(self):
+        self.app = MockAsanaApp()
+        self.server = MockAsanaServer(self.app).start()
+        patcher = mock.patch.multiple(asana_resources, url_base=self.server.url_base, workspace_gid="1100000000000000")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.server.stop)
+        self.rest_client = RestClient(PooledSession(pool_size=8))
+
+    def stored(self, resource):
+        return self.app._store[resource]
+
+    def test_fill_creates_resources_concurrently(self):
+        LOGGER.info("Test pool creates projects with a section and tasks")
+        pool = ResourcePool(self.rest_client, projects=3, tasks=2)
+        pool.fill()
+        self.assertEqual((len(self.stored("projects")), len(self.stored("sections")), len(self.stored("tasks"))), (3, 3, 2))
+        pool.close()
+        self.assertEqual((len(self.stored("projects")), len(self.stored("tasks"))), (0, 0))
+
+    def test_mutable_lease_is_reset_and_reused(self):
+        LOGGER.info("Test mutable lease is reset and reused")
+        pool = ResourcePool(self.rest_client, tasks=1)
+        pool.fill()
+        task_gid = pool.acquire("tasks", MUTABLE)
+        name = self.stored("tasks")[task_gid]["name"]
+        asana_resources.update_task(self.rest_client, task_gid, {"name": "changed", "notes": "changed"})
+        pool.release("tasks", task_gid, MUTABLE)
+        self.assertEqual((self.stored("tasks")[task_gid]["name"], self.stored("tasks")[task_gid]["notes"]), (name, ""))
+        self.assertEqual(pool.acquire("tasks", READONLY), task_gid)
+        self.assertEqual(pool.stats()["tasks"], {"hits": 2, "misses": 0, "resets": 1, "discarded": 0})
+        pool.close()
+
+    def test_destructive_lease_is_fresh_and_replenished(self):
+        LOGGER.info("Test destructive lease is deleted and the pool replenished")
+        pool = ResourcePool(self.rest_client, projects=1)
+        pool.fill()
+        project_gid = pool.acquire("projects", READONLY)
+        pool.release("projects", project_gid, READONLY)
+        # the project was used, so a destructive test gets a new one
+        fresh_gid = pool.acquire("projects", DESTRUCTIVE)
+        self.assertNotEqual(fresh_gid, project_gid)
+        pool.release("projects", fresh_gid, DESTRUCTIVE)
+        self.assertNotIn(fresh_gid, self.stored("projects"))
+        self.assertEqual(pool.stats()["projects"]["misses"], 1)
+        pool.close()
+
+    def test_empty_pool_creates_and_deletes_per_lease(self):
+        LOGGER.info("Test empty pool creates a resource per lease")
+        pool = ResourcePool(self.rest_client)
+        project_gid = pool.acquire("projects", READONLY)
+        section_gid = pool.acquire_section(project_gid, READONLY)
+        self.assertIn(section_gid, self.stored("sections"))
+        pool.release("sections", section_gid, READONLY)
+        pool.release("projects", project_gid, READONLY)
+        self.assertEqual(self.stored("projects"), {})
+        self.assertEqual(pool.stats()["sections"]["misses"], 1)
+        pool.close()
+
+    def test_concurrent_leases_while_replenishing(self):
+        LOGGER.info("Test leases from several threads while the pool creates new resources")
+        pool = ResourcePool(self.rest_client, projects=4, tasks=4, max_workers=4)
+        pool.fill()
+
+        def lease(index):
+            mode = (READONLY, MUTABLE, DESTRUCTIVE)[index % 3]
+            project_gid = pool.acquire("projects", mode)
+            section_gid = pool.acquire_section(project_gid, mode)
+            task_gid = pool.acquire("tasks", mode)
+            pool.release("tasks", task_gid, mode)
+            pool.release("sections", section_gid, mode)
+            pool.release("projects", project_gid, mode)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lease, range(48)))
+        pool.close()
+        self.assertEqual(pool._leased, {})
+        self.assertEqual((self.stored("projects"), self.stored("tasks")), ({}, {}))
+        stats = pool.stats()
+        self.assertEqual(stats["projects"]["hits"] + stats["projects"]["misses"], 48)
+        self.assertEqual(stats["sections"]["hits"] + stats["sections"]["misses"], 48)
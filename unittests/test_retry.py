@@ -0,0 +1,123 @@
+import socket
+import time
+import unittest
+from unittest import mock
+import requests
+from helper.http_session import PooledSession
+from helper.rest_client import RestClient
+from helper.retry import CircuitBreaker, CircuitOpenError, RetryPolicy
+from utils.logger import get_logger
+from utils.mock_asana_server import MockAsanaApp, MockAsanaServer
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+
+def closed_port_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/api/1.0/"
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def test_delay_is_jittered_exponential_backoff(self):
+        LOGGER.info("Test backoff delay grows and is capped")
+        policy = RetryPolicy(backoff_base=0.5, backoff_max=3)
+        for retry, cap in ((0, 0.5), (1, 1), (2, 2), (5, 3)):
+            delays = [policy.delay(retry) for _ in range(50)]
+            self.assertTrue(all(0 <= delay <= cap for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_opens_after_failures_and_closes_after_trial(self):
+        LOGGER.info("Test circuit opens, fails fast and closes after a good trial")
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.1)
+        breaker.record("host", success=False)
+        breaker.check("host")
+        breaker.record("host", success=False)
+        with self.assertRaises(CircuitOpenError):
+            breaker.check("host")
+        time.sleep(0.15)
+        breaker.check("host")
+        # only one trial request while the circuit is half open
+        with self.assertRaises(CircuitOpenError):
+            breaker.check("host")
+        breaker.record("host", success=True)
+        breaker.check("host")
+        self.assertFalse(breaker.is_open("host"))
+
+    def test_failed_trial_opens_again(self):
+        LOGGER.info("Test failed trial request opens the circuit again")
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+        breaker.record("host", success=False)
+        time.sleep(0.1)
+        breaker.check("host")
+        breaker.record("host", success=False)
+        with self.assertRaises(CircuitOpenError):
+            breaker.check("host")
+
+
+class TestRestClientRetries(unittest.TestCase):
+
+    def rest_client(self, breaker=None):
+        policy = RetryPolicy(max_retries=2, backoff_base=0.01)
+        return RestClient(
+            PooledSession(),
+            retry_policies={"GET": policy, "PUT": policy, "DELETE": policy},
+            circuit_breaker=breaker or CircuitBreaker(failure_threshold=100),
+        )
+
+    def test_get_retried_on_503(self):
+        LOGGER.info("Test idempotent request retried on 503")
+        app = MockAsanaApp(error_rate=1.0, error_codes=(503,))
+        with MockAsanaServer(app) as server:
+            response = self.rest_client().send_request("GET", url=f"{server.url_base}projects", headers={})
+        self.assertEqual((response["status_code"], response["retries"], app.requests), (503, 2, 3))
+
+    def test_post_not_retried_by_default(self):
+        LOGGER.info("Test POST is sent once without opt in")
+        app = MockAsanaApp(error_rate=1.0, error_codes=(503,))
+        with MockAsanaServer(app) as server:
+            rest_client = self.rest_client()
+            response = rest_client.send_request("POST", url=f"{server.url_base}projects", headers={})
+            self.assertEqual((response["retries"], app.requests), (0, 1))
+            response = rest_client.send_request(
+                "POST", url=f"{server.url_base}projects", headers={}, retry_policy=RetryPolicy(1, backoff_base=0.01)
+            )
+        self.assertEqual((response["retries"], app.requests), (1, 3))
+
+    def test_connection_error_negative(self):
+        LOGGER.info("Test connection errors are retried then the circuit fails fast")
+        breaker = CircuitBreaker(failure_threshold=3, reset_seconds=60)
+        rest_client = self.rest_client(breaker)
+        url = f"{closed_port_url()}projects"
+        response = rest_client.send_request("GET", url=url, headers={})
+        self.assertEqual(response["status_code"], None)
+        self.assertEqual(response["body"], {"message": "Connection Error"})
+        self.assertEqual(response["retries"], 2)
+        started = time.perf_counter()
+        response = rest_client.send_request("GET", url=url, headers={})
+        self.assertEqual(response["retries"], 0)
+        self.assertLess(time.perf_counter() - started, 0.05)
+
+    def test_trial_with_other_request_exception_negative(self):
+        LOGGER.info("Test a trial request failing with another RequestException lets the next trial through")
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.0)
+        rest_client = self.rest_client(breaker)
+        send = rest_client._send
+        errors = [requests.exceptions.ConnectionError("refused"), requests.exceptions.ChunkedEncodingError("cut")]
+
+        def flaky_send(*args):
+            if errors:
+                raise errors.pop(0)
+            return send(*args)
+
+        with MockAsanaServer() as server, mock.patch.object(rest_client, "_send", side_effect=flaky_send):
+            response = rest_client.send_request("GET", url=f"{server.url_base}projects", headers={})
+            self.assertEqual(response["body"], {"message": "Request Failed"})
+            response = rest_client.send_request("GET", url=f"{server.url_base}projects", headers={})
+        self.assertEqual(response["status_code"], 200)
+        self.assertFalse(breaker.is_open(server.url_base.split("/")[2]))
@@ -0,0 +1,36 @@
+import unittest
+from helper.schema_registry import SchemaRegistry
+from helper.validate_response import ValidateResponse
+from utils.logger import get_logger
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+
+class TestSchemaRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = SchemaRegistry.default()
+        self.validate = ValidateResponse(self.registry)
+
+    def test_identical_schemas_share_validator(self):
+        LOGGER.info("Test identical schemas share one compiled validator")
+        names = ["delete_task", "delete_project", "delete_portfolio", "add_project_to_portfolio"]
+        validators = {id(self.registry.get(name).validator) for name in names}
+        self.assertEqual(len(validators), 1)
+        self.assertLess(self.registry.unique_schemas, len(self.registry.names))
+
+    def test_validate_response(self):
+        LOGGER.info("Test validate response with compiled schema")
+        response = {"body": {"data": {}}, "status_code": 200, "headers": {"Content-Type": ""}}
+        self.validate.validate_response(response, "delete_task")
+
+    def test_validate_response_invalid_body_negative(self):
+        LOGGER.info("Test validate response with invalid body")
+        response = {"body": {"data": []}, "status_code": 200, "headers": {}}
+        with self.assertRaises(AssertionError):
+            self.validate.validate_response(response, "delete_task")
+
+    def test_unknown_file_negative(self):
+        LOGGER.info("Test registry with nonexistent file")
+        with self.assertRaises(FileNotFoundError):
+            self.registry.get("nonexistent_file")
@@ -0,0 +1,85 @@
+import tempfile
+import unittest
+from helper.http_session import PooledSession
+from helper.rest_client import RestClient
+from helper.traffic_archive import RECORD, REPLAY, TrafficArchive, body_hash, normalize_url
+from utils.logger import get_logger
+from utils.mock_asana_server import MockAsanaServer
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+WORKSPACE_GID = "1100000000000000"
+# nothing listens on this port, a request that reaches the network fails
+OFFLINE_URL_BASE = "http://127.0.0.1:9/api/1.0/"
+
+
+class TestTrafficArchive(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.server = MockAsanaServer().start()
+        self.addCleanup(self.server.stop)
+
+    def record(self, requests_to_send: list) -> list:
+        archive = TrafficArchive(self.directory, RECORD)
+        rest_client = RestClient(PooledSession(archive=archive))
+        responses = [
+            rest_client.send_request(method, f"{self.server.url_base}{path}", headers={}, body=body)
+            for method, path, body in requests_to_send
+        ]
+        archive.close()
+        return responses
+
+    def replay_client(self) -> RestClient:
+        return RestClient(PooledSession(archive=TrafficArchive(self.directory, REPLAY)), retry_policies={})
+
+    def test_normalize_url(self):
+        LOGGER.info("Test normalized URLs drop the host and sort the query")
+        self.assertEqual(
+            normalize_url("https://app.asana.com/api/1.0/tasks?offset=abc&limit=10"), "/api/1.0/tasks?limit=10&offset=abc"
+        )
+        self.assertEqual(normalize_url("http://127.0.0.1:8080/api/1.0/projects/1"), "/api/1.0/projects/1")
+
+    def test_body_hash_ignores_key_order(self):
+        LOGGER.info("Test JSON bodies with the same content have the same hash")
+        self.assertEqual(body_hash('{"data": {"name": "a", "notes": "b"}}'), body_hash(b'{"data":{"notes":"b","name":"a"}}'))
+        self.assertNotEqual(body_hash('{"data": {"name": "a"}}'), body_hash('{"data": {"name": "b"}}'))
+        self.assertEqual(body_hash(None), "")
+
+    def test_replay_serves_recorded_responses_without_network(self):
+        LOGGER.info("Test replay returns the recorded responses in order from another host")
+        body = {"data": {"name": "Project", "workspace": WORKSPACE_GID}}
+        created = self.record([("POST", "projects", body)])[0]
+        gid = created["body"]["data"]["gid"]
+        recorded = self.record([("GET", f"projects/{gid}", None), ("DELETE", f"projects/{gid}", None),
+                                ("GET", f"projects/{gid}", None)])
+
+        rest_client = self.replay_client()
+        replayed_create = rest_client.send_request("POST", f"{OFFLINE_URL_BASE}projects", headers={}, body=body)
+        self.assertEqual(replayed_create["body"], created["body"])
+        url = f"{OFFLINE_URL_BASE}projects/{gid}"
+        statuses = [rest_client.send_request(method, url, headers={})["status_code"] for method in ("GET", "DELETE", "GET")]
+        self.assertEqual(statuses, [response["status_code"] for response in recorded])
+        self.assertEqual(statuses, [200, 200, 404])
+
+    def test_replay_falls_back_to_url_for_other_bodies(self):
+        LOGGER.info("Test a body not recorded is answered by a response of the same method and URL")
+        created = self.record([("POST", "tasks", {"data": {"name": "Task 1", "workspace": WORKSPACE_GID}})])[0]
+        response = self.replay_client().send_request(
+            "POST", f"{OFFLINE_URL_BASE}tasks", headers={}, body={"data": {"name": "Task 2", "workspace": WORKSPACE_GID}}
+        )
+        self.assertEqual(response["body"], created["body"])
+
+    def test_replay_miss_fails_the_request(self):
+        LOGGER.info("Test a request not in the archive fails without network")
+        self.record([("GET", "projects", None)])
+        rest_client = self.replay_client()
+        response = rest_client.send_request("GET", f"{OFFLINE_URL_BASE}tasks", headers={})
+        self.assertIsNone(response["status_code"])
+        self.assertEqual(rest_client.session.archive.missed, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+"""Pytest plugin that runs the slowest test classes first and splits the suite in shards of equal duration
+
+The duration of each test, fixtures included, is kept in a local history file updated after every run.
+Tests run class by class, so class fixtures are set up once, ordered from the longest class to the
+shortest: with pytest-xdist the last class sent to a worker is a short one. With --shard-count the
+classes are packed in shards by longest processing time, each machine runs its --shard-index.
+Loaded from pytest.ini, disabled with -p no:utils.duration_scheduler.
+"""
+import heapq
+import json
+import os
+import statistics
+import tempfile
+from pathlib import Path
+import pytest
+from config.config import test_durations_file
+from utils.logger import get_logger
+from utils.parallel import is_worker
+
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+# seconds of a test without history when the history is empty
+DEFAULT_DURATION = 1.0
+# weight of the last run in the duration kept by the history
+SMOOTHING = 0.5
+
+
+class DurationHistory:
+    def __init__(self, path: Path | str) -> None:
+        """Duration in seconds of each test, smoothed over the runs
+
+        Args:
+            path (Path | str): JSON file of the history
+        """
+        self.path = Path(path)
+        self.durations = self._load()
+
+    def estimate(self, nodeid: str, default: float) -> float:
+        return self.durations.get(nodeid, default)
+
+    def default_duration(self) -> float:
+        """Returns the median duration of the history, DEFAULT_DURATION when it is empty"""
+        return statistics.median(self.durations.values()) if self.durations else DEFAULT_DURATION
+
+    def update(self, durations: dict) -> None:
+        """Adds the durations of a run and saves the history, keeping the tests written meanwhile by other shards
+
+        Args:
+            durations (dict): Seconds by test node id
+        """
+        self.durations = self._load()
+        for nodeid, seconds in durations.items():
+            previous = self.durations.get(nodeid)
+            self.durations[nodeid] = seconds if previous is None else SMOOTHING * seconds + (1 - SMOOTHING) * previous
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.durations, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+
+def pack_shards(durations: dict, shards: int) -> list:
+    """Longest processing time packing: the longest unit goes to the shard with the least work
+
+    Args:
+        durations (dict): Seconds by unit id
+        shards (int): Number of shards
+
+    Returns:
+        list: Unit ids of each shard, in decreasing duration
+    """
+    bins = [[] for _ in range(shards)]
+    loads = [(0.0, index) for index in range(shards)]
+    for unit in sorted(durations, key=lambda unit: (-durations[unit], unit)):
+        load, index = heapq.heappop(loads)
+        bins[index].append(unit)
+        heapq.heappush(loads, (load + durations[unit], index))
+    return bins
+
+
+def schedule_unit(item: pytest.Item) -> str:
+    """Returns the node id of the class of the test, or of its module for tests without class"""
+    parent = item.getparent(pytest.Class) or item.getparent(pytest.Module)
+    return parent.nodeid if parent is not None else item.nodeid
+
+
+class DurationScheduler:
+    def __init__(self, config: pytest.Config) -> None:
+        path = Path(config.getoption("durations_file"))
+        self.history = DurationHistory(path if path.is_absolute() else config.rootpath / path)
+        self.shard_count = config.getoption("shard_count")
+        self.shard_index = config.getoption("shard_index")
+        self.ordered = not config.getoption("no_duration_order")
+        self.estimated = 0.0
+        self.without_history = 0
+        self._durations = {}
+        self._skipped = set()
+        if not 0 <= self.shard_index < self.shard_count:
+            raise pytest.UsageError(f"--shard-index must be between 0 and {self.shard_count - 1}")
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, config: pytest.Config, items: list) -> None:
+        if not items or (not self.ordered and self.shard_count == 1):
+            return
+        default = self.history.default_duration()
+        units = {}
+        for item in items:
+            units.setdefault(schedule_unit(item), []).append(item)
+        durations = {
+            unit: sum(self.history.estimate(item.nodeid, default) for item in unit_items)
+            for unit, unit_items in units.items()
+        }
+        selected = list(units)
+        if self.shard_count > 1:
+            selected = pack_shards(durations, self.shard_count)[self.shard_index]
+            deselected = [item for unit in set(units) - set(selected) for item in units[unit]]
+            if deselected:
+                config.hook.pytest_deselected(items=deselected)
+        file_order = {unit: index for index, unit in enumerate(units)}
+        selected.sort(key=lambda unit: -durations[unit] if self.ordered else file_order[unit])
+        items[:] = [item for unit in selected for item in units[unit]]
+        self.estimated = sum(durations[unit] for unit in selected)
+        self.without_history = sum(item.nodeid not in self.history.durations for item in items)
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        # with pytest-xdist the reports of the workers reach the controller, which keeps the history
+        self._durations[report.nodeid] = self._durations.get(report.nodeid, 0.0) + report.duration
+        if report.skipped:
+            self._skipped.add(report.nodeid)
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        if is_worker() or session.config.option.collectonly:
+            return
+        durations = {nodeid: seconds for nodeid, seconds in self._durations.items() if nodeid not in self._skipped}
+        if durations:
+            self.history.update(durations)
+            LOGGER.debug(f"Saved the duration of {len(durations)} tests to {self.history.path}")
+
+    def pytest_terminal_summary(self, terminalreporter) -> None:
+        if is_worker() or not self.estimated:
+            return
+        shard = f"shard {self.shard_index + 1}/{self.shard_count}, " if self.shard_count > 1 else ""
+        terminalreporter.write_line(
+            f"duration scheduling: {shard}estimated {self.estimated:.1f}s, "
+            f"{self.without_history} tests without history"
+        )
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("duration scheduling")
+    group.addoption("--shard-count", type=int, default=1, help="Split the tests in this number of shards")
+    group.addoption("--shard-index", type=int, default=0, help="Shard to run, from 0")
+    group.addoption(
+        "--durations-file", default=test_durations_file, help="History of the test durations, relative to the rootdir"
+    )
+    group.addoption(
+        "--no-duration-order", action="store_true", help="Keep the file order, shards are still packed by duration"
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.pluginmanager.register(DurationScheduler(config), "duration_scheduler")
@@ -1,35 +1,89 @@
-import influxdb_client
 import time
-from influxdb_client import Point
-from influxdb_client.client.write_api import SYNCHRONOUS
-from config.config import  influxdb_token
+from config.config import (
+    influxdb_token,
+    influxdb_url,
+    influxdb_enabled,
+    influxdb_batch_size,
+    influxdb_flush_interval,
+    influxdb_queue_size,
+    metrics_dir,
+)
+from utils.influxdb_writer import BatchingWriter
+from utils.parallel import run_id, worker_file, worker_id
+from utils.lazy_import import lazy_import
 from utils.logger import get_logger
 
+# imported when the first point is built, runs with metrics disabled never load it
+influxdb_client = lazy_import("influxdb_client")
+
 
 LOGGER = get_logger(__name__, "DEBUG")
 
 class InfluxDBConnection:
-    def __init__(self) -> None:
-        token = influxdb_token
-        org = "api-course"
-        url = "http://localhost:8086"
+    def __init__(self, enabled: bool = influxdb_enabled, directory: str = metrics_dir) -> None:
+        """Creates the InfluxDB client and the background writer, nothing is created when metrics are disabled
 
-        self.write_client = influxdb_client.InfluxDBClient(url=url, token=token, org=org)
+        Args:
+            enabled (bool, optional): Store metrics in InfluxDB. Defaults to INFLUXDB_ENABLED.
+            directory (str, optional): Folder where each worker also writes its points in line protocol,
+                                       empty to skip the file. Defaults to METRICS_DIR.
+        """
+        self.org = "api-course"
         self.bucket = "api-automation"
-        self.write_api = self.write_client.write_api(write_options=SYNCHRONOUS)
+        self.write_client = None
+        self.metrics_file = worker_file(directory, "response_time", "lp") if directory else None
+        self.writer = None
+        if not enabled and self.metrics_file is None:
+            LOGGER.debug("InfluxDB metrics disabled")
+            return
+
+        if enabled:
+            self.write_client = influxdb_client.InfluxDBClient(url=influxdb_url, token=influxdb_token, org=self.org)
+            self.write_api = self.write_client.write_api(write_options=influxdb_client.client.write_api.SYNCHRONOUS)
+        self.writer = BatchingWriter(
+            self.write_points,
+            batch_size=influxdb_batch_size,
+            flush_interval=influxdb_flush_interval,
+            queue_size=influxdb_queue_size,
+        )
 
     def store_data_influxdb(self,response, endpoint):
+        # requests that failed without a Response have no time to store
+        if self.writer is None or "time" not in response:
+            return
         LOGGER.debug(f"Data stored in DB: {endpoint}, {response["request"]["url"]}, {response["request"]["method"]}, {response["status_code"]} ")
         point = (
-            Point("response_time")
+            influxdb_client.Point("response_time")
             .tag("url", response["request"]["url"])
             .tag("method", response["request"]["method"])
             .tag("status", response["status_code"])
             .tag("endpoint", endpoint)
+            .tag("worker", worker_id())
+            .tag("run_id", run_id())
             .field("value", response["time"])
+            .time(time.time_ns(), influxdb_client.WritePrecision.NS)
         )
-        self.write_api.write(bucket=self.bucket, org="api-course", record=point)
-        time.sleep(1)  # separate points by 1 second
+        if "retries" in response:
+            point.field("retries", response["retries"])
+        for phase, seconds in response.get("timing", {}).items():
+            point.field(phase, seconds)
+        self.writer.put(point)
+
+    def write_points(self, points: list) -> None:
+        """Writes a batch of points to InfluxDB and the metrics file, called from the background writer
+
+        Args:
+            points (list): Points to write
+        """
+        if self.metrics_file is not None:
+            with open(self.metrics_file, "a", encoding="utf-8") as f:
+                f.writelines(f"{point.to_line_protocol()}\n" for point in points)
+        if self.write_client is not None:
+            self.write_api.write(bucket=self.bucket, org=self.org, record=points, write_precision=influxdb_client.WritePrecision.NS)
 
     def close(self):
-        self.write_client.close()
+        if self.writer is None:
+            return
+        self.writer.close()
+        if self.write_client is not None:
+            self.write_client.close()
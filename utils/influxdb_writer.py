@@ -0,0 +1,111 @@
+import queue
+import threading
+import time
+from utils.logger import get_logger
+
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+_STOP = object()
+
+
+class _FlushRequest:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+
+
+class BatchingWriter:
+    def __init__(self, write_batch, batch_size: int = 500, flush_interval: float = 1.0, queue_size: int = 10000) -> None:
+        """Collects records in a bounded queue and writes them in batches from a background thread
+
+        Args:
+            write_batch (callable): Function that receives a list of records and writes them
+            batch_size (int, optional): Records that trigger a write. Defaults to 500.
+            flush_interval (float, optional): Max seconds a record waits before being written. Defaults to 1.0.
+            queue_size (int, optional): Max records waiting to be written. Defaults to 10000.
+        """
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="influxdb-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, record) -> bool:
+        """Adds a record without blocking, the record is dropped if the queue is full
+
+        Args:
+            record (_type_): Record to write
+
+        Returns:
+            bool: True if the record was queued
+        """
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Writes every queued record and waits until it is done
+
+        Args:
+            timeout (float, optional): Max seconds to wait. Defaults to None.
+        """
+        request = _FlushRequest()
+        self._queue.put(request, timeout=timeout)
+        request.done.wait(timeout)
+
+    def close(self, timeout: float | None = None) -> None:
+        """Writes every queued record and stops the background thread
+
+        Args:
+            timeout (float, optional): Max seconds to wait. Defaults to None.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP, timeout=timeout)
+        self._thread.join(timeout)
+        LOGGER.debug(f"Writer closed: {self.written} written, {self.failed} failed, {self.dropped} dropped")
+
+    def _run(self) -> None:
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                self._write(batch)
+                return
+            if isinstance(item, _FlushRequest):
+                self._write(batch)
+                batch = []
+                item.done.set()
+            elif item is not None:
+                batch.append(item)
+                if len(batch) < self.batch_size:
+                    continue
+                self._write(batch)
+                batch = []
+            elif batch:
+                self._write(batch)
+                batch = []
+            deadline = time.monotonic() + self.flush_interval
+
+    def _write(self, batch: list) -> None:
+        if not batch:
+            return
+        try:
+            self.write_batch(batch)
+            self.written += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            LOGGER.error(f"Error writing {len(batch)} records: {e}")
@@ -0,0 +1,141 @@
+import importlib.util
+import json
+import threading
+from config.config import json_codec
+
+_codecs = {}
+_shared_codec = None
+_shared_codec_lock = threading.Lock()
+
+
+class StdlibCodec:
+    """JSON codec of the standard library, always available"""
+
+    name = "stdlib"
+
+    @staticmethod
+    def dumps(value) -> bytes:
+        """Encodes a value to compact UTF-8 JSON
+
+        Args:
+            value: JSON serializable value
+
+        Returns:
+            bytes: Encoded value
+        """
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def loads(data: bytes | str):
+        """Decodes JSON from the raw bytes of a body or from text
+
+        Args:
+            data (bytes | str): UTF-8, UTF-16 or UTF-32 bytes, or text
+
+        Returns:
+            Any: Decoded value
+
+        Raises:
+            ValueError: When the data is not valid JSON
+        """
+        return json.loads(data)
+
+    @staticmethod
+    def dumps_text(value, indent: int | None = None) -> str:
+        """Encodes a value to JSON text for the logs, values that are not serializable are written with str
+
+        Args:
+            value: Value to encode
+            indent (int, optional): Indentation, compact when None. Defaults to None.
+
+        Returns:
+            str: JSON text
+        """
+        return json.dumps(value, indent=indent, default=str)
+
+
+class OrjsonCodec:
+    """JSON codec of orjson, it parses the bytes of a body without decoding them to text first"""
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, value) -> bytes:
+        return self._orjson.dumps(value, option=self._options)
+
+    def loads(self, data: bytes | str):
+        # orjson.JSONDecodeError is a ValueError like the one of the standard library
+        return self._orjson.loads(data)
+
+    def dumps_text(self, value, indent: int | None = None) -> str:
+        # orjson only indents with 2 spaces
+        option = self._options | self._orjson.OPT_INDENT_2 if indent else self._options
+        return self._orjson.dumps(value, default=str, option=option).decode("utf-8")
+
+
+def register_codec(name: str, codec_class, module: str | None = None) -> None:
+    """Adds a codec that JSON_CODEC can select
+
+    Args:
+        name (str): Name of the codec in JSON_CODEC
+        codec_class (type): Class with dumps, loads and dumps_text, built without arguments
+        module (str, optional): Module the codec needs, the codec is skipped by auto when it is not
+                                installed. Defaults to None.
+    """
+    _codecs[name] = (codec_class, module)
+
+
+def available_codecs() -> list:
+    """Returns the names of the codecs whose module is installed, the fastest first
+
+    Returns:
+        list: Codec names like ['orjson', 'stdlib']
+    """
+    return [
+        name for name, (_, module) in _codecs.items()
+        if module is None or importlib.util.find_spec(module) is not None
+    ]
+
+
+def create_codec(name: str = "auto"):
+    """Builds a codec by name
+
+    Args:
+        name (str, optional): Registered codec name, auto picks the first installed one. Defaults to "auto".
+
+    Returns:
+        Codec with dumps, loads and dumps_text
+
+    Raises:
+        ValueError: When the codec is not registered
+    """
+    if name == "auto":
+        name = available_codecs()[0]
+    if name not in _codecs:
+        raise ValueError(f"Unknown JSON codec {name!r}, expected auto or one of {list(_codecs)}")
+    codec_class, _ = _codecs[name]
+    return codec_class()
+
+
+def get_codec():
+    """Returns the codec of the process
+
+    Returns:
+        Codec selected by JSON_CODEC, built on first use
+    """
+    global _shared_codec
+    if _shared_codec is None:
+        with _shared_codec_lock:
+            if _shared_codec is None:
+                _shared_codec = create_codec(json_codec)
+    return _shared_codec
+
+
+# the fastest first, auto takes the first one installed
+register_codec("orjson", OrjsonCodec, module="orjson")
+register_codec("stdlib", StdlibCodec)
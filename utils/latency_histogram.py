@@ -0,0 +1,236 @@
+import math
+import re
+import threading
+import time
+from array import array
+from urllib.parse import urlsplit
+from config.config import latency_window_seconds
+from utils.logger import get_logger
+
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+PERCENTILES = (50, 90, 99)
+_GID = re.compile(r"/\d+(?=/|$)")
+
+
+class LatencyHistogram:
+    def __init__(self, highest_us: int = 60_000_000, significant_digits: int = 2) -> None:
+        """Log-linear latency histogram like HdrHistogram: fixed memory, values kept in microseconds
+           with a relative error below 10 ^ -significant_digits
+
+        Args:
+            highest_us (int, optional): Highest value tracked, larger values are counted in the last bucket.
+                                        Defaults to 60 s.
+            significant_digits (int, optional): Precision of the values. Defaults to 2.
+        """
+        self.highest_us = highest_us
+        self.significant_digits = significant_digits
+        self._sub_bucket_magnitude = math.ceil(math.log2(2 * 10 ** significant_digits))
+        self._sub_bucket_half_magnitude = self._sub_bucket_magnitude - 1
+        self._sub_bucket_count = 1 << self._sub_bucket_magnitude
+        self._sub_bucket_mask = self._sub_bucket_count - 1
+        bucket_count = 1
+        smallest_untrackable = self._sub_bucket_count
+        while smallest_untrackable <= highest_us:
+            smallest_untrackable <<= 1
+            bucket_count += 1
+        self.counts = array("Q", bytes(8 * (bucket_count + 1) * (self._sub_bucket_count // 2)))
+        self.total = 0
+        self.min_us = 0
+        self.max_us = 0
+
+    def record(self, seconds: float) -> None:
+        """Adds one latency
+
+        Args:
+            seconds (float): Latency in seconds
+        """
+        value = max(int(seconds * 1_000_000), 0)
+        self.counts[min(self._index(value), len(self.counts) - 1)] += 1
+        self.min_us = value if self.total == 0 else min(self.min_us, value)
+        self.max_us = max(self.max_us, value)
+        self.total += 1
+
+    def percentile(self, percent: float) -> float:
+        """Returns the latency in seconds below which the percent of the values are
+
+        Args:
+            percent (float): Percentile from 0 to 100
+
+        Returns:
+            float: Latency in seconds, 0 when the histogram is empty
+        """
+        if self.total == 0:
+            return 0.0
+        target = max(math.ceil(percent / 100 * self.total), 1)
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if count and cumulative >= target:
+                if index == len(self.counts) - 1:
+                    return self.max_us / 1_000_000
+                return min(self._highest_equivalent(index), self.max_us) / 1_000_000
+        return self.max_us / 1_000_000
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Adds the values of another histogram with the same configuration, without losing precision
+
+        Args:
+            other (LatencyHistogram): Histogram to add
+        """
+        if (other.highest_us, other.significant_digits) != (self.highest_us, self.significant_digits):
+            raise ValueError("Histograms with different configuration can not be merged")
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        if other.total:
+            self.min_us = other.min_us if self.total == 0 else min(self.min_us, other.min_us)
+            self.max_us = max(self.max_us, other.max_us)
+            self.total += other.total
+
+    def summary(self) -> dict:
+        """Returns count, p50, p90, p99 and max in seconds"""
+        summary = {"count": self.total}
+        summary.update({f"p{percent}": self.percentile(percent) for percent in PERCENTILES})
+        summary["max"] = self.max_us / 1_000_000
+        return summary
+
+    def to_dict(self) -> dict:
+        """Returns the histogram as a JSON serializable dict with the non empty buckets only"""
+        return {
+            "highest_us": self.highest_us,
+            "significant_digits": self.significant_digits,
+            "min_us": self.min_us,
+            "max_us": self.max_us,
+            "total": self.total,
+            "counts": {str(index): count for index, count in enumerate(self.counts) if count},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyHistogram":
+        histogram = cls(data["highest_us"], data["significant_digits"])
+        for index, count in data["counts"].items():
+            histogram.counts[int(index)] = count
+        histogram.min_us = data["min_us"]
+        histogram.max_us = data["max_us"]
+        histogram.total = data["total"]
+        return histogram
+
+    def _index(self, value: int) -> int:
+        bucket = (value | self._sub_bucket_mask).bit_length() - self._sub_bucket_magnitude
+        return (bucket << self._sub_bucket_half_magnitude) + (value >> bucket)
+
+    def _highest_equivalent(self, index: int) -> int:
+        bucket = max((index >> self._sub_bucket_half_magnitude) - 1, 0)
+        sub_bucket = index - (bucket << self._sub_bucket_half_magnitude)
+        return ((sub_bucket + 1) << bucket) - 1
+
+
+def endpoint_key(method: str, url: str) -> tuple:
+    """Returns the method and the URL path with the GIDs replaced, like ('GET', 'tasks/{gid}')
+
+    Args:
+        method (str): HTTP method
+        url (str): Request URL
+
+    Returns:
+        tuple: Method and endpoint
+    """
+    path = urlsplit(url).path
+    path = path.split("/api/1.0/", 1)[-1]
+    return method, _GID.sub("/{gid}", f"/{path.strip('/')}").lstrip("/")
+
+
+class LatencyRecorder:
+    def __init__(self, window_seconds: float = 0) -> None:
+        """Latency histograms per endpoint and method
+
+        Args:
+            window_seconds (float, optional): When set, the summary of each window is logged and the window
+                                              histograms are reset. Defaults to 0, no windows.
+        """
+        self.window_seconds = window_seconds
+        self.histograms = {}
+        self.retries = {}
+        self._window = {}
+        self._window_start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, method: str, url: str, seconds: float, retries: int = 0) -> None:
+        """Adds the latency of a request to the histogram of its endpoint
+
+        Args:
+            method (str): HTTP method
+            url (str): Request URL
+            seconds (float): Latency in seconds
+            retries (int, optional): Attempts sent again before this Response. Defaults to 0.
+        """
+        key = endpoint_key(method, url)
+        with self._lock:
+            self._histogram(self.histograms, key).record(seconds)
+            if retries:
+                self.retries[key] = self.retries.get(key, 0) + retries
+            if self.window_seconds:
+                self._histogram(self._window, key).record(seconds)
+                if time.monotonic() - self._window_start >= self.window_seconds:
+                    self._emit_window()
+
+    def merge(self, other: "LatencyRecorder") -> None:
+        with self._lock:
+            for key, histogram in other.histograms.items():
+                self._histogram(self.histograms, key).merge(histogram)
+            for key, retries in other.retries.items():
+                self.retries[key] = self.retries.get(key, 0) + retries
+
+    def summary(self) -> dict:
+        """Returns the summary and the retries of each endpoint, keyed by 'METHOD endpoint'"""
+        with self._lock:
+            return {f"{method} {endpoint}": {**histogram.summary(), "retries": self.retries.get((method, endpoint), 0)}
+                    for (method, endpoint), histogram in sorted(self.histograms.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms = {}
+            self.retries = {}
+            self._window = {}
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {f"{method} {endpoint}": {**histogram.to_dict(), "retries": self.retries.get((method, endpoint), 0)}
+                    for (method, endpoint), histogram in self.histograms.items()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyRecorder":
+        recorder = cls()
+        for key, histogram in data.items():
+            method, endpoint = key.split(" ", 1)
+            recorder.histograms[(method, endpoint)] = LatencyHistogram.from_dict(histogram)
+            if histogram.get("retries"):
+                recorder.retries[(method, endpoint)] = histogram["retries"]
+        return recorder
+
+    @staticmethod
+    def _histogram(histograms: dict, key: tuple) -> LatencyHistogram:
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = LatencyHistogram()
+        return histogram
+
+    def _emit_window(self) -> None:
+        for (method, endpoint), histogram in sorted(self._window.items()):
+            LOGGER.info(f"Latency window {method} {endpoint}: {format_summary(histogram.summary())}")
+        self._window = {}
+        self._window_start = time.monotonic()
+
+
+def format_summary(summary: dict) -> str:
+    text = (
+        f"count={summary['count']} p50={summary['p50'] * 1000:.1f}ms p90={summary['p90'] * 1000:.1f}ms "
+        f"p99={summary['p99'] * 1000:.1f}ms max={summary['max'] * 1000:.1f}ms"
+    )
+    return f"{text} retries={summary['retries']}" if summary.get("retries") else text
+
+
+# recorder fed by every RestClient of the process
+LATENCY_RECORDER = LatencyRecorder(window_seconds=latency_window_seconds)
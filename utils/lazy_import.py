@@ -0,0 +1,26 @@
+import importlib.util
+import sys
+
+
+def lazy_import(name: str):
+    """Returns a module that is executed on its first attribute access, for dependencies that are slow to import
+       and not needed by every run, like influxdb_client when metrics are disabled
+
+    Args:
+        name (str): Absolute name of the module
+
+    Returns:
+        module: The module, already imported or loaded on first use
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,331 @@
+"""Open-loop load runner that drives the suite scenarios at a target request rate
+
+Run from the repository root:
+    python -m utils.load_runner create_task --rate 20 --duration 60 --ramp-up 10
+
+Arrivals follow the schedule whether or not previous requests finished, and latency is measured from the
+scheduled start, so a slow server shows up as latency instead of a lower request rate (coordinated omission).
+The achieved rate only counts the requests completed within the schedule, so it also shows when the server falls
+behind. The resources an arrival needs, like the task it deletes, are created by the prepare step of the scenario,
+which is not part of the latency.
+
+--transport http2 sends every arrival as a stream of one HTTP/2 connection instead of the HTTP/1.1 pool, to compare
+both with the same schedule. The stats of the transport are printed after the report.
+
+The resources created by the run are journaled in CLEANUP_JOURNAL as they are created and deleted once the run is
+over, so the deletes do not add to the load. The ones that could not be deleted are sent again by the next test run.
+"""
+import argparse
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config.config import url_base, headers
+from helper import asana_resources
+from helper.cleanup_queue import CleanupQueue, get_shared_cleanup_queue
+from helper.http_session import PooledSession
+from helper.rest_client import RestClient
+from utils.influxdb_connection import InfluxDBConnection
+from utils.latency_histogram import LatencyHistogram
+from utils.logger import get_logger
+
+
+LOGGER = get_logger(__name__, "INFO")
+
+
+class LoadScenario:
+    endpoint = ""
+
+    def __init__(self, rest_client: RestClient, cleanup_queue: CleanupQueue) -> None:
+        """Scenario of the suite run as a load workload, resources it creates are deleted after the run
+
+        Args:
+            rest_client (RestClient): Client shared by every arrival
+            cleanup_queue (CleanupQueue): Queue that deletes the resources when it is closed after the run
+        """
+        self.rest_client = rest_client
+        self.cleanup_queue = cleanup_queue
+
+    def setup(self) -> None:
+        """Creates the resources shared by every arrival"""
+
+    def prepare(self):
+        """Creates the resources of one arrival, not measured, and returns what run needs"""
+        return None
+
+    def run(self, prepared=None) -> dict:
+        """Runs one arrival and returns the Response of the measured request
+
+        Args:
+            prepared (optional): Output of prepare for this arrival. Defaults to None.
+        """
+        raise NotImplementedError
+
+    def register(self, resource: str, response: dict) -> str:
+        gid = response["body"]["data"]["gid"]
+        self.cleanup_queue.enqueue(resource, gid, defer=True)
+        return gid
+
+
+class CreateTask(LoadScenario):
+    endpoint = "tasks"
+
+    def run(self, prepared=None) -> dict:
+        response = asana_resources.create_task(self.rest_client, "Auto Task load")
+        self.register("tasks", response)
+        return response
+
+
+class GetTask(LoadScenario):
+    endpoint = "tasks"
+
+    def setup(self) -> None:
+        self.task_gid = self.register("tasks", asana_resources.create_task(self.rest_client))
+
+    def run(self, prepared=None) -> dict:
+        return self.rest_client.send_request("GET", url=f"{url_base}tasks/{self.task_gid}", headers=headers)
+
+
+class UpdateTask(GetTask):
+    def run(self, prepared=None) -> dict:
+        body = {"data": {"notes": "These is an auto updated task."}}
+        return self.rest_client.send_request("PUT", url=f"{url_base}tasks/{self.task_gid}", headers=headers, body=body)
+
+
+class DeleteTask(LoadScenario):
+    endpoint = "tasks"
+
+    def prepare(self) -> str:
+        return asana_resources.create_task(self.rest_client)["body"]["data"]["gid"]
+
+    def run(self, prepared=None) -> dict:
+        return asana_resources.delete_task(self.rest_client, prepared)
+
+
+class AddTaskToSection(LoadScenario):
+    endpoint = "tasks"
+
+    def setup(self) -> None:
+        self.project_gid = self.register("projects", asana_resources.create_project(self.rest_client))
+        response = asana_resources.create_section(self.rest_client, self.project_gid)
+        self.section_gid = response["body"]["data"]["gid"]
+
+    def prepare(self) -> str:
+        return self.register("tasks", asana_resources.create_task(self.rest_client))
+
+    def run(self, prepared=None) -> dict:
+        return asana_resources.add_task_to_section(self.rest_client, prepared, self.project_gid, self.section_gid)
+
+
+class AddProjectToPortfolio(LoadScenario):
+    endpoint = "portfolios"
+
+    def setup(self) -> None:
+        self.portfolio_gid = self.register("portfolios", asana_resources.create_portfolio(self.rest_client))
+
+    def prepare(self) -> str:
+        return self.register("projects", asana_resources.create_project(self.rest_client))
+
+    def run(self, prepared=None) -> dict:
+        return asana_resources.add_project_to_portfolio(self.rest_client, self.portfolio_gid, prepared)
+
+
+SCENARIOS = {
+    "create_task": CreateTask,
+    "get_task": GetTask,
+    "update_task": UpdateTask,
+    "delete_task": DeleteTask,
+    "add_task_to_section": AddTaskToSection,
+    "add_project_to_portfolio": AddProjectToPortfolio,
+}
+
+
+def arrival_times(rate: float, duration: float, ramp_up: float = 0.0):
+    """Yields the scheduled start of each arrival, the rate grows linearly from 0 during the ramp up
+
+    Args:
+        rate (float): Target arrivals per second after the ramp up
+        duration (float): Seconds of the run, including the ramp up
+        ramp_up (float, optional): Seconds to reach the target rate. Defaults to 0.0.
+
+    Yields:
+        float: Seconds from the start of the run
+    """
+    ramp_up = min(ramp_up, duration)
+    ramp_arrivals = rate * ramp_up / 2
+    n = 0
+    while True:
+        if n < ramp_arrivals:
+            offset = math.sqrt(2 * ramp_up * n / rate)
+        else:
+            offset = ramp_up + (n - ramp_arrivals) / rate
+        if offset >= duration:
+            return
+        yield offset
+        n += 1
+
+
+class OpenLoopRunner:
+    def __init__(
+        self,
+        scenario: LoadScenario,
+        rate: float,
+        duration: float,
+        ramp_up: float = 0.0,
+        max_workers: int = 256,
+        influxdb_client: InfluxDBConnection | None = None,
+    ) -> None:
+        """Runs a scenario with an open-loop arrival schedule
+
+        Args:
+            scenario (LoadScenario): Scenario to run on each arrival
+            rate (float): Target arrivals per second
+            duration (float): Seconds of the run, including the ramp up
+            ramp_up (float, optional): Seconds to reach the target rate. Defaults to 0.0.
+            max_workers (int, optional): Max arrivals in flight. Defaults to 256.
+            influxdb_client (InfluxDBConnection, optional): Stores every measured Response. Defaults to None.
+
+        Raises:
+            ValueError: When the rate or the duration is not greater than 0
+        """
+        if rate <= 0 or duration <= 0:
+            raise ValueError(f"Rate and duration must be greater than 0, got rate {rate} and duration {duration}")
+        self.scenario = scenario
+        self.rate = rate
+        self.duration = duration
+        self.ramp_up = ramp_up
+        self.max_workers = max_workers
+        self.influxdb_client = influxdb_client
+        self._lock = threading.Lock()
+        self._latency = LatencyHistogram()
+        self._service_time = LatencyHistogram()
+        self._errors = 0
+        self._in_window = 0
+        self._max_lag = 0.0
+        self._start = 0.0
+
+    def run(self) -> dict:
+        """Runs the scenario and returns the report of the run
+
+        Returns:
+            dict: Target and achieved rate, errors and latency percentiles in seconds
+        """
+        self.scenario.setup()
+        scheduled = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="load") as executor:
+            start = self._start = time.perf_counter()
+            for offset in arrival_times(self.rate, self.duration, self.ramp_up):
+                intended = start + offset
+                delay = intended - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                self._max_lag = max(self._max_lag, time.perf_counter() - intended)
+                executor.submit(self._arrival, intended)
+                scheduled += 1
+        elapsed = time.perf_counter() - start
+        return self.report(scheduled, elapsed)
+
+    def report(self, scheduled: int, elapsed: float) -> dict:
+        """Builds the report of the run, the achieved rate is the number of requests completed within the duration
+           over the time at the target rate, so it falls below the target rate when the server cannot keep up
+
+        Args:
+            scheduled (int): Arrivals submitted
+            elapsed (float): Seconds until every arrival completed
+
+        Returns:
+            dict: Target and achieved rate, errors and latency percentiles in seconds
+        """
+        window = self.duration - min(self.ramp_up, self.duration) / 2
+        return {
+            "scenario": type(self.scenario).__name__,
+            "target_rate": self.rate,
+            "target_requests": round(self.rate * window),
+            "scheduled": scheduled,
+            "completed": self._latency.total,
+            "completed_in_window": self._in_window,
+            "errors": self._errors,
+            "elapsed": elapsed,
+            "achieved_rate": self._in_window / window,
+            "max_dispatch_lag": self._max_lag,
+            "latency_p50": self._latency.percentile(50),
+            "latency_p90": self._latency.percentile(90),
+            "latency_p99": self._latency.percentile(99),
+            "latency_max": self._latency.max_us / 1_000_000,
+            "service_time_p50": self._service_time.percentile(50),
+            "service_time_p99": self._service_time.percentile(99),
+        }
+
+    def _arrival(self, intended: float) -> None:
+        started = time.perf_counter()
+        response = None
+        # the time spent creating the resources of the arrival is left out of its latency
+        preparation = 0.0
+        try:
+            prepared = self.scenario.prepare()
+            preparation = time.perf_counter() - started
+            response = self.scenario.run(prepared)
+            failed = response["status_code"] >= 400
+        except Exception as e:
+            LOGGER.error(f"Arrival Error: {e}")
+            failed = True
+        finished = time.perf_counter()
+        with self._lock:
+            self._latency.record(finished - intended - preparation)
+            self._service_time.record(finished - started - preparation)
+            self._errors += failed
+            self._in_window += finished - self._start <= self.duration
+        if self.influxdb_client is not None and response and "request" in response:
+            self.influxdb_client.store_data_influxdb(response, self.scenario.endpoint)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenario", choices=sorted(SCENARIOS))
+    parser.add_argument("--rate", type=float, required=True, help="target arrivals per second")
+    parser.add_argument("--duration", type=float, required=True, help="seconds, including the ramp up")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="seconds to reach the target rate")
+    parser.add_argument("--workers", type=int, default=256, help="max arrivals in flight")
+    parser.add_argument("--transport", choices=("http1", "http2"), default="http1",
+                        help="HTTP/1.1 connection pool or HTTP/2 streams on one connection")
+    args = parser.parse_args()
+    if args.rate <= 0:
+        parser.error("--rate must be greater than 0")
+    if args.duration <= 0:
+        parser.error("--duration must be greater than 0")
+
+    if args.transport == "http2":
+        # httpx is only needed by the HTTP/2 transport
+        from helper.http2_session import Http2Session
+
+        session = Http2Session()
+    else:
+        session = PooledSession(pool_size=args.workers)
+    rest_client = RestClient(session)
+    cleanup_queue = get_shared_cleanup_queue()
+    influxdb_client = InfluxDBConnection()
+    runner = OpenLoopRunner(
+        SCENARIOS[args.scenario](rest_client, cleanup_queue),
+        rate=args.rate,
+        duration=args.duration,
+        ramp_up=args.ramp_up,
+        max_workers=args.workers,
+        influxdb_client=influxdb_client,
+    )
+    try:
+        report = runner.run()
+    finally:
+        LOGGER.info(f"Deleting {cleanup_queue.stats()['enqueued']} resources")
+        cleanup_queue.close()
+        influxdb_client.close()
+    report["transport"] = args.transport
+    for key, value in report.items():
+        print(f"{key:<20}{value:.4f}" if isinstance(value, float) else f"{key:<20}{value}")
+    print(f"{'transport stats':<20}{session.stats()}")
+    for resource, gid, status in cleanup_queue.stats()["failures"]:
+        print(f"{resource} {gid} not deleted (status {status}), left in {cleanup_queue.journal}")
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,12 @@
+import atexit
+import copy
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from config.config import log_queue, log_level, log_dir
+from utils.json_codec import get_codec
 
 DEFAULT_LOG_LEVEL = "INFO"
 DEFAULT_LOG_FORMAT = "%(asctime)s UTC %(levelname)-8s %(name)-15s  %(message)s"
@@ -11,6 +17,76 @@ LEVELS = {
     "ERROR": logging.ERROR,
     "CRITICAL": logging.CRITICAL,
 }
+LOG_DIR = Path(log_dir) if log_dir else Path(__file__).parent.parent / "logs"
+LOG_FILE_NAME = "asana.log"
+
+# handlers shared by every logger, one set per log format, so only one handler writes and rotates the file
+_handlers = {}
+_listeners = []
+_handlers_lock = threading.Lock()
+
+
+class LazyJson:
+    """Log argument serialized to JSON only when the record is emitted: LOGGER.debug("%s", LazyJson(response))"""
+
+    __slots__ = ("value", "indent", "_text")
+
+    def __init__(self, value, indent: int | None = 4) -> None:
+        self.value = value
+        self.indent = indent
+        self._text = None
+
+    def __str__(self) -> str:
+        # each handler formats the record, the JSON is built once
+        if self._text is None:
+            self._text = get_codec().dumps_text(self.value, indent=self.indent)
+        return self._text
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Queue handler that leaves the message formatting to the listener thread, the arguments of the record
+       must not be changed after the call to the logger
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.exc_info:
+            # tracebacks are rendered now, their frames do not outlive the call
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _shared_handlers(log_format: str) -> list:
+    with _handlers_lock:
+        handlers = _handlers.get(log_format)
+        if handlers is not None:
+            return handlers
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+        formatter = logging.Formatter(log_format)
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        file_handler = RotatingFileHandler(LOG_DIR / LOG_FILE_NAME, maxBytes=5 * 1024 * 1024, backupCount=5)
+        file_handler.setFormatter(formatter)
+        handlers = [console_handler, file_handler]
+        if log_queue:
+            # one background listener owns the output handlers, loggers only put records in the queue
+            listener = QueueListener(queue.SimpleQueue(), *handlers, respect_handler_level=True)
+            listener.start()
+            _listeners.append(listener)
+            handlers = [DeferredQueueHandler(listener.queue)]
+        _handlers[log_format] = handlers
+        return handlers
+
+
+def stop_listeners() -> None:
+    """Writes the records still in the queues and stops the listeners, called at exit"""
+    with _handlers_lock:
+        while _listeners:
+            _listeners.pop().stop()
+
+
+atexit.register(stop_listeners)
 
 
 def get_logger(name, level:str =DEFAULT_LOG_LEVEL, log_format:str=DEFAULT_LOG_FORMAT) -> logging.Logger:
@@ -19,33 +95,22 @@ def get_logger(name, level:str =DEFAULT_LOG_LEVEL, log_format:str=DEFAULT_LOG_FO
     Args:
         name (_type_): Name of the module that call the logger
         level (str, optional): Log level.Accepted values: DEBUG", "INFO", "WARNING", "ERROR" and "CRITICAL".
-                               Defaults to DEFAULT_LOG_LEVEL.
+                               LOG_LEVEL overrides it when set. Defaults to DEFAULT_LOG_LEVEL.
         log_format (str, optional): Format of the displayed log. Defaults to DEFAULT_LOG_FORMAT.
 
     Returns:
         logging.Logger: Logger instance
     """
-    # path to log file, initialize file and console logger
-    base_path = Path(__file__).parent.parent
-    log_file_name = "asana.log"
-    Path(f"{base_path}/logs").mkdir(parents=True, exist_ok=True)
     # create logger
     logger = logging.getLogger(name)
     # remove other handlers
-    for handler in logger.handlers:
+    for handler in list(logger.handlers):
         logger.removeHandler(handler)
-    formatter = logging.Formatter(log_format)
-    # set console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-    # set file handler
-    file_handler = RotatingFileHandler(f"{base_path}/logs/{log_file_name}", maxBytes=5 * 1024 * 1024, backupCount=5)
-    file_handler.setFormatter(formatter)
-    # add handlers to logger
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    # console and file handlers, or the queue handler when LOG_QUEUE is set
+    for handler in _shared_handlers(log_format):
+        logger.addHandler(handler)
 
     logger.propagate = False
-    logger.setLevel(LEVELS[level])
+    logger.setLevel(LEVELS[log_level or level])
 
     return logger
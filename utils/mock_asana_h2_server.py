@@ -0,0 +1,210 @@
+"""HTTP/2 stand-in for the Asana API, it serves the same MockAsanaApp as the HTTP/1.1 server
+
+Run from the repository root and point URL_BASE to the printed URL, with HTTP_TRANSPORT=http2:
+    python -m utils.mock_asana_server --http2 --port 8081 --latency fixed:0.05
+
+The server speaks HTTP/2 without TLS (prior knowledge), each stream is answered from a thread pool so slow
+responses of one stream do not hold the others of the same connection.
+"""
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+import h2.config
+import h2.connection
+import h2.events
+import h2.exceptions
+import h2.settings
+from utils.logger import get_logger
+from utils.mock_asana_server import API_PREFIX, MockAsanaApp
+
+
+LOGGER = get_logger(__name__, "INFO")
+
+
+class H2ServerConnection:
+    def __init__(self, server: "MockAsanaH2Server", sock: socket.socket) -> None:
+        """One client connection, a reader thread receives the frames and the streams are answered in the
+           thread pool of the server
+
+        Args:
+            server (MockAsanaH2Server): Server that accepted the connection
+            sock (socket.socket): Connected socket
+        """
+        self.server = server
+        self.sock = sock
+        self.conn = h2.connection.H2Connection(
+            h2.config.H2Configuration(client_side=False, header_encoding="utf-8")
+        )
+        # the h2 state machine and the socket writes are shared by the reader and the stream threads
+        self._lock = threading.Lock()
+        self._window_open = threading.Condition(self._lock)
+        self._requests = {}
+        self._closed = False
+        self.active_streams = 0
+
+    def run(self) -> None:
+        with self._lock:
+            self.conn.initiate_connection()
+            self.conn.update_settings({h2.settings.SettingCodes.MAX_CONCURRENT_STREAMS: self.server.max_streams})
+            self._flush()
+        try:
+            while not self._closed:
+                data = self.sock.recv(65535)
+                if not data:
+                    break
+                with self._lock:
+                    events = self.conn.receive_data(data)
+                    for event in events:
+                        self._handle_event(event)
+                    self._flush()
+        except (OSError, h2.exceptions.ProtocolError) as e:
+            LOGGER.debug(f"HTTP/2 connection closed: {e}")
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._window_open.notify_all()
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        self.server.forget(self)
+
+    def _handle_event(self, event) -> None:
+        if isinstance(event, h2.events.RequestReceived):
+            self._requests[event.stream_id] = (dict(event.headers), bytearray())
+        elif isinstance(event, h2.events.DataReceived):
+            self._requests[event.stream_id][1].extend(event.data)
+            self.conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+        elif isinstance(event, h2.events.StreamEnded):
+            headers, body = self._requests.pop(event.stream_id)
+            self.active_streams += 1
+            self.server.stream_started(self.active_streams)
+            self.server.executor.submit(self._respond, event.stream_id, headers, bytes(body))
+        elif isinstance(event, h2.events.StreamReset):
+            self._requests.pop(event.stream_id, None)
+        elif isinstance(event, (h2.events.WindowUpdated, h2.events.RemoteSettingsChanged)):
+            self._window_open.notify_all()
+        elif isinstance(event, h2.events.ConnectionTerminated):
+            self._closed = True
+
+    def _respond(self, stream_id: int, headers: dict, body: bytes) -> None:
+        try:
+            status, response_headers, response_body = self.server.app.handle(
+                headers[":method"], headers[":path"], body
+            )
+            if headers[":method"] == "HEAD":
+                response_body = b""
+            with self._lock:
+                self.conn.send_headers(stream_id, [
+                    (":status", str(status)),
+                    *((key.lower(), value) for key, value in response_headers.items()),
+                    ("date", formatdate(usegmt=True)),
+                    ("server", "mock-asana"),
+                ], end_stream=not response_body)
+                self._flush()
+                while response_body and not self._closed:
+                    window = min(self.conn.local_flow_control_window(stream_id), self.conn.max_outbound_frame_size)
+                    if window <= 0:
+                        self._window_open.wait()
+                        continue
+                    chunk, response_body = response_body[:window], response_body[window:]
+                    self.conn.send_data(stream_id, chunk, end_stream=not response_body)
+                    self._flush()
+        except (OSError, h2.exceptions.ProtocolError) as e:
+            # the client reset the stream or closed the connection
+            LOGGER.debug(f"Stream {stream_id} not answered: {e}")
+        finally:
+            with self._lock:
+                self.active_streams -= 1
+
+    def _flush(self) -> None:
+        data = self.conn.data_to_send()
+        if data and not self._closed:
+            self.sock.sendall(data)
+
+
+class MockAsanaH2Server:
+    def __init__(
+        self,
+        app: MockAsanaApp | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        max_streams: int = 100,
+        workers: int = 64,
+    ) -> None:
+        """Threaded HTTP/2 server for the mock API
+
+        Args:
+            app (MockAsanaApp, optional): Mock API to serve. Defaults to a new MockAsanaApp.
+            host (str, optional): Host to bind. Defaults to "127.0.0.1".
+            port (int, optional): Port to bind, 0 picks a free port. Defaults to 0.
+            max_streams (int, optional): Concurrent streams allowed per connection. Defaults to 100.
+            workers (int, optional): Streams answered at the same time by the server. Defaults to 64.
+        """
+        self.app = app or MockAsanaApp()
+        self.max_streams = max_streams
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mock-asana-h2")
+        self.connections_accepted = 0
+        self.max_active_streams = 0
+        self._sock = socket.create_server((host, port), backlog=1024)
+        self._sock.settimeout(0.2)
+        self._connections = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def url_base(self) -> str:
+        host, port = self._sock.getsockname()[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def serve_forever(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                sock, _ = self._sock.accept()
+            except TimeoutError:
+                continue
+            except OSError:
+                break
+            sock.settimeout(None)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            connection = H2ServerConnection(self, sock)
+            with self._lock:
+                self._connections.add(connection)
+                self.connections_accepted += 1
+            threading.Thread(target=connection.run, name="mock-asana-h2-connection", daemon=True).start()
+
+    def stream_started(self, active_streams: int) -> None:
+        with self._lock:
+            self.max_active_streams = max(self.max_active_streams, active_streams)
+
+    def forget(self, connection: H2ServerConnection) -> None:
+        with self._lock:
+            self._connections.discard(connection)
+
+    def start(self) -> "MockAsanaH2Server":
+        self._thread = threading.Thread(target=self.serve_forever, name="mock-asana-h2", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._sock.close()
+        with self._lock:
+            connections = list(self._connections)
+        for connection in connections:
+            connection.close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self) -> "MockAsanaH2Server":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,488 @@
+"""Local stand-in for the Asana API used by the suite, for offline runs and benchmarks
+
+Run from the repository root and point URL_BASE to the printed URL:
+    python -m utils.mock_asana_server --port 8080 --latency lognormal:-4:0.5 --error-rate 0.01
+--http2 serves the same API over HTTP/2 without TLS, for HTTP_TRANSPORT=http2.
+"""
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from utils.logger import get_logger
+
+
+LOGGER = get_logger(__name__, "INFO")
+
+API_PREFIX = "/api/1.0/"
+WORKSPACE_NAME = "Mock Workspace"
+USER = {"gid": "1100000000000001", "resource_type": "user", "name": "Mock User"}
+
+
+class Latency:
+    def __init__(self, spec: str = "none", seed: int | None = None) -> None:
+        """Latency distribution of the mock server in seconds
+
+        Args:
+            spec (str, optional): none, fixed:<s>, uniform:<min>:<max>, normal:<mean>:<stdev>,
+                                  lognormal:<mu>:<sigma> or exponential:<mean>. Defaults to "none".
+            seed (int, optional): Seed of the random generator. Defaults to None.
+        """
+        name, *params = spec.split(":")
+        params = [float(param) for param in params]
+        self.spec = spec
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        distributions = {
+            "none": lambda: 0.0,
+            "fixed": lambda: params[0],
+            "uniform": lambda: self._random.uniform(*params),
+            "normal": lambda: self._random.gauss(*params),
+            "lognormal": lambda: self._random.lognormvariate(*params),
+            "exponential": lambda: self._random.expovariate(1 / params[0]),
+        }
+        if name not in distributions:
+            raise ValueError(f"Unknown latency distribution: {spec}")
+        self._sample = distributions[name]
+
+    def sample(self) -> float:
+        with self._lock:
+            return max(self._sample(), 0.0)
+
+
+class MockAsanaApp:
+    def __init__(
+        self,
+        latency: Latency | None = None,
+        error_rate: float = 0.0,
+        error_codes: tuple = (429, 503),
+        retry_after: int = 1,
+        seed: int | None = None,
+    ) -> None:
+        """In-memory Asana API with the projects, sections, tasks and portfolios endpoints used by the suite
+
+        Args:
+            latency (Latency, optional): Latency added to each request. Defaults to no latency.
+            error_rate (float, optional): Fraction of requests answered with an injected error. Defaults to 0.0.
+            error_codes (tuple, optional): Status codes of the injected errors. Defaults to (429, 503).
+            retry_after (int, optional): Retry-After seconds sent with injected 429. Defaults to 1.
+            seed (int, optional): Seed for the error injection. Defaults to None.
+        """
+        self.latency = latency or Latency()
+        self.error_rate = error_rate
+        self.error_codes = tuple(error_codes)
+        self.retry_after = retry_after
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._gids = itertools.count(1200000000000000)
+        self._store = {"projects": {}, "sections": {}, "tasks": {}, "portfolios": {}}
+        self._routes = [
+            ("GET", ("projects",), self.list_projects),
+            ("POST", ("projects",), self.create_project),
+            ("GET", ("projects", None), self.get_resource),
+            ("PUT", ("projects", None), self.update_project),
+            ("DELETE", ("projects", None), self.delete_resource),
+            ("POST", ("projects", None, "sections"), self.create_section),
+            ("GET", ("projects", None, "tasks"), self.list_project_tasks),
+            ("GET", ("sections", None), self.get_resource),
+            ("PUT", ("sections", None), self.update_section),
+            ("DELETE", ("sections", None), self.delete_resource),
+            ("GET", ("tasks",), self.list_tasks),
+            ("POST", ("tasks",), self.create_task),
+            ("GET", ("tasks", None), self.get_resource),
+            ("PUT", ("tasks", None), self.update_task),
+            ("DELETE", ("tasks", None), self.delete_resource),
+            ("POST", ("tasks", None, "addProject"), self.add_project),
+            ("GET", ("portfolios",), self.list_portfolios),
+            ("POST", ("portfolios",), self.create_portfolio),
+            ("GET", ("portfolios", None), self.get_resource),
+            ("DELETE", ("portfolios", None), self.delete_resource),
+            ("POST", ("portfolios", None, "addItem"), self.add_item),
+        ]
+
+    def handle(self, method: str, target: str, body: bytes) -> tuple:
+        """Answers one request
+
+        Args:
+            method (str): HTTP method
+            target (str): Path and query of the request
+            body (bytes): Request body
+
+        Returns:
+            tuple: Status code, headers dict and body bytes
+        """
+        time.sleep(self.latency.sample())
+        with self._lock:
+            self.requests += 1
+            injected_error = self.error_rate and self._random.random() < self.error_rate
+            code = self._random.choice(self.error_codes) if injected_error else None
+        if code:
+            headers = {"Retry-After": str(self.retry_after)} if code == 429 else {}
+            return self._response(code, self._errors(f"Injected error {code}"), headers)
+
+        url = urlsplit(target)
+        if not url.path.startswith(API_PREFIX):
+            return self._response(404, self._errors("No matching route for request"))
+        parts = tuple(url.path[len(API_PREFIX):].strip("/").split("/"))
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        for route_method, pattern, handler in self._routes:
+            if route_method == method and self._match(pattern, parts):
+                try:
+                    data = json.loads(body) if body else None
+                except ValueError:
+                    return self._response(400, self._errors("Could not parse request data, invalid JSON"))
+                gids = [part for part, expected in zip(parts, pattern) if expected is None]
+                with self._lock:
+                    status, payload = handler(parts[0], *gids, query=query, data=(data or {}).get("data"))
+                headers = {"location": f"{API_PREFIX}{parts[0]}/{payload['data']['gid']}"} if status == 201 else {}
+                return self._response(status, payload, headers)
+        return self._response(404, self._errors("No matching route for request"))
+
+    # resources
+    def list_projects(self, resource, query, data):
+        return self._list(resource, query)
+
+    def list_project_tasks(self, resource, project_gid, query, data):
+        if project_gid not in self._store["projects"]:
+            return self._not_found("project", project_gid)
+        tasks = [task for task in self._store["tasks"].values()
+                 if any(project["gid"] == project_gid for project in task.get("projects", []))]
+        return self._list("tasks", query, tasks)
+
+    def list_tasks(self, resource, query, data):
+        return self._list(resource, query)
+
+    def list_portfolios(self, resource, query, data):
+        return self._list(resource, query)
+
+    def create_project(self, resource, query, data):
+        if not data or not data.get("workspace"):
+            return 400, self._errors("You should specify one of workspace, team")
+        project = self._new("project", data, {
+            "modified_at": self._now(),
+            "minimum_access_level_for_sharing": "admin",
+            "minimum_access_level_for_customization": "admin",
+            "default_access_level": "admin",
+            "default_view": "list",
+            "team": {"gid": "1100000000000002", "resource_type": "team", "name": "Mock Team"},
+            "workspace": self._workspace(data["workspace"]),
+            "archived": False,
+            "notes": data.get("notes", ""),
+            "privacy_setting": "public_to_workspace",
+            "public": True,
+            "current_status": None,
+            "owner": USER,
+            "completed": False,
+            "members": [USER],
+            "custom_field_settings": [],
+            "custom_fields": [],
+            "followers": [USER],
+            "icon": "list",
+            "color": data.get("color"),
+        })
+        return 201, {"data": project}
+
+    def update_project(self, resource, gid, query, data):
+        return self._update(resource, gid, data, ("name", "notes", "color", "default_view", "archived"))
+
+    def create_section(self, resource, project_gid, query, data):
+        project = self._store["projects"].get(project_gid)
+        if project is None:
+            return self._not_found("project", project_gid)
+        if not data or not data.get("name"):
+            return 400, self._errors("name: Missing input")
+        section = self._new("section", data, {"project": self._compact(project)})
+        return 201, {"data": section}
+
+    def update_section(self, resource, gid, query, data):
+        return self._update(resource, gid, data, ("name",))
+
+    def create_task(self, resource, query, data):
+        if not data or not (data.get("workspace") or data.get("projects")):
+            return 400, self._errors("You should specify one of workspace, parent, projects")
+        projects = [self._compact(self._store["projects"][gid]) for gid in data.get("projects", [])
+                    if gid in self._store["projects"]]
+        task = self._new("task", data, {
+            "projects": projects,
+            "memberships": [{"project": project, "section": None} for project in projects],
+            "modified_at": self._now(),
+            "notes": data.get("notes", ""),
+            "assignee": None,
+            "start_at": None,
+            "start_on": None,
+            "resource_subtype": "default_task",
+            "due_at": None,
+            "due_on": None,
+            "completed_at": None,
+            "assignee_status": "upcoming",
+            "completed": False,
+            "actual_time_minutes": None,
+            "workspace": self._workspace(data.get("workspace")),
+            "num_hearts": 0,
+            "num_likes": 0,
+            "parent": None,
+            "tags": [],
+            "hearted": False,
+            "liked": False,
+            "hearts": [],
+            "likes": [],
+            "custom_fields": [],
+            "followers": [USER],
+        })
+        return 201, {"data": task}
+
+    def update_task(self, resource, gid, query, data):
+        return self._update(resource, gid, data, ("name", "notes", "completed"))
+
+    def add_project(self, resource, gid, query, data):
+        task = self._store["tasks"].get(gid)
+        if task is None:
+            return self._not_found("task", gid)
+        project = self._store["projects"].get((data or {}).get("project"))
+        if project is None:
+            return 400, self._errors("project: Missing input")
+        for key in ("section", "insert_before", "insert_after"):
+            if data.get(key) and data[key] not in self._store["sections" if key == "section" else "tasks"]:
+                return self._not_found(key, data[key])
+        if self._compact(project) not in task["projects"]:
+            task["projects"].append(self._compact(project))
+        return 200, {"data": {}}
+
+    def create_portfolio(self, resource, query, data):
+        if not data or not data.get("workspace") or not data.get("name"):
+            return 400, self._errors("You should specify workspace and name")
+        portfolio = self._new("portfolio", data, {
+            "workspace": self._workspace(data["workspace"]),
+            "owner": USER,
+            "members": [USER],
+            "color": "light-gray",
+            "public": False,
+            "items": [],
+        })
+        return 201, {"data": portfolio}
+
+    def add_item(self, resource, gid, query, data):
+        portfolio = self._store["portfolios"].get(gid)
+        if portfolio is None:
+            return self._not_found("portfolio", gid)
+        project = self._store["projects"].get((data or {}).get("item"))
+        if project is None:
+            return 400, self._errors("item: Missing input")
+        portfolio["items"].append(project["gid"])
+        return 200, {"data": {}}
+
+    def get_resource(self, resource, gid, query, data):
+        stored = self._store[resource].get(gid)
+        if stored is None:
+            return self._not_found(resource[:-1], gid)
+        return 200, {"data": stored}
+
+    def delete_resource(self, resource, gid, query, data):
+        if self._store[resource].pop(gid, None) is None:
+            return self._not_found(resource[:-1], gid)
+        return 200, {"data": {}}
+
+    # helpers
+    def _list(self, resource, query, stored=None):
+        stored = list(self._store[resource].values()) if stored is None else stored
+        # compact records, with the extra fields asked in opt_fields
+        fields = [field for field in query.get("opt_fields", "").split(",") if field]
+        if "limit" not in query:
+            return 200, {"data": [self._compact(item, fields) for item in stored], "next_page": None}
+        limit = query["limit"]
+        if not limit.isdigit() or not 1 <= int(limit) <= 100:
+            return 400, self._errors("limit: Must be between 1 and 100")
+        # the offset token is the position of the first item of the page
+        offset = query.get("offset", "0")
+        if not offset.isdigit() or int(offset) > len(stored):
+            return 400, self._errors("offset: Your pagination token is invalid")
+        start, end = int(offset), int(offset) + int(limit)
+        items = [self._compact(item, fields) for item in stored[start:end]]
+        next_page = None
+        if end < len(stored):
+            path = f"/{resource}?limit={limit}&offset={end}"
+            next_page = {"offset": str(end), "path": path, "uri": f"{API_PREFIX.rstrip('/')}{path}"}
+        return 200, {"data": items, "next_page": next_page}
+
+    def _update(self, resource, gid, data, fields):
+        stored = self._store[resource].get(gid)
+        if stored is None:
+            return self._not_found(resource[:-1], gid)
+        if not data:
+            return 400, self._errors("data: Missing input")
+        stored.update({key: value for key, value in data.items() if key in fields})
+        if "modified_at" in stored:
+            stored["modified_at"] = self._now()
+        return 200, {"data": stored}
+
+    def _new(self, resource_type, data, fields):
+        gid = str(next(self._gids))
+        item = {
+            "gid": gid,
+            "resource_type": resource_type,
+            "created_at": self._now(),
+            "name": data.get("name", ""),
+            "permalink_url": f"https://app.asana.com/0/{gid}/{gid}",
+        }
+        item.update(fields)
+        if resource_type == "section":
+            del item["permalink_url"]
+        self._store[f"{resource_type}s"][gid] = item
+        return item
+
+    def _not_found(self, resource_type, gid):
+        if not str(gid).isdigit():
+            return 400, self._errors(f"{resource_type}: Not a recognized ID: {gid}")
+        return 404, self._errors("Unknown object. Either the object does not exist or you do not have access")
+
+    @staticmethod
+    def _match(pattern, parts):
+        return len(pattern) == len(parts) and all(
+            expected is None or expected == part for expected, part in zip(pattern, parts)
+        )
+
+    @staticmethod
+    def _compact(item, fields=()):
+        compact = {"gid": item["gid"], "resource_type": item["resource_type"], "name": item["name"]}
+        compact.update({field: item[field] for field in fields if field in item})
+        return compact
+
+    @staticmethod
+    def _workspace(gid):
+        return {"gid": str(gid), "resource_type": "workspace", "name": WORKSPACE_NAME}
+
+    @staticmethod
+    def _now():
+        return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+    @staticmethod
+    def _errors(message):
+        return {"errors": [{"message": message, "help": "For more information on API status codes and how to handle them, read the docs on errors: https://developers.asana.com/docs/errors"}]}
+
+    @staticmethod
+    def _response(status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        response_headers = {"Content-Type": "application/json; charset=UTF-8", "Content-Length": str(len(body))}
+        response_headers.update(headers or {})
+        return status, response_headers, body
+
+
+class MockAsanaRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are separate writes, with Nagle the body waits for the delayed ACK of the client
+    disable_nagle_algorithm = True
+
+    def do_request(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        status, headers, response_body = self.server.app.handle(self.command, self.path, body)
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(response_body)
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = do_request
+
+    def send_response(self, code, message=None) -> None:
+        # only headers listed in input_json, the default handler adds a capitalized Server header
+        self.log_request(code)
+        self.send_response_only(code, message)
+        self.send_header("Date", formatdate(usegmt=True))
+        self.send_header("server", "mock-asana")
+
+    def log_message(self, format, *args) -> None:
+        LOGGER.debug(format % args)
+
+
+class MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class MockAsanaServer:
+    def __init__(self, app: MockAsanaApp | None = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Threaded HTTP/1.1 server for the mock API
+
+        Args:
+            app (MockAsanaApp, optional): Mock API to serve. Defaults to a new MockAsanaApp.
+            host (str, optional): Host to bind. Defaults to "127.0.0.1".
+            port (int, optional): Port to bind, 0 picks a free port. Defaults to 0.
+        """
+        self.httpd = MockHTTPServer((host, port), MockAsanaRequestHandler)
+        self.httpd.app = app or MockAsanaApp()
+        self._thread = None
+
+    @property
+    def app(self) -> MockAsanaApp:
+        return self.httpd.app
+
+    @property
+    def url_base(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self) -> "MockAsanaServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-asana", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self.httpd.serve_forever()
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "MockAsanaServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", default="none", help="none, fixed:s, uniform:min:max, normal:mean:stdev, "
+                                                          "lognormal:mu:sigma or exponential:mean")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-codes", default="429,503")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--http2", action="store_true", help="serve HTTP/2 without TLS instead of HTTP/1.1")
+    args = parser.parse_args()
+
+    app = MockAsanaApp(
+        latency=Latency(args.latency, args.seed),
+        error_rate=args.error_rate,
+        error_codes=tuple(int(code) for code in args.error_codes.split(",")),
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    if args.http2:
+        # h2 is only needed by the HTTP/2 server
+        from utils.mock_asana_h2_server import MockAsanaH2Server
+
+        server = MockAsanaH2Server(app, args.host, args.port)
+    else:
+        server = MockAsanaServer(app, args.host, args.port)
+    LOGGER.info(f"Mock Asana API listening, set URL_BASE={server.url_base}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
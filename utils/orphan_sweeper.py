@@ -0,0 +1,210 @@
+"""Sweeper of the projects, tasks and portfolios left in WORKSPACE_GID by crashed or interrupted runs
+
+Run from the repository root, first with --dry-run to review what matches:
+    python -m utils.orphan_sweeper --older-than 24 --dry-run
+    python -m utils.orphan_sweeper --older-than 24 --workers 32 --rate 25
+
+An object is an orphan when its name has the run prefix of resource_name, or is one the suite gives without it,
+and it was created more than --older-than hours ago, so the objects of a running suite are kept. The API lists the
+tasks of a workspace only by project or assignee and the suite does not assign them: the tasks swept are the ones of
+the orphan projects, the others were journaled in CLEANUP_JOURNAL by the run that created them. Every object is
+listed before the first delete, so the deletes do not move the pages still to be read. The deletes go through a
+CleanupQueue: they run concurrently, within RATE_LIMIT_PER_SECOND or --rate, are retried, and the ones still
+failing are left in CLEANUP_JOURNAL for the next run or sweep.
+"""
+import argparse
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from config.config import (
+    url_base,
+    headers,
+    workspace_gid,
+    cleanup_journal,
+    cleanup_retries,
+    retry_backoff_base,
+    retry_backoff_max,
+)
+from helper.cleanup_queue import CleanupQueue
+from helper.http_session import PooledSession
+from helper.rest_client import RestClient
+from helper.retry import RetryPolicy
+from utils.latency_histogram import format_summary
+from utils.logger import get_logger
+from utils.rate_limiter import SharedRateLimiter
+
+
+LOGGER = get_logger(__name__, "INFO")
+
+# names with the run prefix, and the names given by the fixtures, the pool, the tests and the load scenarios
+SUITE_NAMES = re.compile(
+    r"^(\[[0-9a-f]{8}-[\w-]+\] "
+    r"|(Test (project|portfolio|section|task)|Auto (New|Task|Section|Updated)|Pooled (project|section|task))\b)"
+)
+# collections of the workspace, portfolios are only listed for their owner
+LISTINGS = {
+    "projects": "projects?workspace={workspace}",
+    "portfolios": "portfolios?workspace={workspace}&owner=me",
+}
+# tasks are listed through the orphan projects, and queued for deletion before them
+RESOURCES = ("tasks", "projects", "portfolios")
+PROJECT_TASKS = "projects/{project}/tasks"
+
+
+def parse_created_at(value: str) -> datetime:
+    """Returns the created_at of the API, like 2024-01-31T12:00:00.000Z, as an aware datetime"""
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class OrphanSweeper:
+    def __init__(
+        self,
+        rest_client: RestClient,
+        cleanup_queue: CleanupQueue,
+        older_than: float = 24.0,
+        pattern: re.Pattern = SUITE_NAMES,
+        max_workers: int = 8,
+    ) -> None:
+        """Finds the objects left by the suite in the workspace and deletes them
+
+        Args:
+            rest_client (RestClient): Client used to list the collections
+            cleanup_queue (CleanupQueue): Queue that sends the deletes
+            older_than (float, optional): Hours since the creation of an orphan. Defaults to 24.0.
+            pattern (re.Pattern, optional): Names of the orphans, matched from the start. Defaults to SUITE_NAMES.
+            max_workers (int, optional): Listings sent at the same time. Defaults to 8.
+        """
+        self.rest_client = rest_client
+        self.cleanup_queue = cleanup_queue
+        self.older_than = older_than
+        self.pattern = pattern
+        self.max_workers = max_workers
+
+    def find(self, resources: tuple = RESOURCES) -> tuple:
+        """Lists the collections at the same time and keeps the orphans, then lists the tasks of the orphan projects
+
+        Args:
+            resources (tuple, optional): Collections to sweep. Defaults to tasks, projects and portfolios.
+
+        Returns:
+            tuple: Objects listed by collection, and orphans by collection as lists of compact records
+
+        Raises:
+            requests.HTTPError: When a page request fails, so a sweep never works on a partial listing
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=self.older_than)
+        # the projects are also listed to find the tasks
+        collections = [resource for resource in LISTINGS if resource in resources or resource == "projects"]
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="orphan-sweeper") as executor:
+            listings = dict(zip(collections, executor.map(self._list, collections)))
+            if "tasks" in resources:
+                orphan_projects = [item["gid"] for item in listings["projects"] if self.is_orphan(item, cutoff)]
+                # a task of several orphan projects is listed once
+                tasks = {}
+                for items in executor.map(self._list_project_tasks, orphan_projects):
+                    tasks.update((item["gid"], item) for item in items)
+                listings["tasks"] = list(tasks.values())
+        listed = {resource: len(listings[resource]) for resource in RESOURCES if resource in resources}
+        orphans = {
+            resource: [item for item in listings[resource] if self.is_orphan(item, cutoff)]
+            for resource in listed
+        }
+        return listed, orphans
+
+    def is_orphan(self, item: dict, cutoff: datetime) -> bool:
+        """Tells if a compact record has a name of the suite and was created before the cutoff, a record
+           without created_at is kept"""
+        if not self.pattern.match(item.get("name") or ""):
+            return False
+        created_at = item.get("created_at")
+        return created_at is not None and parse_created_at(created_at) < cutoff
+
+    def sweep(self, resources: tuple = RESOURCES, dry_run: bool = False) -> dict:
+        """Finds the orphans and deletes them, unless dry_run
+
+        Args:
+            resources (tuple, optional): Collections to sweep. Defaults to tasks, projects and portfolios.
+            dry_run (bool, optional): Only lists and logs the orphans. Defaults to False.
+
+        Returns:
+            dict: listed and orphans by collection, list_seconds, and without dry_run the counters of the
+                  cleanup queue, delete_seconds, deletes_per_second and delete_latency
+        """
+        started = time.perf_counter()
+        listed, orphans = self.find(resources)
+        report = {
+            "listed": listed,
+            "orphans": {resource: len(items) for resource, items in orphans.items()},
+            "list_seconds": time.perf_counter() - started,
+        }
+        if dry_run:
+            for resource, items in orphans.items():
+                for item in items:
+                    LOGGER.info(f"Orphan {resource} {item['gid']} '{item['name']}' created at {item['created_at']}")
+            return report
+        started = time.perf_counter()
+        for resource, items in orphans.items():
+            for item in items:
+                self.cleanup_queue.enqueue(resource, item["gid"])
+        self.cleanup_queue.drain()
+        elapsed = time.perf_counter() - started
+        stats = self.cleanup_queue.stats()
+        report.update({counter: stats[counter] for counter in ("deleted", "gone", "retries", "failed")})
+        report["delete_seconds"] = elapsed
+        report["deletes_per_second"] = (stats["deleted"] + stats["gone"]) / elapsed if elapsed else 0.0
+        report["delete_latency"] = format_summary(stats["latency"]) if stats["latency"]["count"] else ""
+        return report
+
+    def _list(self, resource: str) -> list:
+        url = f"{url_base}{LISTINGS[resource].format(workspace=workspace_gid)}&opt_fields=name,created_at"
+        items = list(self.rest_client.iter_items(url, headers, prefetch=True))
+        LOGGER.info(f"Listed {len(items)} {resource}")
+        return items
+
+    def _list_project_tasks(self, project_gid: str) -> list:
+        url = f"{url_base}{PROJECT_TASKS.format(project=project_gid)}?opt_fields=name,created_at"
+        items = list(self.rest_client.iter_items(url, headers, prefetch=True))
+        LOGGER.debug(f"Listed {len(items)} tasks of project {project_gid}")
+        return items
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--older-than", type=float, default=24.0, help="hours since the creation of an orphan")
+    parser.add_argument("--resources", default=",".join(RESOURCES),
+                        help=f"collections to sweep, from {','.join(RESOURCES)}")
+    parser.add_argument("--workers", type=int, default=16, help="listings and deletes in flight")
+    parser.add_argument("--rate", type=float, help="max requests per second, defaults to RATE_LIMIT_PER_SECOND")
+    parser.add_argument("--dry-run", action="store_true", help="list the orphans without deleting them")
+    args = parser.parse_args()
+    resources = tuple(resource.strip() for resource in args.resources.split(",") if resource.strip())
+    unknown = set(resources) - set(RESOURCES)
+    if unknown:
+        parser.error(f"unknown resources {sorted(unknown)}")
+
+    session = PooledSession(pool_size=args.workers)
+    rate_limiter = SharedRateLimiter(args.rate) if args.rate else None
+    rest_client = RestClient(session, rate_limiter=rate_limiter)
+    cleanup_queue = CleanupQueue(
+        rest_client,
+        cleanup_journal,
+        max_workers=args.workers,
+        retry_policy=RetryPolicy(
+            max_retries=cleanup_retries, backoff_base=retry_backoff_base, backoff_max=retry_backoff_max
+        ),
+    )
+    try:
+        sweeper = OrphanSweeper(rest_client, cleanup_queue, older_than=args.older_than, max_workers=args.workers)
+        report = sweeper.sweep(resources, dry_run=args.dry_run)
+    finally:
+        cleanup_queue.close()
+    for key, value in report.items():
+        print(f"{key:<20}{value:.4f}" if isinstance(value, float) else f"{key:<20}{value}")
+    for resource, gid, status in cleanup_queue.stats()["failures"]:
+        print(f"{resource} {gid} not deleted (status {status}), left in {cleanup_journal}")
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
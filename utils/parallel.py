@@ -0,0 +1,84 @@
+import os
+import uuid
+from pathlib import Path
+from utils.logger import get_logger
+
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+_run_id = None
+
+
+def worker_id() -> str:
+    """Returns the id of the pytest-xdist worker running this process, 'main' without workers
+
+    Returns:
+        str: Worker id like gw0, gw1 or main
+    """
+    return os.getenv("PYTEST_XDIST_WORKER", "main")
+
+
+def run_id() -> str:
+    """Returns an id shared by every worker of the same test run
+
+    Returns:
+        str: pytest-xdist test run uid, or a random id for runs without workers
+    """
+    global _run_id
+    if _run_id is None:
+        _run_id = os.getenv("PYTEST_XDIST_TESTRUNUID") or uuid.uuid4().hex
+    return _run_id[:8]
+
+
+def is_worker() -> bool:
+    return "PYTEST_XDIST_WORKER" in os.environ
+
+
+def resource_name(name: str) -> str:
+    """Prefixes the name of a resource with the run and worker, so workers never create resources with the same name
+
+    Args:
+        name (str): Name of the resource
+
+    Returns:
+        str: Name like '[1a2b3c4d-gw0] Test project from fixture'
+    """
+    return f"[{run_id()}-{worker_id()}] {name}"
+
+
+def worker_file(directory: str, name: str, extension: str) -> Path:
+    """Returns the path of an output file owned by this worker
+
+    Args:
+        directory (str): Output folder, created if needed
+        name (str): Base name of the output
+        extension (str): File extension without dot
+
+    Returns:
+        Path: Path like directory/name-gw0.extension
+    """
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    return Path(directory) / f"{name}-{worker_id()}.{extension}"
+
+
+def merge_worker_files(directory: str, name: str, extension: str) -> Path | None:
+    """Appends the outputs written by every worker to one file and removes the worker files
+
+    Args:
+        directory (str): Output folder
+        name (str): Base name of the output
+        extension (str): File extension without dot
+
+    Returns:
+        Path | None: Merged file, None when there was nothing to merge
+    """
+    worker_files = sorted(Path(directory).glob(f"{name}-*.{extension}"))
+    if not worker_files:
+        return None
+    merged = Path(directory) / f"{name}.{extension}"
+    with open(merged, "ab") as output:
+        for path in worker_files:
+            output.write(path.read_bytes())
+            path.unlink()
+    LOGGER.info(f"Merged {len(worker_files)} worker files into {merged}")
+    return merged
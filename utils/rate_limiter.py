@@ -0,0 +1,222 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from config.config import rate_limit_per_second, rate_limit_burst, rate_limit_file
+from utils.latency_histogram import LatencyHistogram
+from utils.logger import get_logger
+from utils.parallel import run_id
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+LOGGER = get_logger(__name__, "DEBUG")
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def default_state_file(run: str | None = None) -> Path:
+    """Returns the state file shared by the processes of one test run, so runs of other checkouts, users or CI jobs
+       of the machine have their own bucket. RATE_LIMIT_FILE shares one bucket between runs on purpose
+
+    Args:
+        run (str, optional): Id of the run. Defaults to run_id() of this process.
+
+    Returns:
+        Path: File like asana_rate_limit-1a2b3c4d.json in the temp folder
+    """
+    return Path(tempfile.gettempdir()) / f"asana_rate_limit-{run or run_id()}.json"
+
+
+def parse_retry_after(value: str | None, default: float = 1.0) -> float:
+    """Returns the seconds to wait from a Retry-After header, given in seconds or as an HTTP date
+
+    Args:
+        value (str | None): Header value
+        default (float, optional): Seconds when the header is missing or invalid. Defaults to 1.0.
+
+    Returns:
+        float: Seconds to wait
+    """
+    if not value:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+class SharedRateLimiter:
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 10,
+        path: Path | str | None = None,
+        min_rate: float | None = None,
+        recovery_seconds: float = 30.0,
+    ) -> None:
+        """Token bucket shared by every process of a run through a locked state file
+
+        A request reserves a token and sleeps until the bucket had it, so the lock is held only to update
+        the state. A 429 blocks the bucket for the Retry-After seconds and halves the rate, the rate grows
+        back to its maximum over recovery_seconds without 429.
+
+        Args:
+            rate (float): Max requests per second of all the processes
+            burst (int, optional): Tokens the bucket holds. Defaults to 10.
+            path (Path | str, optional): State file shared by the processes. Defaults to RATE_LIMIT_FILE, or the
+                                         file of the run from default_state_file.
+            min_rate (float, optional): Lowest rate after 429 responses. Defaults to a tenth of the rate.
+            recovery_seconds (float, optional): Seconds to grow from min_rate to rate. Defaults to 30.0.
+        """
+        self.max_rate = rate
+        self.burst = burst
+        self.path = Path(path or rate_limit_file or default_state_file())
+        self.min_rate = min_rate or rate / 10
+        self.recovery_seconds = recovery_seconds
+        self.wait_histogram = LatencyHistogram()
+        self.acquired = 0
+        self.throttled = 0
+        self.rate = rate
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = os.fdopen(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644), "r+", encoding="utf-8")
+
+    def acquire(self) -> float:
+        """Waits for a token
+
+        Returns:
+            float: Seconds waited
+        """
+        with self._locked_state() as state:
+            state["tokens"] -= 1
+            wait = max(-state["tokens"] / state["rate"], 0.0)
+        if wait:
+            time.sleep(wait)
+        with self._lock:
+            self.acquired += 1
+            self.wait_histogram.record(wait)
+        return wait
+
+    def throttle(self, retry_after: float) -> None:
+        """Blocks the bucket of every process for the Retry-After seconds and halves the rate
+
+        Args:
+            retry_after (float): Seconds asked by the server
+        """
+        with self._locked_state() as state:
+            state["rate"] = max(state["rate"] / 2, self.min_rate)
+            # the block is a debt of tokens: nobody gets one before retry_after seconds
+            state["tokens"] = min(state["tokens"], -retry_after * state["rate"])
+        with self._lock:
+            self.throttled += 1
+        LOGGER.warning(f"Rate limited, waiting {retry_after:.1f}s and lowering the rate to {self.rate:.1f}/s")
+
+    def stats(self) -> dict:
+        """Returns the requests, the 429 received, the current rate and the wait times in seconds of this process"""
+        with self._lock:
+            summary = self.wait_histogram.summary()
+            return {
+                "acquired": self.acquired,
+                "throttled": self.throttled,
+                "rate": self.rate,
+                "wait_p50": summary["p50"],
+                "wait_p99": summary["p99"],
+                "wait_max": summary["max"],
+            }
+
+    def close(self) -> None:
+        self._file.close()
+
+    @contextmanager
+    def _locked_state(self):
+        with self._lock:
+            self._lock_file()
+            try:
+                state = self._read_state()
+                yield state
+                self._write_state(state)
+                self.rate = state["rate"]
+            finally:
+                self._unlock_file()
+
+    def _read_state(self) -> dict:
+        now = time.time()
+        self._file.seek(0)
+        try:
+            state = json.loads(self._file.read())
+        except ValueError:
+            state = {"tokens": float(self.burst), "rate": self.max_rate, "updated": now}
+        elapsed = max(now - state["updated"], 0.0)
+        state["rate"] = min(
+            state["rate"] + (self.max_rate - self.min_rate) * elapsed / self.recovery_seconds, self.max_rate
+        )
+        state["tokens"] = min(state["tokens"] + elapsed * state["rate"], float(self.burst))
+        state["updated"] = now
+        return state
+
+    def _write_state(self, state: dict) -> None:
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(json.dumps(state))
+        self._file.flush()
+
+    def _lock_file(self) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock_file(self) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def get_shared_rate_limiter() -> SharedRateLimiter | None:
+    """Returns the rate limiter used by every RestClient of the process
+
+    Returns:
+        SharedRateLimiter | None: Limiter built on first use from RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST and
+                                  RATE_LIMIT_FILE, None when RATE_LIMIT_PER_SECOND is 0
+    """
+    global _shared_limiter
+    if not rate_limit_per_second:
+        return None
+    if _shared_limiter is None:
+        with _shared_limiter_lock:
+            if _shared_limiter is None:
+                _shared_limiter = SharedRateLimiter(rate_limit_per_second, burst=rate_limit_burst)
+                LOGGER.debug(f"Rate limiter {rate_limit_per_second}/s shared through {_shared_limiter.path}")
+    return _shared_limiter
+
+
+def remove_state_file(run: str) -> None:
+    """Closes the limiter of the process and removes the state file of a finished run, unless it is RATE_LIMIT_FILE
+
+    Args:
+        run (str): Id of the run
+    """
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is not None:
+            _shared_limiter.close()
+            _shared_limiter = None
+    if not rate_limit_file:
+        default_state_file(run).unlink(missing_ok=True)
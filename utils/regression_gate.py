@@ -0,0 +1,272 @@
+"""Compares the response times of a run with the previous runs and flags the endpoints whose p95 regressed
+
+Run after the tests: python -m utils.regression_gate --source file --metrics-file metrics/response_time.lp
+The exit code is 1 when an endpoint regressed. With REGRESSION_GATE the API suite runs the check at the end
+of the session, warn logs the regressions and fail also fails the session.
+"""
+import argparse
+import math
+import re
+import sys
+import time
+from pathlib import Path
+from config.config import (
+    influxdb_token,
+    influxdb_url,
+    metrics_dir,
+    regression_source,
+    regression_threshold,
+    regression_alpha,
+    regression_baseline_days,
+    regression_min_samples,
+)
+from utils.latency_histogram import endpoint_key
+from utils.lazy_import import lazy_import
+from utils.logger import get_logger
+
+
+LOGGER = get_logger(__name__, "DEBUG")
+# only loaded when the check runs, the conftest imports this module in every session
+influxdb_client = lazy_import("influxdb_client")
+np = lazy_import("numpy")
+
+# bucket and organization of InfluxDBConnection
+INFLUXDB_ORG = "api-course"
+INFLUXDB_BUCKET = "api-automation"
+MEASUREMENT = "response_time"
+METRICS_FILE_NAME = "response_time.lp"
+
+_UNESCAPED_SPACE = re.compile(r"(?<!\\) ")
+_UNESCAPED_COMMA = re.compile(r"(?<!\\),")
+_UNESCAPED_EQUAL = re.compile(r"(?<!\\)=")
+_ESCAPE = re.compile(r"\\(.)")
+
+
+class Samples:
+    def __init__(self) -> None:
+        """Response times of several runs, one entry per request"""
+        self.keys = []
+        self.run_ids = []
+        self.values = []
+        self.timestamps = []
+
+    def add(self, method: str, url: str, run_id: str, value: float, timestamp: int) -> None:
+        self.keys.append(endpoint_key(method, url))
+        self.run_ids.append(run_id)
+        self.values.append(value)
+        self.timestamps.append(timestamp)
+
+    def latest_run(self) -> str | None:
+        """Returns the run of the last sample"""
+        return self.run_ids[int(np.argmax(self.timestamps))] if self.values else None
+
+    def split(self, current_run: str) -> dict:
+        """Groups the samples per endpoint and method
+
+        Args:
+            current_run (str): Run compared, the other runs are the baseline
+
+        Returns:
+            dict: (current, baseline) arrays of seconds by (method, endpoint)
+        """
+        keys = np.array([f"{method} {endpoint}" for method, endpoint in self.keys])
+        values = np.array(self.values, dtype=float)
+        current = np.array(self.run_ids) == current_run
+        groups = {}
+        for key in np.unique(keys[current]):
+            in_group = keys == key
+            method, endpoint = key.split(" ", 1)
+            groups[(method, endpoint)] = (values[in_group & current], values[in_group & ~current])
+        return groups
+
+
+def parse_line_protocol(line: str) -> tuple:
+    """Parses a line written by Point.to_line_protocol
+
+    Args:
+        line (str): Line like response_time,method=GET,url=... value=0.12 1700000000000000000
+
+    Returns:
+        tuple: Measurement, tags dict, fields dict and timestamp in nanoseconds
+    """
+    series, fields, timestamp = _UNESCAPED_SPACE.split(line.strip())
+    measurement, *tags = _UNESCAPED_COMMA.split(series)
+    tags = dict(_ESCAPE.sub(r"\1", tag).split("=", 1) for tag in tags if _UNESCAPED_EQUAL.search(tag))
+    parsed_fields = {}
+    for field in _UNESCAPED_COMMA.split(fields):
+        name, value = _UNESCAPED_EQUAL.split(field, 1)
+        parsed_fields[name] = int(value[:-1]) if value.endswith("i") else float(value)
+    return measurement, tags, parsed_fields, int(timestamp)
+
+
+def load_metrics_file(path: Path | str, days: float = regression_baseline_days) -> Samples:
+    """Reads the response times of the last days from a metrics file in line protocol
+
+    Args:
+        path (Path | str): File written with METRICS_DIR
+        days (float, optional): Age of the oldest sample. Defaults to REGRESSION_BASELINE_DAYS.
+
+    Returns:
+        Samples: Response times
+    """
+    samples = Samples()
+    oldest = time.time_ns() - int(days * 86400e9)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            measurement, tags, fields, timestamp = parse_line_protocol(line)
+            if measurement == MEASUREMENT and "value" in fields and timestamp >= oldest:
+                samples.add(tags["method"], tags["url"], tags.get("run_id", ""), fields["value"], timestamp)
+    return samples
+
+
+def load_influxdb(days: float = regression_baseline_days) -> Samples:
+    """Queries the response times of the last days from InfluxDB
+
+    Args:
+        days (float, optional): Age of the oldest sample. Defaults to REGRESSION_BASELINE_DAYS.
+
+    Returns:
+        Samples: Response times
+    """
+    query = f"""
+        from(bucket: "{INFLUXDB_BUCKET}")
+            |> range(start: -{int(days * 86400)}s)
+            |> filter(fn: (r) => r._measurement == "{MEASUREMENT}" and r._field == "value")
+            |> keep(columns: ["_time", "_value", "method", "url", "run_id"])
+    """
+    samples = Samples()
+    with influxdb_client.InfluxDBClient(url=influxdb_url, token=influxdb_token, org=INFLUXDB_ORG) as client:
+        for record in client.query_api().query_stream(query):
+            samples.add(
+                record.values["method"],
+                record.values["url"],
+                record.values.get("run_id", ""),
+                record.get_value(),
+                int(record.get_time().timestamp() * 1e9),
+            )
+    return samples
+
+
+def mann_whitney_greater(current: "np.ndarray", baseline: "np.ndarray") -> float:
+    """One sided Mann-Whitney U test with the normal approximation and the tie correction
+
+    Args:
+        current (np.ndarray): Response times of the run
+        baseline (np.ndarray): Response times of the previous runs
+
+    Returns:
+        float: p-value of the current times being larger than the baseline
+    """
+    n1, n2 = len(current), len(baseline)
+    values = np.concatenate([current, baseline])
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    # average rank of the tied values
+    ranks = (np.cumsum(counts) - (counts - 1) / 2)[inverse]
+    u = ranks[:n1].sum() - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    ties = (counts ** 3 - counts).sum() / (n * (n - 1))
+    sigma = math.sqrt(n1 * n2 / 12 * (n + 1 - ties))
+    if sigma == 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / sigma
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare(
+    samples: Samples,
+    current_run: str | None = None,
+    threshold: float = regression_threshold,
+    alpha: float = regression_alpha,
+    min_samples: int = regression_min_samples,
+) -> list:
+    """Compares the p95 of each endpoint in the run with the p95 of the previous runs
+
+    An endpoint regressed when its p95 grew more than the threshold and the Mann-Whitney test finds its
+    times larger than the baseline.
+
+    Args:
+        samples (Samples): Response times of the run and of the baseline
+        current_run (str, optional): Run to check. Defaults to the run of the last sample.
+        threshold (float, optional): Relative p95 increase allowed. Defaults to REGRESSION_THRESHOLD.
+        alpha (float, optional): Significance level of the test. Defaults to REGRESSION_ALPHA.
+        min_samples (int, optional): Samples needed in the run and in the baseline. Defaults to
+                                     REGRESSION_MIN_SAMPLES.
+
+    Returns:
+        list: One dict per endpoint of the run, regressions first
+    """
+    current_run = current_run or samples.latest_run()
+    results = []
+    for (method, endpoint), (current, baseline) in samples.split(current_run).items():
+        result = {"method": method, "endpoint": endpoint, "samples": len(current), "baseline_samples": len(baseline)}
+        if len(current) < min_samples or len(baseline) < min_samples:
+            results.append(dict(result, status="not enough samples", regressed=False))
+            continue
+        current_p50, current_p95 = np.percentile(current, [50, 95])
+        baseline_p50, baseline_p95 = np.percentile(baseline, [50, 95])
+        change = current_p95 / baseline_p95 - 1 if baseline_p95 else 0.0
+        p_value = mann_whitney_greater(current, baseline)
+        regressed = change > threshold and p_value < alpha
+        results.append(dict(
+            result,
+            status="regressed" if regressed else "ok",
+            regressed=regressed,
+            current_p50=float(current_p50),
+            current_p95=float(current_p95),
+            baseline_p50=float(baseline_p50),
+            baseline_p95=float(baseline_p95),
+            change=float(change),
+            p_value=p_value,
+        ))
+    return sorted(results, key=lambda result: (not result["regressed"], -result.get("change", 0.0)))
+
+
+def check_regressions(
+    current_run: str | None = None, source: str = regression_source, path: Path | str | None = None
+) -> list:
+    """Loads the response times from InfluxDB or from the metrics file and compares the run with the baseline
+
+    Args:
+        current_run (str, optional): Run to check. Defaults to the run of the last sample.
+        source (str, optional): influxdb or file. Defaults to REGRESSION_SOURCE.
+        path (Path | str, optional): Metrics file of the file source. Defaults to response_time.lp in METRICS_DIR.
+
+    Returns:
+        list: Comparison of each endpoint, see compare
+    """
+    if source == "file":
+        samples = load_metrics_file(path or Path(metrics_dir) / METRICS_FILE_NAME)
+    elif source == "influxdb":
+        samples = load_influxdb()
+    else:
+        raise ValueError(f"Unknown regression source: {source}")
+    return compare(samples, current_run)
+
+
+def format_result(result: dict) -> str:
+    """Returns one line with the p95 of the run and of the baseline"""
+    name = f"{result['method']} {result['endpoint']}"
+    if "change" not in result:
+        return f"{name:<40}{result['status']} ({result['samples']} samples, {result['baseline_samples']} in baseline)"
+    return (
+        f"{name:<40}{result['status']:<11}p95 {result['current_p95'] * 1000:.1f} ms vs "
+        f"{result['baseline_p95'] * 1000:.1f} ms ({result['change']:+.0%}) p={result['p_value']:.3g}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compares the response times of a run with the previous runs")
+    parser.add_argument("--source", choices=("influxdb", "file"), default=regression_source)
+    parser.add_argument("--metrics-file", help="Metrics file in line protocol, for the file source")
+    parser.add_argument("--run-id", help="Run to check, the last one by default")
+    args = parser.parse_args()
+    results = check_regressions(args.run_id, args.source, args.metrics_file)
+    for result in results:
+        print(format_result(result))
+    sys.exit(1 if any(result["regressed"] for result in results) else 0)
+
+
+if __name__ == "__main__":
+    main()